@@ -0,0 +1,250 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import registry
+from serialization import dumps
+
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Cereri respinse de controlul de admitere", ("class", "status"))
+
+
+class PriorityClass(NamedTuple):
+    priority: int          # 0 = cea mai importantă
+    share: float           # fracțiunea maximă din capacitate pe care o poate ocupa clasa
+    max_queue: int         # cereri care pot aștepta un loc; peste -> 503
+    queue_timeout: float   # secunde de așteptare; peste -> 503
+
+
+# Citirile interactive pot folosi toată capacitatea; bulk jumătate, ingestia un sfert
+CLASSES: Dict[str, PriorityClass] = {
+    'interactive': PriorityClass(0, 1.0, 256, 2.0),
+    'bulk': PriorityClass(1, 0.5, 32, 10.0),
+    'ingest': PriorityClass(2, 0.25, 8, 30.0),
+}
+
+# Rută -> (clasă, limită de cereri concurente pe rută). Rutele nelistate nu trec prin admitere.
+ROUTE_POLICIES: Dict[str, Tuple[str, Optional[int]]] = {
+    '/ingest/{symbol}': ('ingest', 2),
+    '/time-series/bulk': ('bulk', 4),
+    '/export/time-series': ('bulk', 2),
+    '/aggregations/record-counts': ('bulk', 1),
+    '/aggregations/avg-volume': ('bulk', 1),
+    '/aggregations/avg-volume/{asset_id}': ('bulk', 2),
+    '/time-series/{asset_id}/{data_source_id}': ('interactive', None),
+    '/aggregations/{asset_id}/range': ('interactive', None),
+    '/aggregations/{asset_id}/percentiles': ('interactive', None),
+    '/api/dashboard/{asset_id}/summary': ('interactive', None),
+    '/api/dashboard/{asset_id}/years': ('interactive', None),
+    '/api/dashboard/{asset_id}/predictions': ('interactive', None),
+    # Cu `year` citește o partiție anuală completă, cu toate versiunile zilelor
+    '/api/dashboard/{asset_id}/actual-data': ('interactive', 8),
+    '/api/dashboard/{asset_id}/indicators': ('interactive', None),
+}
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limitează cererile costisitoare care rulează simultan pe sesiunea comună.
+    Un loc eliberat merge la cererea în așteptare cu prioritatea cea mai mare.
+    Rutele peste limita proprie primesc 429, iar cozile pline sau expirate 503.
+    Rulează pe bucla asyncio a procesului, deci starea nu are nevoie de lock-uri.
+    """
+
+    def __init__(self, capacity: int = None, classes: Dict[str, PriorityClass] = CLASSES,
+                 routes: Dict[str, Tuple[str, Optional[int]]] = ROUTE_POLICIES):
+        self.capacity = capacity or int(os.getenv("ADMISSION_CAPACITY", "32"))
+        self.classes = classes
+        self.routes = routes
+        self.order = sorted(classes, key=lambda name: classes[name].priority)
+        self.limits = {name: max(1, math.floor(self.capacity * c.share)) for name, c in classes.items()}
+
+        self.total_active = 0
+        self.active = {name: 0 for name in classes}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in classes}
+        self.route_active: Dict[str, int] = {route: 0 for route in routes}
+        self.stats = {
+            name: {'admitted': 0, 'queued': 0, 'rejected_429': 0, 'rejected_503': 0, 'wait_s': 0.0}
+            for name in classes
+        }
+
+    def _can_run(self, name: str) -> bool:
+        return self.total_active < self.capacity and self.active[name] < self.limits[name]
+
+    def _waiting_ahead(self, name: str) -> bool:
+        priority = self.classes[name].priority
+        return any(self.waiters[other] for other in self.order if self.classes[other].priority <= priority)
+
+    def _grant(self, name: str) -> None:
+        self.total_active += 1
+        self.active[name] += 1
+        self.stats[name]['admitted'] += 1
+
+    def _reject(self, route: str, name: str, status_code: int, reason: str) -> Rejected:
+        self.route_active[route] -= 1
+        self.stats[name][f'rejected_{status_code}'] += 1
+        ADMISSION_REJECTED.inc(name, str(status_code))
+        return Rejected(status_code, reason, 1 if status_code == 429 else 2)
+
+    async def acquire(self, route: str) -> str:
+        name, route_limit = self.routes[route]
+        klass = self.classes[name]
+
+        if route_limit is not None and self.route_active[route] >= route_limit:
+            self.stats[name]['rejected_429'] += 1
+            ADMISSION_REJECTED.inc(name, "429")
+            raise Rejected(429, f"Too many concurrent requests for {route}", 1)
+        self.route_active[route] += 1
+
+        if not self._waiting_ahead(name) and self._can_run(name):
+            self._grant(name)
+            return name
+
+        if len(self.waiters[name]) >= klass.max_queue:
+            raise self._reject(route, name, 503, f"Server busy: {name} queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[name].append(future)
+        self.stats[name]['queued'] += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, klass.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(name, future)
+            raise self._reject(route, name, 503, f"Server busy: waited {klass.queue_timeout:g}s for {name} capacity")
+        except asyncio.CancelledError:
+            # Clientul a renunțat; locul primit între timp se eliberează
+            granted = future.done() and not future.cancelled()
+            self._discard(name, future)
+            if granted:
+                self.release(route, name)
+            else:
+                self.route_active[route] -= 1
+            raise
+        finally:
+            self.stats[name]['wait_s'] += time.perf_counter() - started
+        return name
+
+    def _discard(self, name: str, future: asyncio.Future) -> None:
+        try:
+            self.waiters[name].remove(future)
+        except ValueError:
+            pass
+
+    def release(self, route: str, name: str) -> None:
+        self.total_active -= 1
+        self.active[name] -= 1
+        self.route_active[route] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for name in self.order:
+            queue = self.waiters[name]
+            while queue and self._can_run(name):
+                future = queue.popleft()
+                if future.done():
+                    continue
+                self._grant(name)
+                future.set_result(True)
+
+    def snapshot(self) -> Dict:
+        return {
+            'capacity': self.capacity,
+            'active': self.total_active,
+            'classes': {
+                name: {
+                    'limit': self.limits[name],
+                    'active': self.active[name],
+                    'queue_depth': len(self.waiters[name]),
+                    'max_queue': self.classes[name].max_queue,
+                    **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats[name].items()}
+                }
+                for name in self.order
+            },
+            'routes': {route: active for route, active in self.route_active.items() if active}
+        }
+
+
+class AdmissionMiddleware:
+    """Aplică admiterea rutelor din ROUTE_POLICIES; locul se ține până la finalul răspunsului"""
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController" = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    def route_of(self, scope: Scope) -> Optional[str]:
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                path = getattr(route, "path", None)
+                if path not in self.controller.routes:
+                    return None
+                # Metricile HTTP etichetează și cererile respinse cu ruta lor
+                scope["route"] = route
+                return path
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self.route_of(scope) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            name = await self.controller.acquire(route)
+        except Rejected as rejected:
+            await send({
+                "type": "http.response.start",
+                "status": rejected.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(rejected.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": dumps({"detail": rejected.reason})})
+            return
+
+        released = False
+
+        def release_once() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(route, name)
+
+        async def send_and_release(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release_once()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release_once()
+
+
+# Controlerul global al procesului și metricile lui
+admission_controller = AdmissionController()
+
+registry.gauge(
+    "admission_queue_depth", "Cereri care așteaptă un loc, per clasă", ("class",),
+    lambda: {(n,): len(q) for n, q in admission_controller.waiters.items()})
+registry.gauge(
+    "admission_active", "Cereri admise în execuție, per clasă", ("class",),
+    lambda: {(n,): v for n, v in admission_controller.active.items()})
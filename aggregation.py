@@ -1,65 +1,148 @@
-import os
-from collections import defaultdict
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
+import argparse
+import numpy as np
+from collections import Counter, defaultdict
+from datetime import datetime
 from dotenv import load_dotenv
 
+from database import EXEC_PROFILE_TUPLES, connection_manager
+from repositories import AssetsRepository, SketchRepository, TimeSeriesRepository, as_date
+from sketches import HyperLogLog, TDigest
+
 load_dotenv()
 
-ASTRA_DB_KEYSPACE = os.getenv("ASTRA_DB_KEYSPACE")
-ASTRA_DB_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
-ASTRA_DB_BUNDLE = "data/secure-connect-{}.zip".format(os.getenv("ASTRA_DB_ID"))
 
-cloud_config = {'secure_connect_bundle': ASTRA_DB_BUNDLE}
-auth_provider = PlainTextAuthProvider("token", ASTRA_DB_TOKEN)
-cluster = Cluster(cloud=cloud_config, auth_provider=auth_provider)
-session = cluster.connect()
-session.set_keyspace(ASTRA_DB_KEYSPACE)
+def connect():
+    session = connection_manager.session
+    print("✅ Connected to Cassandra.")
+    return session
 
-print("✅ Connected to Cassandra.")
 
 # ——— Aggregare 1: COUNT(*) per asset & year ———
-rows = session.execute("""
-    SELECT asset_id, business_date_year
-    FROM data
-    WHERE data_source_id = 'NASDAQ-DATA-LINK.QDL/BITFINEX'
-    ALLOW FILTERING
-""")
-counts = defaultdict(int)
-for row in rows:
-    counts[(row.asset_id, row.business_date_year)] += 1
-
-for (asset_id, year), count in counts.items():
-    session.execute("""
-        INSERT INTO totals (asset_id, business_date_year, cnt)
-        VALUES (%s, %s, %s)
-    """, (asset_id, year, count))
-print("✅ Aggregare 1 scrisă în tabela `totals`.")
+def aggregate_record_counts(session):
+    rows = session.execute("""
+        SELECT asset_id, business_date_year
+        FROM data
+        WHERE data_source_id = 'NASDAQ-DATA-LINK.QDL/BITFINEX'
+        ALLOW FILTERING
+    """, execution_profile=EXEC_PROFILE_TUPLES)
+    counts = defaultdict(int)
+    for row in rows:
+        counts[(row.asset_id, row.business_date_year)] += 1
+
+    for (asset_id, year), count in counts.items():
+        session.execute("""
+            INSERT INTO totals (asset_id, business_date_year, cnt)
+            VALUES (%s, %s, %s)
+        """, (asset_id, year, count))
+    print("✅ Aggregare 1 scrisă în tabela `totals`.")
+
 
 # ——— Aggregare 2: AVG(volume) per asset & lună ———
-rows2 = session.execute("""
-    SELECT asset_id, business_date_year, business_date_month, data_values
-    FROM data
-    ALLOW FILTERING
-""")
-
-agg2 = defaultdict(list)
-for row in rows2:
+def aggregate_monthly_avg_volume(session):
+    rows2 = session.execute("""
+        SELECT asset_id, business_date_year, business_date_month, data_values
+        FROM data
+        ALLOW FILTERING
+    """, execution_profile=EXEC_PROFILE_TUPLES)
+
+    agg2 = defaultdict(list)
+    for row in rows2:
+        try:
+            volume = row.data_values.get("volume")
+            if volume is not None:
+                k = (row.asset_id, row.business_date_year, row.business_date_month)
+                agg2[k].append(volume)
+        except Exception:
+            continue
+
+    for (asset_id, year, month), volumes in agg2.items():
+        avg_volume = sum(volumes) / len(volumes)
+        session.execute("""
+            INSERT INTO monthly_avg_volume (asset_id, business_date_year, business_date_month, avg_volume)
+            VALUES (%s, %s, %s, %s)
+        """, (asset_id, year, month, avg_volume))
+    print("✅ Aggregare 2 scrisă în tabela `monthly_avg_volume`.")
+
+
+# ——— Aggregare 3: sketch-uri lunare (randamente, volum, zile distincte) ———
+def build_monthly_sketches(session, asset_id, data_source_id='ALPHAVANTAGE'):
+    """
+    Construiește câte un t-digest pentru randamentele zilnice și volum și un
+    HyperLogLog pentru zilele de tranzacționare distincte, pe fiecare lună
+    """
+    ts_repo = TimeSeriesRepository(session)
+    sketch_repo = SketchRepository(session)
+
+    raw_rows = []
+    for year in ts_repo.find_years(asset_id, data_source_id):
+        raw_rows.extend(ts_repo.find_all({
+            'asset_id': asset_id,
+            'data_source_id': data_source_id,
+            'business_date_year': year
+        }))
+    if not raw_rows:
+        return 0
+
+    # Ultima versiune pentru fiecare dată, în ordine cronologică
+    latest = {}
+    for row in raw_rows:
+        business_date = as_date(row['business_date'])
+        if business_date not in latest or row['system_time'] > latest[business_date]['system_time']:
+            latest[business_date] = row
+    dates = sorted(latest)
+
+    closes = np.array([float(latest[d]['data_values']['close']) for d in dates])
+    volumes = np.array([float(latest[d]['data_values']['volume']) for d in dates])
+    returns = np.full(len(dates), np.nan)
+    returns[1:] = closes[1:] / closes[:-1] - 1
+
+    buckets = np.array([d.year * 12 + d.month - 1 for d in dates])
+    versions = Counter(as_date(row['business_date']) for row in raw_rows)
+
+    for bucket in np.unique(buckets):
+        mask = buckets == bucket
+        year, month = divmod(int(bucket), 12)
+        bucket_dates = [d for d, selected in zip(dates, mask) if selected]
+
+        sketch_repo.save({
+            'asset_id': asset_id,
+            'data_source_id': data_source_id,
+            'business_date_year': year,
+            'business_date_month': month + 1,
+            'returns_digest': TDigest().update(returns[mask]).to_bytes(),
+            'volume_digest': TDigest().update(volumes[mask]).to_bytes(),
+            'distinct_dates': HyperLogLog().update(d.isoformat() for d in bucket_dates).to_bytes(),
+            'row_count': sum(versions[d] for d in bucket_dates),
+            'updated_at': datetime.now()
+        })
+
+    return len(np.unique(buckets))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precalculează agregările din Cassandra")
+    parser.add_argument("--sketches-only", action="store_true",
+                        help="Construiește doar sketch-urile lunare")
+    parser.add_argument("--assets", nargs="*",
+                        help="Asset-urile pentru sketch-uri (implicit toate)")
+    parser.add_argument("--data-source", default="ALPHAVANTAGE")
+    args = parser.parse_args()
+
+    session = connect()
     try:
-        volume = row.data_values.get("volume")
-        if volume is not None:
-            k = (row.asset_id, row.business_date_year, row.business_date_month)
-            agg2[k].append(volume)
-    except Exception:
-        continue
-
-for (asset_id, year, month), volumes in agg2.items():
-    avg_volume = sum(volumes) / len(volumes)
-    session.execute("""
-        INSERT INTO monthly_avg_volume (asset_id, business_date_year, business_date_month, avg_volume)
-        VALUES (%s, %s, %s, %s)
-    """, (asset_id, year, month, avg_volume))
-print("✅ Aggregare 2 scrisă în tabela `monthly_avg_volume`.")
-
-session.shutdown()
-print("✅ Gata! Cassandra închisă. Agregările sunt live. 🚀")
+        # Agregările vechi citesc rândurile ca namedtuple, prin profilul lor
+        if not args.sketches_only:
+            aggregate_record_counts(session)
+            aggregate_monthly_avg_volume(session)
+
+        assets = args.assets or AssetsRepository(session).find_all_ids()
+        for asset_id in assets:
+            buckets = build_monthly_sketches(session, asset_id, args.data_source)
+            print(f"✅ {asset_id}: {buckets} sketch-uri lunare scrise în `monthly_sketches`.")
+    finally:
+        connection_manager.shutdown()
+    print("✅ Gata! Cassandra închisă. Agregările sunt live. 🚀")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 import os
+import asyncio
 import requests
 import time
+import numpy as np
 from datetime import date
+from typing import AsyncIterator, Dict, List, Optional
 from cassandra.cluster import Session
 from datetime import datetime
 from dotenv import load_dotenv
 from tenacity import retry, wait_exponential, stop_after_attempt
-from repositories import AssetsRepository, DataSourceRepository, TimeSeriesRepository
+from repositories import (
+    AssetsRepository, DataSourceRepository, TimeSeriesRepository, SketchRepository, YearIndexRepository
+)
+from sketches import HyperLogLog, TDigest
+from events import INGEST_COMPLETED, event_bus
+from cache import range_aggregation_cache
+from database import execute_async, prepare
+from metrics import INGEST_LATENCY, INGEST_ROWS, OUTBOUND_LATENCY
 
 load_dotenv()
 
@@ -72,6 +82,8 @@ class DataIngestionService:
         self.data_source_service = DataSourceService(session)
         self.page_size = 200  # Maxim permis de Alpha Vantage
         self.max_retries = 3
+        # Asset-urile deja asigurate în acest proces: LWT-urile nu se repetă la fiecare ingestie
+        self._ensured = set()
     
     @retry(wait=wait_exponential(multiplier=1, min=4, max=60), stop=stop_after_attempt(3))
     def fetch_alpha_vantage_page(self, symbol: str, page: int = None) -> dict:
@@ -88,6 +100,7 @@ class DataIngestionService:
         if page is None:
             url += "&outputsize=full"
         
+        started = time.perf_counter()
         try:
             response = requests.get(url)
             response.raise_for_status()
@@ -97,8 +110,10 @@ class DataIngestionService:
                 error_msg = data.get("Error Message") or data.get("Information", "Unknown error")
                 raise Exception(f"Alpha Vantage error: {error_msg}")
             
+            OUTBOUND_LATENCY.observe(time.perf_counter() - started, "alphavantage", "success")
             return data.get("Time Series (Daily)", {})
         except Exception as e:
+            OUTBOUND_LATENCY.observe(time.perf_counter() - started, "alphavantage", "error")
             raise
     
     def process_time_series_data(self, time_series: dict, symbol: str, start: date, end: date) -> list:
@@ -131,11 +146,14 @@ class DataIngestionService:
         return data_points
     
     def ingest_data(self, symbol: str, start: str, end: str) -> dict:
-        # Asigură existența asset-ului și a sursei de date
-        self.asset_service.create_asset(symbol)
-        self.data_source_service.create_data_source('ALPHAVANTAGE')
+        # Asigură existența asset-ului și a sursei de date (o singură dată per proces)
+        if symbol not in self._ensured:
+            self.asset_service.create_asset(symbol)
+            self.data_source_service.create_data_source('ALPHAVANTAGE')
+            self._ensured.add(symbol)
         
         # Extrage toate datele (Alpha Vantage nu are paginare adevărată)
+        started = time.perf_counter()
         try:
             time_series = self.fetch_alpha_vantage_page(symbol)
             data_points = self.process_time_series_data(time_series, symbol, 
@@ -147,12 +165,24 @@ class DataIngestionService:
             for i in range(0, len(data_points), batch_size):
                 batch = data_points[i:i+batch_size]
                 self.ts_repository.save_batch(batch)
+                INGEST_ROWS.inc('ALPHAVANTAGE', amount=len(batch))
                 # Respectă limitele de rate (5 cereri/minut)
                 time.sleep(12)  # 60 secunde / 5 = 12 secunde între loturi
             
+            # Anunțăm consumatorii (cache-uri, reantrenare) ce date s-au scris
+            if data_points:
+                event_bus.publish(INGEST_COMPLETED, {
+                    'asset_id': symbol,
+                    'data_source_id': 'ALPHAVANTAGE',
+                    'dates': sorted({p['business_date'] for p in data_points}),
+                    'data_points': data_points
+                })
+            
+            INGEST_LATENCY.observe(time.perf_counter() - started, 'ALPHAVANTAGE', 'success')
             return {"records_ingested": len(data_points)}
         
         except Exception as e:
+            INGEST_LATENCY.observe(time.perf_counter() - started, 'ALPHAVANTAGE', 'error')
             raise Exception(f"Data ingestion failed: {str(e)}")
             
     def get_time_series_data(
@@ -170,4 +200,205 @@ class DataIngestionService:
             'data_source_id': data_source_id,
             'business_date_year': year
         }
-        return self.ts_repository.find_all(key)
\ No newline at end of file
+        return self.ts_repository.find_all(key)
+
+class RangeAggregationService:
+    """Agregări calculate la cerere pe un interval, cu rezultate memorate"""
+
+    # Metrici disponibile, calculate vectorial pe coloanele intervalului
+    METRICS = {
+        'avg_close': lambda c: float(np.mean(c['close'])),
+        'vwap': lambda c: float(
+            np.sum((c['high'] + c['low'] + c['close']) / 3 * c['volume']) / np.sum(c['volume'])
+        ) if np.sum(c['volume']) > 0 else None,
+        'max_high': lambda c: float(np.max(c['high'])),
+        'min_low': lambda c: float(np.min(c['low'])),
+        'stddev': lambda c: float(np.std(c['close'], ddof=1)) if len(c['close']) > 1 else 0.0,
+        'avg_volume': lambda c: float(np.mean(c['volume'])),
+        'total_volume': lambda c: float(np.sum(c['volume'])),
+    }
+    DEFAULT_METRICS = ('avg_close', 'vwap', 'max_high', 'stddev')
+
+    def __init__(self, session: Session, cache=range_aggregation_cache):
+        self.ts_repository = TimeSeriesRepository(session)
+        self.cache = cache
+
+    @staticmethod
+    def to_columns(rows: list) -> dict:
+        """Transformă rândurile (data_values ca text) în coloane NumPy"""
+        columns = {}
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            columns[field] = np.fromiter(
+                (float(r['data_values'].get(field, 'nan')) for r in rows),
+                dtype=np.float64,
+                count=len(rows)
+            )
+        return columns
+
+    def aggregate(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start: date,
+        end: date,
+        metrics: list = None
+    ) -> dict:
+        metrics = list(metrics or self.DEFAULT_METRICS)
+        unknown = [m for m in metrics if m not in self.METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+
+        key = self.cache.make_key(asset_id, data_source_id, start, end, metrics)
+        cached = self.cache.get(key)
+        if cached is not None:
+            # Copie, ca apelantul să nu poată modifica intrarea partajată
+            return {**cached, 'metrics': dict(cached['metrics'])}
+
+        generation = self.cache.generation(asset_id, data_source_id)
+        rows = self.ts_repository.find_latest_per_date(asset_id, data_source_id, start, end)
+        result = {
+            'asset_id': asset_id,
+            'data_source_id': data_source_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'count': len(rows),
+            'metrics': {}
+        }
+        if rows:
+            columns = self.to_columns(rows)
+            result['metrics'] = {m: self.METRICS[m](columns) for m in metrics}
+        else:
+            result['metrics'] = {m: None for m in metrics}
+
+        self.cache.put_if_current(key, {**result, 'metrics': dict(result['metrics'])}, generation)
+        return result
+
+
+class SketchAggregationService:
+    """Combină sketch-urile lunare pe orice interval, fără a citi rândurile brute"""
+
+    DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, session: Session):
+        self.repository = SketchRepository(session)
+
+    @staticmethod
+    def quantile_label(q: float) -> str:
+        return f"p{q * 100:g}"
+
+    def summarize(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start: tuple,
+        end: tuple,
+        quantiles: list = None
+    ) -> dict:
+        quantiles = list(quantiles or self.DEFAULT_QUANTILES)
+        if any(q < 0 or q > 1 for q in quantiles):
+            raise ValueError("Quantiles must be between 0 and 1")
+
+        buckets = self.repository.find_all(
+            {'asset_id': asset_id, 'data_source_id': data_source_id}, start, end
+        )
+
+        returns, volume, distinct = TDigest(), TDigest(), HyperLogLog()
+        row_count = 0
+        for bucket in buckets:
+            returns.merge(TDigest.from_bytes(bucket['returns_digest']))
+            volume.merge(TDigest.from_bytes(bucket['volume_digest']))
+            distinct.merge(HyperLogLog.from_bytes(bucket['distinct_dates']))
+            row_count += bucket['row_count'] or 0
+
+        return {
+            'asset_id': asset_id,
+            'data_source_id': data_source_id,
+            'start': f"{start[0]:04d}-{start[1]:02d}",
+            'end': f"{end[0]:04d}-{end[1]:02d}",
+            'buckets': len(buckets),
+            'row_count': row_count,
+            'distinct_days': distinct.count() if buckets else 0,
+            'returns': {self.quantile_label(q): returns.quantile(q) for q in quantiles},
+            'volume': {self.quantile_label(q): volume.quantile(q) for q in quantiles}
+        }
+
+
+class BulkTimeSeriesService:
+    """
+    Citește seriile mai multor asset-uri deodată. Partițiile (asset, an) se
+    interoghează concurent, cu cel mult `max_in_flight` cereri în zbor, iar
+    fiecare asset este livrat imediat ce toate partițiile lui au sosit.
+    """
+
+    def __init__(self, session: Session, max_in_flight: int = None):
+        self.session = session
+        # Repository-ul configurează și dict_factory pe sesiune
+        self.repository = TimeSeriesRepository(session)
+        self.max_in_flight = max_in_flight or int(os.getenv("BULK_MAX_IN_FLIGHT", "64"))
+        self._select = None
+        self._select_index = None
+
+    def prepare(self) -> None:
+        if self._select is None:
+            self._select = prepare(self.session, TimeSeriesRepository.select_query(True, True), idempotent=True)
+            self._select_index = prepare(self.session, YearIndexRepository.SELECT, idempotent=True)
+
+    async def fetch_asset(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start_date: date,
+        end_date: date,
+        limit: Optional[int],
+        semaphore: asyncio.Semaphore
+    ) -> Dict:
+        """Ultima versiune pentru fiecare dată, descrescător; erorile rămân la nivel de asset"""
+        try:
+            if start_date.year == end_date.year:
+                years = [start_date.year]
+            else:
+                async with semaphore:
+                    index = await execute_async(self.session, self._select_index, (asset_id, data_source_id))
+                years = self.repository.select_years(index, start_date, end_date)
+
+            async def read_year(year: int) -> list:
+                async with semaphore:
+                    return await execute_async(self.session, self._select, (
+                        asset_id, data_source_id, year,
+                        max(start_date, date(year, 1, 1)), min(end_date, date(year, 12, 31))
+                    ))
+
+            partitions = await asyncio.gather(*(read_year(y) for y in years))
+
+            # Rândurile vin descrescător după (dată, system_time): primul rând al unei date e cel mai nou
+            latest = {}
+            for rows in partitions:
+                for row in rows:
+                    latest.setdefault(row['business_date'], row)
+            rows = [latest[d] for d in sorted(latest, reverse=True)]
+            return {'asset_id': asset_id, 'rows': rows[:limit] if limit else rows}
+        except Exception as e:
+            return {'asset_id': asset_id, 'error': f"{type(e).__name__}: {e}"}
+
+    async def stream(
+        self,
+        asset_ids: List[str],
+        data_source_id: str,
+        start_date: date,
+        end_date: date,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """Rezultatele per asset, în ordinea în care se termină"""
+        self.prepare()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks = [
+            asyncio.ensure_future(self.fetch_asset(a, data_source_id, start_date, end_date, limit, semaphore))
+            for a in dict.fromkeys(asset_ids)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Clientul s-a deconectat: nu mai continuăm citirile rămase
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,154 @@
+import os
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import features
+from repositories import AssetsRepository, BacktestRepository, TimeSeriesRepository
+from snapshots import load_snapshot, rows_to_columns
+
+
+def naive_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """Referință: ultimul preț cunoscut se repetă pe tot orizontul"""
+    return np.repeat(windows[:, -1:], horizon, axis=1)
+
+
+def sma_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """Referință: media ferestrei se repetă pe tot orizontul"""
+    return np.repeat(windows.mean(axis=1, keepdims=True), horizon, axis=1)
+
+
+# Modelele evaluate: (număr de prețuri necesare, funcție de predicție pe ferestre)
+MODELS: Dict[str, tuple] = {
+    'WeightedMovingAverage': (len(features.WMA_WEIGHTS), features.wma_forecast),
+    'Naive': (1, naive_forecast),
+    'SMA5': (5, sma_forecast),
+}
+
+
+def walk_forward(prices: np.ndarray, model: str, horizon: int) -> Optional[Dict]:
+    """
+    Evaluare walk-forward: din fiecare zi t se prezic zilele t+1..t+h folosind
+    doar prețurile până la t. Toate originile sunt calculate deodată, ca rânduri
+    ale unei matrice de ferestre.
+    """
+    lookback, forecast = MODELS[model]
+    origins = len(prices) - lookback - horizon + 1
+    if origins <= 0:
+        return None
+
+    windows = sliding_window_view(prices, lookback)[:origins]
+    actual = sliding_window_view(prices[lookback:], horizon)[:origins]
+    predicted = forecast(windows, horizon)
+
+    errors = np.abs(predicted - actual)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = np.where(actual != 0, errors / np.abs(actual), np.nan)
+
+    return {
+        'model_name': model,
+        'samples': int(origins),
+        'mae': errors.mean(axis=0).tolist(),
+        'mape': (np.nanmean(percentage, axis=0) * 100).tolist()
+    }
+
+
+def evaluate_asset(asset_id: str, prices: np.ndarray, models: List[str], horizon: int) -> Dict:
+    results = [walk_forward(prices, model, horizon) for model in models]
+    return {'asset_id': asset_id, 'results': [r for r in results if r is not None]}
+
+
+def load_closes(ts_repository: Optional[TimeSeriesRepository], asset_id: str,
+                data_source_id: str, start: date = None, end: date = None) -> Dict:
+    """Prețurile de închidere în ordine cronologică: din snapshot dacă există, altfel din Cassandra"""
+    end = end or date.today()
+    snapshot = load_snapshot(asset_id, data_source_id)
+    if snapshot is not None:
+        columns = snapshot.between(start or date(1900, 1, 1), end)
+    else:
+        years = ts_repository.find_years(asset_id, data_source_id)
+        if not years:
+            return {'close': np.empty(0), 'business_date': np.empty(0, dtype='datetime64[D]')}
+        start = start or date(years[0], 1, 1)
+        columns = rows_to_columns(ts_repository.find_latest_per_date(asset_id, data_source_id, start, end))
+    return {'close': np.asarray(columns['close']), 'business_date': np.asarray(columns['business_date'])}
+
+
+def run_backtests(series: Dict[str, np.ndarray], models: List[str], horizon: int,
+                  processes: int = None) -> List[Dict]:
+    """Evaluează asset-urile în paralel, într-un pool de procese"""
+    processes = min(processes or os.cpu_count() or 1, len(series)) or 1
+    if processes == 1:
+        return [evaluate_asset(a, p, models, horizon) for a, p in series.items()]
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        futures = [pool.submit(evaluate_asset, a, p, models, horizon) for a, p in series.items()]
+        return [f.result() for f in futures]
+
+
+def print_comparison(reports: List[Dict], horizon: int) -> None:
+    """Media MAE/MAPE pe toate asset-urile, per model și orizont"""
+    by_model = {}
+    for report in reports:
+        for result in report['results']:
+            by_model.setdefault(result['model_name'], []).append(result)
+
+    header = " ".join(f"h{h + 1:>2} MAE/MAPE%".rjust(18) for h in range(horizon))
+    print(f"{'Model':<24}{header}")
+    for model, results in by_model.items():
+        mae = np.mean([r['mae'] for r in results], axis=0)
+        mape = np.nanmean([r['mape'] for r in results], axis=0)
+        cells = " ".join(f"{m:>9.3f}/{p:<7.2f}".rjust(18) for m, p in zip(mae, mape))
+        print(f"{model:<24}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtesting walk-forward pentru modelele de predicție")
+    parser.add_argument("--assets", nargs="*", help="Asset-urile evaluate (implicit toate)")
+    parser.add_argument("--models", nargs="*", default=list(MODELS), choices=list(MODELS))
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    parser.add_argument("--data-source", default="ALPHAVANTAGE")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--no-store", action="store_true", help="Nu salva rezultatele în Cassandra")
+    args = parser.parse_args()
+
+    from database import connection_manager
+    session = connection_manager.session
+    try:
+        ts_repository = TimeSeriesRepository(session)
+        assets = args.assets or AssetsRepository(session).find_all_ids()
+        loaded = {a: load_closes(ts_repository, a, args.data_source, args.start, args.end) for a in assets}
+        series = {a: columns['close'] for a, columns in loaded.items()}
+
+        reports = run_backtests(series, args.models, args.horizon, args.processes)
+        print_comparison(reports, args.horizon)
+
+        if not args.no_store:
+            repository = BacktestRepository(session)
+            backtest_time = datetime.now()
+            for report in reports:
+                dates = loaded[report['asset_id']]['business_date']
+                for result in report['results']:
+                    repository.save({
+                        **result,
+                        'asset_id': report['asset_id'],
+                        'data_source_id': args.data_source,
+                        'backtest_time': backtest_time,
+                        'start_date': dates[0].item(),
+                        'end_date': dates[-1].item()
+                    })
+            print("Rezultatele au fost salvate în `backtest_results`")
+    finally:
+        connection_manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Răspunsuri Alpha Vantage (TIME_SERIES_DAILY) pentru benchmark-uri offline.
+
+Un răspuns înregistrat se salvează o singură dată cu `--record` și se reîncarcă
+la fiecare rulare; fără înregistrare se generează un răspuns determinist, în
+exact același format ("Meta Data" + "Time Series (Daily)").
+
+    python -m benchmarks.alphavantage --record IBM --output benchmarks/data/IBM.json
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict
+
+import requests
+
+SERIES_KEY = "Time Series (Daily)"
+
+
+def generate_payload(symbol: str, days: int, end: date = None, seed: int = 42) -> Dict:
+    """Răspuns sintetic: zile lucrătoare, mers aleator al prețului, volum pozitiv"""
+    rng = random.Random(seed)
+    end = end or date.today()
+    series = {}
+    close, current = 100.0, end
+    while len(series) < days:
+        if current.weekday() < 5:
+            open_ = close * (1 + rng.gauss(0, 0.005))
+            close = max(1.0, open_ * (1 + rng.gauss(0, 0.015)))
+            high = max(open_, close) * (1 + abs(rng.gauss(0, 0.005)))
+            low = min(open_, close) * (1 - abs(rng.gauss(0, 0.005)))
+            series[current.isoformat()] = {
+                "1. open": f"{open_:.4f}",
+                "2. high": f"{high:.4f}",
+                "3. low": f"{low:.4f}",
+                "4. close": f"{close:.4f}",
+                "5. volume": str(rng.randint(10 ** 5, 10 ** 7))
+            }
+        current -= timedelta(days=1)
+
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": end.isoformat(),
+            "4. Output Size": "Full size",
+            "5. Time Zone": "US/Eastern"
+        },
+        SERIES_KEY: series
+    }
+
+
+def load_payload(path: str) -> Dict:
+    with open(path) as f:
+        payload = json.load(f)
+    if SERIES_KEY not in payload:
+        raise ValueError(f"{path} is not a TIME_SERIES_DAILY response")
+    return payload
+
+
+def record_payload(symbol: str, path: str) -> int:
+    """Descarcă răspunsul complet o singură dată; întoarce numărul de zile salvate"""
+    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    if not api_key:
+        raise ValueError("Alpha Vantage API key not found in environment variables")
+    url = (f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY"
+           f"&symbol={symbol}&apikey={api_key}&outputsize=full")
+    response = requests.get(url)
+    response.raise_for_status()
+    payload = response.json()
+    if SERIES_KEY not in payload:
+        raise Exception(f"Alpha Vantage error: {payload}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f)
+    return len(payload[SERIES_KEY])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Înregistrează un răspuns Alpha Vantage pentru benchmark-uri")
+    parser.add_argument("--record", required=True, metavar="SYMBOL")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    print(f"{args.record}: {record_payload(args.record, args.output)} zile salvate în {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Microbenchmark: funcțiile din model_training vs. modulul vectorizat features.
+
+    python -m benchmarks.bench_features --assets 200 --days 2500
+"""
+import argparse
+import time
+import numpy as np
+
+import features
+from model_training import calculate_moving_average, predict_future_prices
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(assets: int, days: int, horizon: int, repeat: int) -> list:
+    rng = np.random.default_rng(42)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(assets, days)), axis=1))
+    as_lists = prices.tolist()
+
+    # Verificăm întâi că rezultatele coincid
+    assert np.allclose(features.sma(prices), [calculate_moving_average(p) for p in as_lists])
+    assert np.allclose(
+        features.wma_forecast(prices, horizon),
+        [predict_future_prices(p, horizon) for p in as_lists]
+    )
+
+    cases = [
+        ("sma(window=5)",
+         lambda: [calculate_moving_average(p) for p in as_lists],
+         lambda: features.sma(prices)),
+        (f"wma forecast (h={horizon})",
+         lambda: [predict_future_prices(p, horizon) for p in as_lists],
+         lambda: features.wma_forecast(prices, horizon)),
+    ]
+
+    results = []
+    for name, legacy, vectorized in cases:
+        legacy_s = best_of(legacy, repeat)
+        vectorized_s = best_of(vectorized, repeat)
+        results.append({
+            'name': name,
+            'legacy_s': legacy_s,
+            'vectorized_s': vectorized_s,
+            'speedup': legacy_s / vectorized_s if vectorized_s else float('inf')
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--days", type=int, default=2500)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.assets} asset-uri x {args.days} zile")
+    for r in run(args.assets, args.days, args.horizon, args.repeat):
+        print(f"{r['name']:<24} legacy {r['legacy_s']:8.4f}s  "
+              f"vectorizat {r['vectorized_s']:8.4f}s  x{r['speedup']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Microbenchmark: serializarea răspunsurilor FastAPI (jsonable_encoder + json)
+vs. serialization.dumps (orjson), plus dimensiunea după compresie.
+
+    python -m benchmarks.bench_serialization --rows 5000
+"""
+import argparse
+import gzip
+import random
+from datetime import date, datetime, timedelta
+
+from cassandra.cqltypes import UTF8Type
+from cassandra.util import Date, OrderedMapSerializedKey
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.bench_features import best_of
+from compression import brotli
+from serialization import dumps, orjson
+
+
+def make_rows(count: int) -> list:
+    """Rânduri în forma întoarsă de driver cu dict_factory (Date, map, datetime)"""
+    rng = random.Random(42)
+    start = date(2005, 1, 3)
+    rows = []
+    for i in range(count):
+        business_date = start + timedelta(days=i)
+        values = OrderedMapSerializedKey(UTF8Type, 4)
+        close = 100 + rng.gauss(0, 5)
+        for name, value in (
+            ('open', close - 1), ('high', close + 2), ('low', close - 2),
+            ('close', close), ('volume', rng.randint(10 ** 5, 10 ** 7))
+        ):
+            values._insert(name, str(value))
+        rows.append({
+            'asset_id': 'IBM',
+            'data_source_id': 'ALPHAVANTAGE',
+            'business_date_year': business_date.year,
+            'business_date': Date(business_date),
+            'system_time': datetime(2024, 1, 1) + timedelta(seconds=i),
+            'data_values': values
+        })
+    return rows
+
+
+def run(rows: int, repeat: int) -> list:
+    data = make_rows(rows)
+    cases = [
+        ("jsonable_encoder + json", lambda: JSONResponse(jsonable_encoder(data)).body),
+        (f"serialization.dumps ({'orjson' if orjson else 'json'})", lambda: dumps(data)),
+    ]
+
+    results = []
+    for name, fn in cases:
+        seconds = best_of(fn, repeat)
+        results.append({'name': name, 'seconds': seconds, 'rows_per_s': rows / seconds, 'bytes': len(fn())})
+
+    body = dumps(data)
+    sizes = [("identity", len(body)), ("gzip-6", len(gzip.compress(body, 6)))]
+    if brotli is not None:
+        sizes.append(("br-4", len(brotli.compress(body, quality=4))))
+    return results, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results, sizes = run(args.rows, args.repeat)
+    print(f"{args.rows} rânduri time_series_data")
+    for r in results:
+        print(f"{r['name']:<32} {r['seconds'] * 1000:9.2f} ms  "
+              f"{r['rows_per_s']:>12,.0f} rânduri/s  {r['bytes']:>10,} B")
+    print(f"x{results[0]['seconds'] / results[1]['seconds']:.1f} mai rapid")
+    for name, size in sizes:
+        print(f"{name:<10} {size:>10,} B")
+
+
+if __name__ == "__main__":
+    main()
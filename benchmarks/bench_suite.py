@@ -0,0 +1,289 @@
+"""
+Suita offline pentru căile fierbinți: ingestie, citiri prin API și agregări,
+peste backend-ul în memorie din benchmarks.standin și răspunsuri Alpha
+Vantage înregistrate (sau generate determinist). Nu are nevoie de Cassandra
+sau de rețea; rezultatele se salvează în JSON pentru comparații între versiuni.
+
+    python -m benchmarks.bench_suite --output baseline.json
+    python -m benchmarks.bench_suite --quick --compare baseline.json
+    python -m benchmarks.bench_suite --payload benchmarks/data/IBM.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+from unittest import mock
+
+import httpx
+import numpy as np
+
+import aggregation
+import app_services
+from app_services import DataIngestionService, RangeAggregationService
+from benchmarks.alphavantage import SERIES_KEY, generate_payload, load_payload
+from benchmarks.bench_features import best_of
+from benchmarks.standin import StandInSession
+from cache import RangeAggregationCache
+from database import connection_manager
+from feature_store import FeatureStoreUpdater
+from repositories import TimeSeriesRepository
+
+DATA_SOURCE = 'ALPHAVANTAGE'
+
+# Dimensiuni implicite și pentru --quick (verificare rapidă în CI sau local)
+FULL = {'assets': 5, 'days': 2500, 'requests': 200, 'repeat': 3}
+QUICK = {'assets': 2, 'days': 300, 'requests': 30, 'repeat': 1}
+
+
+def load_payloads(paths: List[str], assets: int, days: int) -> Dict[str, Dict]:
+    """Răspunsurile înregistrate au prioritate; restul asset-urilor primesc date generate"""
+    payloads = {}
+    for path in paths:
+        payload = load_payload(path)
+        payloads[payload["Meta Data"]["2. Symbol"]] = payload
+    for i in range(len(payloads), assets):
+        symbol = f"SYN{i:02d}"
+        payloads[symbol] = generate_payload(symbol, days, seed=i)
+    return payloads
+
+
+def ingest(session, payloads: Dict[str, Dict]) -> int:
+    """Ingestia completă din serviciu, cu răspunsul Alpha Vantage și fără pauza de rate limit"""
+    service = DataIngestionService(session)
+    service.fetch_alpha_vantage_page = lambda symbol, page=None: payloads[symbol][SERIES_KEY]
+    no_sleep = types.SimpleNamespace(perf_counter=time.perf_counter, sleep=lambda seconds: None)
+    rows = 0
+    with mock.patch.object(app_services, "time", no_sleep):
+        for symbol in payloads:
+            rows += service.ingest_data(symbol, "1900-01-01", date.today().isoformat())["records_ingested"]
+    return rows
+
+
+def bench_ingest(payloads: Dict[str, Dict], repeat: int, latency_ms: float) -> Dict:
+    timings, rows = [], 0
+    for _ in range(repeat):
+        session = StandInSession(latency_ms=latency_ms)
+        started = time.perf_counter()
+        rows = ingest(session, payloads)
+        timings.append(time.perf_counter() - started)
+    return {'rows': rows, 'seconds': min(timings), 'rows_per_s': rows / min(timings)}
+
+
+def measure(fn: Callable, repeat: int) -> Dict:
+    """Cel mai bun timp din `repeat` rulări, apoi memoria maximă alocată într-o rulare separată"""
+    seconds = best_of(fn, repeat)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'peak_kib': peak / 1024}
+
+
+def bench_aggregations(session, assets: List[str], repeat: int) -> Dict:
+    ts_repo = TimeSeriesRepository(session)
+    years = {asset: ts_repo.find_years(asset, DATA_SOURCE) for asset in assets}
+    cache = RangeAggregationCache()
+    service = RangeAggregationService(session, cache=cache)
+    updater = FeatureStoreUpdater(session)
+
+    def full_history(fn):
+        return lambda: [fn(a, date(years[a][0], 1, 1), date(years[a][-1], 12, 31)) for a in assets]
+
+    def aggregate(asset, start, end):
+        cache.clear()
+        return service.aggregate(asset, DATA_SOURCE, start, end, list(RangeAggregationService.METRICS))
+
+    cases = {
+        'find_latest_per_date': full_history(lambda a, s, e: ts_repo.find_latest_per_date(a, DATA_SOURCE, s, e)),
+        'range_aggregate': full_history(aggregate),
+        'monthly_sketches': lambda: [aggregation.build_monthly_sketches(session, a) for a in assets],
+        'feature_store_rebuild': lambda: [updater.rebuild(a, DATA_SOURCE) for a in assets],
+    }
+    return {name: measure(fn, repeat) for name, fn in cases.items()}
+
+
+def read_cases(assets: List[str], years: Dict[str, List[int]]) -> Dict[str, Callable[[int], tuple]]:
+    """Cererile per endpoint; asset-ul, anul și intervalul variază ca să nu lovim doar cache-urile"""
+    def asset(i):
+        return assets[i % len(assets)]
+
+    def year(i):
+        return years[asset(i)][i % len(years[asset(i)])]
+
+    def window(i):
+        # Intervale de 30-365 de zile, diferite la fiecare cerere
+        end = date(year(i), 12, 31) - timedelta(days=i % 180)
+        return end - timedelta(days=30 + (i * 37) % 335), end
+
+    return {
+        'time_series': lambda i: ("GET", f"/time-series/{asset(i)}/{DATA_SOURCE}", {
+            'start_date': window(i)[0].isoformat(), 'end_date': window(i)[1].isoformat(), 'limit': 1000}),
+        'dashboard_years': lambda i: ("GET", f"/api/dashboard/{asset(i)}/years", {}),
+        'dashboard_actual_data': lambda i: ("GET", f"/api/dashboard/{asset(i)}/actual-data", {'year': year(i)}),
+        'dashboard_summary': lambda i: ("GET", f"/api/dashboard/{asset(i)}/summary", {}),
+        'dashboard_indicators': lambda i: ("GET", f"/api/dashboard/{asset(i)}/indicators",
+                                           {'year': year(i), 'limit': 366}),
+        'aggregation_range': lambda i: ("GET", f"/aggregations/{asset(i)}/range", {
+            'start': window(i)[0].isoformat(), 'end': window(i)[1].isoformat()}),
+        'aggregation_percentiles': lambda i: ("GET", f"/aggregations/{asset(i)}/percentiles", {
+            'start': f"{years[asset(i)][0]}-01", 'end': f"{year(i)}-12"}),
+        'export_ndjson': lambda i: ("GET", "/export/time-series", {
+            'assets': asset(i), 'start_date': f"{year(i)}-01-01", 'end_date': f"{year(i)}-12-31"}),
+        'time_series_bulk': lambda i: ("POST", "/time-series/bulk", {'json': {
+            'assets': assets, 'start_date': window(i)[0].isoformat(), 'end_date': window(i)[1].isoformat()}}),
+    }
+
+
+async def bench_reads(session, assets: List[str], requests: int) -> Dict:
+    """Latențele endpoint-urilor prin toată stiva ASGI (middleware, cache-uri, serializare)"""
+    from controllers import app
+    from startup import startup_tracker
+
+    # Conexiunea procesului devine sesiunea în memorie; lifespan-ul rulează neschimbat
+    connection_manager.use_session(session)
+
+    ts_repo = TimeSeriesRepository(session)
+    years = {asset: ts_repo.find_years(asset, DATA_SOURCE) for asset in assets}
+    results = {}
+    async with app.router.lifespan_context(app):
+        while not startup_tracker.ready:
+            await asyncio.sleep(0.01)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, make_request in read_cases(assets, years).items():
+                latencies, errors = [], 0
+                for i in range(requests):
+                    method, url, params = make_request(i)
+                    body = params.pop('json', None)
+                    started = time.perf_counter()
+                    response = await client.request(method, url, params=params or None, json=body)
+                    latencies.append(time.perf_counter() - started)
+                    errors += response.status_code >= 400
+                ms = np.array(latencies) * 1000
+                results[name] = {
+                    'requests': requests,
+                    'errors': errors,
+                    'p50_ms': float(np.percentile(ms, 50)),
+                    'p99_ms': float(np.percentile(ms, 99)),
+                    'mean_ms': float(ms.mean())
+                }
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> Dict:
+    sizes = QUICK if args.quick else FULL
+    assets = args.assets or sizes['assets']
+    days = args.days or sizes['days']
+    requests = args.requests or sizes['requests']
+    repeat = args.repeat or sizes['repeat']
+
+    payloads = load_payloads(args.payload, assets, days)
+    session = StandInSession(latency_ms=args.latency_ms)
+
+    results = {'ingest': bench_ingest(payloads, repeat, args.latency_ms)}
+    ingest(session, payloads)
+    # Agregările întâi: sketch-urile și indicatorii sunt citiți apoi de endpoint-uri
+    results['aggregations'] = bench_aggregations(session, list(payloads), repeat)
+    results['reads'] = asyncio.run(bench_reads(session, list(payloads), requests))
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'params': {'quick': args.quick, 'assets': len(payloads), 'days': days,
+                       'requests': requests, 'repeat': repeat, 'latency_ms': args.latency_ms,
+                       'payloads': args.payload}
+        },
+        'results': results
+    }
+
+
+def flatten(results: Dict) -> Dict[str, tuple]:
+    """Metricile comparabile: (valoare, True dacă mai mare e mai bine)"""
+    metrics = {'ingest.rows_per_s': (results['ingest']['rows_per_s'], True)}
+    for name, values in results['aggregations'].items():
+        metrics[f"aggregations.{name}.seconds"] = (values['seconds'], False)
+        metrics[f"aggregations.{name}.peak_kib"] = (values['peak_kib'], False)
+    for name, values in results['reads'].items():
+        metrics[f"reads.{name}.p50_ms"] = (values['p50_ms'], False)
+        metrics[f"reads.{name}.p99_ms"] = (values['p99_ms'], False)
+    return metrics
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Afișează diferențele față de baseline; întoarce metricile care au regresat peste prag"""
+    before, after = flatten(baseline['results']), flatten(current['results'])
+    regressions = []
+    for key, (value, higher_is_better) in after.items():
+        if key not in before or not before[key][0]:
+            continue
+        change = value / before[key][0] - 1
+        worse = -change if higher_is_better else change
+        flag = "REGRESIE" if worse > threshold else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:<44} {before[key][0]:12.3f} -> {value:12.3f}  {change:+7.1%} {flag}")
+    return regressions
+
+
+def report(output: Dict) -> None:
+    results = output['results']
+    ingest_result = results['ingest']
+    print(f"ingestie: {ingest_result['rows']} rânduri în {ingest_result['seconds']:.3f}s "
+          f"({ingest_result['rows_per_s']:.0f} rânduri/s)")
+    for name, r in results['aggregations'].items():
+        print(f"{name:<24} {r['seconds'] * 1000:9.1f} ms  vârf {r['peak_kib']:9.0f} KiB")
+    for name, r in results['reads'].items():
+        print(f"{name:<24} p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  "
+              f"medie {r['mean_ms']:7.2f} ms  erori {r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Dimensiuni mici, pentru o verificare rapidă")
+    parser.add_argument("--assets", type=int, help="Numărul de asset-uri (implicit 5, --quick 2)")
+    parser.add_argument("--days", type=int, help="Zile generate per asset (implicit 2500, --quick 300)")
+    parser.add_argument("--requests", type=int, help="Cereri per endpoint (implicit 200, --quick 30)")
+    parser.add_argument("--repeat", type=int, help="Repetări pentru ingestie și agregări")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latență simulată per interogare")
+    parser.add_argument("--payload", action="append", default=[], help="Răspuns Alpha Vantage înregistrat")
+    parser.add_argument("--output", help="Fișierul JSON cu rezultatele")
+    parser.add_argument("--compare", help="Rezultate anterioare (JSON) cu care se compară")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Regresia tolerată (implicit 15%%)")
+    args = parser.parse_args()
+
+    output = run(args)
+    report(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, output, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrici au regresat peste {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
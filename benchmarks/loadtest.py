@@ -0,0 +1,342 @@
+"""
+Test de încărcare HTTP pentru API-ul pornit: un amestec configurabil de cereri
+/time-series, /aggregations/*, /api/dashboard/* și /ingest, cu sosiri în buclă
+deschisă (proces Poisson). Cererile pleacă la momentul programat indiferent
+cât de repede răspunde serverul, iar latența se măsoară de la acel moment,
+deci întârzierile clientului nu ascund saturarea serverului.
+
+    python -m benchmarks.loadtest --url http://localhost:8000 --rate 50 --duration 60
+    python -m benchmarks.loadtest --assets IBM AAPL --mix time_series=5,dashboard_summary=3
+    python -m benchmarks.loadtest --ramp 10:200:10 --duration 20 --slo-p99-ms 500 --output capacity.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+
+DATA_SOURCE = 'ALPHAVANTAGE'
+
+
+class Target(NamedTuple):
+    assets: List[str]
+    years: Dict[str, List[int]]
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    params: Dict
+    body: Optional[Dict] = None
+
+
+def _asset(rng: random.Random, target: Target) -> str:
+    return rng.choice(target.assets)
+
+
+def _window(rng: random.Random, target: Target, asset: str) -> tuple:
+    """Un interval de 1-12 luni într-un an cu date, ca să nu lovim doar cache-urile"""
+    year = rng.choice(target.years[asset])
+    end = min(date(year, 12, 31), date.today()) - timedelta(days=rng.randrange(0, 120))
+    return end - timedelta(days=rng.randrange(30, 366)), end
+
+
+def time_series(rng, target):
+    asset = _asset(rng, target)
+    start, end = _window(rng, target, asset)
+    return Request("GET", f"/time-series/{asset}/{DATA_SOURCE}",
+                   {'start_date': start.isoformat(), 'end_date': end.isoformat(), 'limit': 1000})
+
+
+def aggregation_range(rng, target):
+    asset = _asset(rng, target)
+    start, end = _window(rng, target, asset)
+    return Request("GET", f"/aggregations/{asset}/range", {'start': start.isoformat(), 'end': end.isoformat()})
+
+
+def aggregation_percentiles(rng, target):
+    asset = _asset(rng, target)
+    first, last = sorted(rng.sample(target.years[asset] * 2, 2))
+    return Request("GET", f"/aggregations/{asset}/percentiles", {'start': f"{first}-01", 'end': f"{last}-12"})
+
+
+def dashboard(endpoint: str, with_year: bool = False) -> Callable:
+    def build(rng, target):
+        asset = _asset(rng, target)
+        params = {'year': rng.choice(target.years[asset])} if with_year else {}
+        return Request("GET", f"/api/dashboard/{asset}/{endpoint}", params)
+    return build
+
+
+def ingest(rng, target):
+    # Ingestia reală apelează Alpha Vantage și respectă rate limit-ul (12 s per lot de 50)
+    end = date.today()
+    return Request("POST", f"/ingest/{_asset(rng, target)}",
+                   {'start': (end - timedelta(days=5)).isoformat(), 'end': end.isoformat()})
+
+
+SCENARIOS: Dict[str, Callable[[random.Random, Target], Request]] = {
+    'time_series': time_series,
+    'aggregation_range': aggregation_range,
+    'aggregation_percentiles': aggregation_percentiles,
+    'dashboard_summary': dashboard("summary"),
+    'dashboard_years': dashboard("years"),
+    'dashboard_actual_data': dashboard("actual-data", with_year=True),
+    'dashboard_indicators': dashboard("indicators", with_year=True),
+    'dashboard_predictions': dashboard("predictions"),
+    'ingest': ingest,
+}
+
+# Ponderile implicite; /ingest lipsește pentru că consumă cota Alpha Vantage
+DEFAULT_MIX = {
+    'time_series': 30,
+    'aggregation_range': 10,
+    'aggregation_percentiles': 5,
+    'dashboard_summary': 20,
+    'dashboard_years': 5,
+    'dashboard_actual_data': 10,
+    'dashboard_indicators': 10,
+    'dashboard_predictions': 10,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}. Available: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The traffic mix needs at least one positive weight")
+    return mix
+
+
+def parse_ramp(value: str) -> List[float]:
+    start, stop, step = (float(part) for part in value.split(":"))
+    if start <= 0 or step <= 0 or stop < start:
+        raise argparse.ArgumentTypeError("Ramp must be START:STOP:STEP with 0 < START <= STOP and STEP > 0")
+    return list(np.arange(start, stop + step / 2, step))
+
+
+class Stats:
+    """Rezultatele unei etape: latențe și coduri de răspuns per scenariu"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0
+
+    def record(self, scenario: str, latency: float, status) -> None:
+        self.latencies[scenario].append(latency)
+        self.statuses[scenario][status] += 1
+
+    @staticmethod
+    def distribution(latencies: List[float]) -> Dict:
+        if not latencies:
+            return {}
+        ms = np.array(latencies) * 1000
+        return {
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p90_ms': float(np.percentile(ms, 90)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'max_ms': float(ms.max()),
+            'mean_ms': float(ms.mean())
+        }
+
+    @staticmethod
+    def counts(statuses: Counter) -> Dict:
+        sent = sum(statuses.values())
+        ok = sum(n for status, n in statuses.items() if isinstance(status, int) and status < 400)
+        # 429/503 sunt respingeri ale controlului de admitere, nu defecte
+        shed = statuses.get(429, 0) + statuses.get(503, 0)
+        return {'sent': sent, 'ok': ok, 'shed': shed, 'errors': sent - ok - shed,
+                'error_rate': (sent - ok) / sent if sent else 0.0}
+
+    def summary(self, offered_rate: float, duration: float, elapsed: float) -> Dict:
+        total = Counter()
+        for statuses in self.statuses.values():
+            total.update(statuses)
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            'offered_rate': offered_rate,
+            # Rata efectivă a sosirilor (procesul Poisson fluctuează în jurul ratei cerute)
+            'arrival_rate': (sum(total.values()) + self.dropped) / duration,
+            'elapsed_s': elapsed,
+            'throughput': self.counts(total)['ok'] / elapsed if elapsed else 0.0,
+            'dropped': self.dropped,
+            **self.counts(total),
+            **self.distribution(every),
+            'statuses': {str(status): n for status, n in sorted(total.items(), key=str)},
+            'scenarios': {
+                name: {**self.counts(self.statuses[name]), **self.distribution(self.latencies[name])}
+                for name in sorted(self.latencies)
+            }
+        }
+
+
+async def send(client: httpx.AsyncClient, stats: Stats, scenario: str, request: Request, scheduled: float) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        response = await client.request(request.method, request.path, params=request.params, json=request.body)
+        # Corpul se citește complet: latența include și transferul răspunsului
+        await response.aread()
+        status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    except asyncio.CancelledError:
+        # Anulată la finalul etapei (după drain_timeout): se numără ca timeout
+        stats.record(scenario, loop.time() - scheduled, "timeout")
+        raise
+    stats.record(scenario, loop.time() - scheduled, status)
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    target: Target,
+    mix: Dict[str, float],
+    rate: float,
+    duration: float,
+    rng: random.Random,
+    max_in_flight: int,
+    drain_timeout: float
+) -> Dict:
+    """Trimite cereri cu sosiri Poisson de medie `rate`/s timp de `duration` secunde"""
+    stats = Stats()
+    names, weights = list(mix), list(mix.values())
+    loop = asyncio.get_running_loop()
+    in_flight = set()
+    started = scheduled = loop.time()
+
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled - started >= duration:
+            break
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            # Clientul nu mai poate ține pasul; cererea se numără, nu se amână
+            stats.dropped += 1
+            continue
+        scenario = rng.choices(names, weights)[0]
+        task = asyncio.create_task(send(client, stats, scenario, SCENARIOS[scenario](rng, target), scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        _, pending = await asyncio.wait(in_flight, timeout=drain_timeout)
+        # Cererile rămase nu mai pot ajunge în statisticile altei etape
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return stats.summary(rate, duration, loop.time() - started)
+
+
+def saturation(stage: Dict, slo_p99_ms: float, max_error_rate: float) -> List[str]:
+    """Motivele pentru care o etapă este peste capacitate (listă goală dacă nu e)"""
+    reasons = []
+    if stage['error_rate'] > max_error_rate:
+        reasons.append(f"error rate {stage['error_rate']:.1%}")
+    if stage.get('p99_ms', 0) > slo_p99_ms:
+        reasons.append(f"p99 {stage['p99_ms']:.0f} ms")
+    if stage['throughput'] < 0.9 * stage['arrival_rate']:
+        reasons.append(f"throughput {stage['throughput']:.1f}/s")
+    if stage['dropped']:
+        reasons.append(f"{stage['dropped']} dropped by the client")
+    return reasons
+
+
+async def discover(client: httpx.AsyncClient, assets: List[str]) -> Target:
+    """Anii cu date ai fiecărui asset, pentru cereri care găsesc rânduri"""
+    years = {}
+    for asset in assets:
+        response = await client.get(f"/api/dashboard/{asset}/years")
+        found = response.json() if response.status_code == 200 else []
+        years[asset] = found or [date.today().year]
+    return Target(assets, years)
+
+
+def print_stage(stage: Dict, verbose: bool) -> None:
+    print(f"rată {stage['offered_rate']:7.1f}/s  debit {stage['throughput']:7.1f}/s  "
+          f"p50 {stage.get('p50_ms', 0):7.1f} ms  p99 {stage.get('p99_ms', 0):8.1f} ms  "
+          f"erori {stage['error_rate']:6.1%}  respinse {stage['shed']}  abandonate {stage['dropped']}")
+    if verbose:
+        for name, s in stage['scenarios'].items():
+            print(f"    {name:<24} {s['sent']:6d} cereri  p50 {s.get('p50_ms', 0):7.1f} ms  "
+                  f"p99 {s.get('p99_ms', 0):8.1f} ms  erori {s['errors']}  respinse {s['shed']}")
+
+
+async def run(args) -> Dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        target = await discover(client, args.assets)
+        stages = []
+        for rate in args.ramp or [args.rate]:
+            stage = await run_stage(client, target, args.mix, float(rate), args.duration, rng,
+                                    args.max_in_flight, args.timeout)
+            stage['saturated'] = saturation(stage, args.slo_p99_ms, args.max_error_rate)
+            stages.append(stage)
+            print_stage(stage, verbose=not args.ramp)
+            if args.ramp and stage['saturated']:
+                print(f"saturat la {rate:.1f}/s: {', '.join(stage['saturated'])}")
+                break
+
+    healthy = [s['offered_rate'] for s in stages if not s['saturated']]
+    return {
+        'meta': {
+            'url': args.url,
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'assets': target.assets,
+            'mix': args.mix,
+            'duration_s': args.duration,
+            'slo_p99_ms': args.slo_p99_ms,
+            'max_error_rate': args.max_error_rate,
+            'seed': args.seed
+        },
+        # Cea mai mare rată susținută fără a depăși SLO-ul
+        'capacity': max(healthy) if healthy else None,
+        'stages': stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--assets", nargs="+", default=["IBM"])
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help=f"Ponderi scenariu=pondere, separate prin virgulă ({', '.join(SCENARIOS)})")
+    parser.add_argument("--rate", type=float, default=20.0, help="Cereri pe secundă (fără --ramp)")
+    parser.add_argument("--ramp", type=parse_ramp, help="START:STOP:STEP; se oprește la prima etapă saturată")
+    parser.add_argument("--duration", type=float, default=30.0, help="Secunde per etapă")
+    parser.add_argument("--slo-p99-ms", type=float, default=1000.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Cereri simultane maxime ale clientului")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fișierul JSON cu rezultatele")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.ramp:
+        capacity = result['capacity']
+        print(f"capacitate: {capacity:.1f} cereri/s" if capacity else "capacitate: sub prima etapă a rampei")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if not args.ramp and result['stages'][0]['saturated']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+Backend local în memorie pentru benchmark-uri: o sesiune compatibilă cu ce
+folosesc repository-urile (execute, execute_async, prepare, loturi,
+listener-e de cereri), peste tabele construite din entitățile cqlengine.
+
+Înțelege subsetul CQL scris de aplicație: INSERT (cu IF NOT EXISTS), SELECT
+cu egalitate pe cheia de partiție, intervale pe coloanele de clustering,
+ORDER BY, LIMIT, DISTINCT și alias-uri, respectiv DELETE pe cheie. Nu simulează
+rețeaua: `latency_ms` adaugă opțional o întârziere fixă per cerere.
+"""
+import itertools
+import re
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cassandra.cqlengine import columns
+from cassandra.query import BatchStatement, BoundStatement, PreparedStatement, SimpleStatement
+from cassandra.util import Date
+
+from setup_db import ENTITIES
+
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+}
+_MARKER = re.compile(r"%s|\?")
+_CONDITION = re.compile(
+    r"(?:\((?P<columns>[\w\s,]+)\)|(?P<column>\w+))\s*(?P<op>>=|<=|=|>|<)\s*"
+    r"(?:\((?P<values>[^)]*)\)|(?P<value>%s|\?|'[^']*'|-?\d+))")
+_SELECT = re.compile(
+    r"SELECT\s+(?P<distinct>DISTINCT\s+)?(?P<columns>.+?)\s+FROM\s+(?P<table>\w+)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?(?:\s+ORDER\s+BY\s+(?P<order>.+?))?"
+    r"(?:\s+LIMIT\s+(?P<limit>%s|\?|\d+))?(?:\s+ALLOW\s+FILTERING)?\s*;?$",
+    re.IGNORECASE | re.DOTALL)
+_INSERT = re.compile(
+    r"INSERT\s+INTO\s+(?P<table>\w+)\s*\((?P<columns>[^)]*)\)\s*VALUES\s*\((?P<values>[^)]*)\)"
+    r"(?P<if_not_exists>\s+IF\s+NOT\s+EXISTS)?\s*;?$",
+    re.IGNORECASE | re.DOTALL)
+_DELETE = re.compile(r"DELETE\s+FROM\s+(?P<table>\w+)\s+WHERE\s+(?P<where>.+?)\s*;?$", re.IGNORECASE | re.DOTALL)
+
+
+class Table:
+    """Partiții indexate după cheia de partiție; rândurile sortate după clustering la citire"""
+
+    def __init__(self, name: str, partition_keys: Sequence[str], clustering: Sequence[Tuple[str, bool]],
+                 date_columns: Sequence[str] = ()):
+        self.name = name
+        self.partition_keys = tuple(partition_keys)
+        self.clustering = tuple(clustering)  # (coloană, descrescător)
+        self.date_columns = frozenset(date_columns)
+        self.partitions: Dict[Tuple, Dict[Tuple, Dict]] = {}
+        self._sorted: Dict[Tuple, List[Dict]] = {}
+
+    @classmethod
+    def from_entity(cls, model) -> "Table":
+        clustering = [
+            (column.db_field_name, (column.clustering_order or 'ASC').upper() == 'DESC')
+            for column in model._clustering_keys.values()
+        ]
+        partition_keys = [column.db_field_name for column in model._partition_keys.values()]
+        date_columns = [
+            column.db_field_name for column in model._columns.values()
+            if isinstance(column, columns.Date)
+        ]
+        return cls(model.__table_name__, partition_keys, clustering, date_columns)
+
+    def coerce(self, column: str, value: Any) -> Any:
+        # Ca la serializarea driver-ului: o coloană `date` primește și datetime/ISO
+        if column in self.date_columns:
+            if isinstance(value, Date):
+                return value.date()
+            if isinstance(value, datetime):
+                return value.date()
+            if isinstance(value, str):
+                return date.fromisoformat(value[:10])
+        return value
+
+    def keys_of(self, row: Dict) -> Tuple[Tuple, Tuple]:
+        return (tuple(row.get(k) for k in self.partition_keys),
+                tuple(row.get(c) for c, _ in self.clustering))
+
+    def upsert(self, row: Dict, if_not_exists: bool = False) -> Optional[Dict]:
+        partition_key, clustering_key = self.keys_of(row)
+        partition = self.partitions.setdefault(partition_key, {})
+        existing = partition.get(clustering_key)
+        if if_not_exists and existing is not None:
+            return existing
+        if existing is None:
+            partition[clustering_key] = dict(row)
+            self._sorted.pop(partition_key, None)
+        else:
+            existing.update(row)
+        return None
+
+    def rows(self, partition_key: Tuple) -> List[Dict]:
+        rows = self._sorted.get(partition_key)
+        if rows is None:
+            rows = list(self.partitions.get(partition_key, {}).values())
+            # Sortări stabile, de la ultima coloană de clustering la prima
+            for column, descending in reversed(self.clustering):
+                rows.sort(key=lambda r: r[column], reverse=descending)
+            self._sorted[partition_key] = rows
+        return rows
+
+    def delete(self, conditions: List[Tuple[str, str, Any]]) -> None:
+        for partition_key in list(self.partitions):
+            partition = self.partitions[partition_key]
+            for clustering_key, row in list(partition.items()):
+                if _matches(row, conditions):
+                    del partition[clustering_key]
+            self._sorted.pop(partition_key, None)
+            if not partition:
+                del self.partitions[partition_key]
+
+
+def _matches(row: Dict, conditions: List[Tuple[Any, str, Any]]) -> bool:
+    for column, op, value in conditions:
+        found = tuple(row.get(c) for c in column) if isinstance(column, tuple) else row.get(column)
+        if not _OPERATORS[op](found, value):
+            return False
+    return True
+
+
+class StandInResult(list):
+    """Rezultatul unei interogări, cu interfața folosită din ResultSet"""
+
+    has_more_pages = False
+
+    @property
+    def current_rows(self) -> list:
+        return self
+
+    def one(self) -> Optional[Dict]:
+        return self[0] if self else None
+
+    @property
+    def was_applied(self) -> bool:
+        return bool(self and self[0].get('[applied]', True))
+
+
+class StandInFuture:
+    """
+    ResponseFuture minimal: callback-urile înregistrate înainte de rezolvare
+    rulează pe firul care o rezolvă, cele înregistrate după rulează imediat
+    """
+
+    has_more_pages = False
+    _col_names = None
+    _col_types = None
+    message = None
+
+    def __init__(self, query):
+        self.query = query
+        self._rows: Optional[StandInResult] = None
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Tuple] = []
+        self._errbacks: List[Tuple] = []
+
+    def _resolve(self, rows: Optional[StandInResult], error: Optional[BaseException]) -> None:
+        with self._lock:
+            self._rows, self._error = rows, error
+            self._done.set()
+            pending = list(self._errbacks if error is not None else self._callbacks)
+        for fn, args, kwargs in pending:
+            fn(error if error is not None else rows, *args, **kwargs)
+
+    def add_callback(self, fn, *args, **kwargs):
+        with self._lock:
+            self._callbacks.append((fn, args, kwargs))
+            if not self._done.is_set():
+                return
+        if self._error is None:
+            fn(self._rows, *args, **kwargs)
+
+    def add_errback(self, fn, *args, **kwargs):
+        with self._lock:
+            self._errbacks.append((fn, args, kwargs))
+            if not self._done.is_set():
+                return
+        if self._error is not None:
+            fn(self._error, *args, **kwargs)
+
+    def add_callbacks(self, callback, errback, callback_args=(), callback_kwargs=None,
+                      errback_args=(), errback_kwargs=None):
+        self.add_callback(callback, *callback_args, **(callback_kwargs or {}))
+        self.add_errback(errback, *errback_args, **(errback_kwargs or {}))
+
+    def clear_callbacks(self) -> None:
+        with self._lock:
+            self._callbacks, self._errbacks = [], []
+
+    def start_fetching_next_page(self) -> None:
+        raise RuntimeError("No more pages")
+
+    def result(self) -> StandInResult:
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._rows
+
+
+class StandInPrepared(PreparedStatement):
+    """Instrucțiune „pregătită” local; valorile legate rămân obiecte Python"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, query: str):
+        super().__init__(None, b"standin-%d" % next(self._ids), None, query, None, 4, None, None)
+
+    def bind(self, values):
+        return StandInBound(self, values)
+
+
+class StandInBound(BoundStatement):
+    def __init__(self, prepared: StandInPrepared, values=()):
+        super().__init__(prepared)
+        self.values = list(values or ())
+
+
+class StandInSession:
+    """
+    Sesiune în memorie cu tabelele aplicației. Cererile trec prin aceiași
+    listener-i ca în driver (metrici, tracing), apoi se execută sincron.
+    """
+
+    def __init__(self, entities=ENTITIES, latency_ms: float = 0.0, keyspace: str = "standin"):
+        self.tables = {model.__table_name__: Table.from_entity(model) for model in entities}
+        self.latency = latency_ms / 1000
+        self.keyspace = keyspace
+        self.encoder = None
+        self.requests = 0
+        self._listeners = []
+        self._prepared: Dict[bytes, StandInPrepared] = {}
+        self._plans: Dict[str, Tuple] = {}
+        self._lock = threading.RLock()
+        # Firele pe care se rezolvă cererile asincrone; latența simulată se suprapune între ele
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="standin")
+        # Metadatele citite de verificarea schemei la pornire
+        keyspace_meta = types.SimpleNamespace(tables=dict.fromkeys(self.tables))
+        self.cluster = types.SimpleNamespace(
+            metadata=types.SimpleNamespace(keyspaces={keyspace: keyspace_meta}),
+            shutdown=lambda: self._executor.shutdown(wait=False)
+        )
+
+    # Profilurile de execuție nu schimbă forma rândurilor aici: totul este dict
+    row_factory = property(lambda self: None, lambda self, value: None)
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def add_request_init_listener(self, fn, *args, **kwargs) -> None:
+        self._listeners.append((fn, args, kwargs))
+
+    def prepare(self, query: str) -> StandInPrepared:
+        statement = StandInPrepared(query)
+        self._prepared[statement.query_id] = statement
+        return statement
+
+    def execute(self, query, parameters=None, timeout=None, execution_profile=None, **kwargs) -> StandInResult:
+        future = self._start(query)
+        self._complete(future, parameters)
+        return future.result()
+
+    def execute_async(self, query, parameters=None, execution_profile=None, **kwargs) -> StandInFuture:
+        # Ca în driver, rezultatul sosește pe alt fir (execute_concurrent se bazează pe asta)
+        future = self._start(query)
+        self._executor.submit(self._complete, future, parameters)
+        return future
+
+    def _start(self, query) -> StandInFuture:
+        future = StandInFuture(query)
+        for fn, args, listener_kwargs in self._listeners:
+            fn(future, *args, **listener_kwargs)
+        return future
+
+    def _complete(self, future: StandInFuture, parameters) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            rows = self._dispatch(future.query, parameters)
+        except Exception as e:
+            future._resolve(None, e)
+        else:
+            future._resolve(rows, None)
+
+    # --- execuție ---
+
+    def _dispatch(self, query, parameters) -> StandInResult:
+        with self._lock:
+            self.requests += 1
+            if isinstance(query, BatchStatement):
+                for is_prepared, statement, values in query._statements_and_parameters:
+                    text = self._prepared[statement].query_string if is_prepared else statement
+                    self._run(text, values)
+                return StandInResult()
+            if isinstance(query, BoundStatement):
+                return self._run(query.prepared_statement.query_string, query.values)
+            if isinstance(query, (PreparedStatement, SimpleStatement)):
+                return self._run(query.query_string, parameters)
+            return self._run(query, parameters)
+
+    def _plan(self, text: str) -> Tuple:
+        plan = self._plans.get(text)
+        if plan is None:
+            normalized = " ".join(text.split())
+            for kind, pattern in (("select", _SELECT), ("insert", _INSERT), ("delete", _DELETE)):
+                match = pattern.match(normalized)
+                if match:
+                    plan = (kind, match.groupdict())
+                    break
+            else:
+                raise ValueError(f"Unsupported statement for the stand-in backend: {normalized[:120]}")
+            self._plans[text] = plan
+        return plan
+
+    @staticmethod
+    def _literal(token: str, values: List[Any]) -> Any:
+        if token in ('%s', '?'):
+            return values.pop(0)
+        if token.startswith("'"):
+            return token[1:-1]
+        return int(token)
+
+    def _conditions(self, table: Table, where: Optional[str], values: List[Any]) -> List[Tuple[Any, str, Any]]:
+        """(coloană, operator, valoare); comparațiile pe tupluri au coloana și valoarea tupluri"""
+        conditions = []
+        for match in _CONDITION.finditer(where or ""):
+            if match['columns']:
+                names = tuple(c.strip() for c in match['columns'].split(","))
+                tokens = [t.strip() for t in match['values'].split(",")]
+                value = tuple(table.coerce(n, self._literal(t, values)) for n, t in zip(names, tokens))
+                conditions.append((names, match['op'], value))
+            else:
+                value = table.coerce(match['column'], self._literal(match['value'], values))
+                conditions.append((match['column'], match['op'], value))
+        return conditions
+
+    def _run(self, text: str, parameters) -> StandInResult:
+        kind, parts = self._plan(text)
+        values = list(parameters or ())
+        table = self.tables.get(parts['table'])
+        if table is None:
+            # Tabele vechi în afara entităților (ex. `totals`): scrierile se ignoră, citirile sunt goale
+            return StandInResult()
+
+        if kind == "insert":
+            names = [c.strip() for c in parts['columns'].split(",")]
+            tokens = [t.strip() for t in parts['values'].split(",")]
+            row = {
+                column: table.coerce(column, self._literal(token, values))
+                for column, token in zip(names, tokens)
+            }
+            existing = table.upsert(row, if_not_exists=bool(parts['if_not_exists']))
+            if parts['if_not_exists']:
+                return StandInResult([{'[applied]': existing is None, **(existing or {})}])
+            return StandInResult()
+
+        conditions = self._conditions(table, parts['where'], values)
+        if kind == "delete":
+            table.delete(conditions)
+            return StandInResult()
+
+        limit = parts['limit']
+        limit = self._literal(limit, values) if limit else None
+
+        rows = self._select_rows(table, conditions, parts['order'])
+        if parts['distinct']:
+            names = [c.strip() for c in parts['columns'].split(",")]
+            seen = dict.fromkeys(tuple(r[n] for n in names) for r in rows)
+            return StandInResult(dict(zip(names, key)) for key in seen)
+        if limit is not None:
+            rows = rows[:int(limit)]
+        return StandInResult(self._project(table, rows, parts['columns']))
+
+    @staticmethod
+    def _select_rows(table: Table, conditions, order: Optional[str]) -> List[Dict]:
+        equal = {column: value for column, op, value in conditions if op == '='}
+        if all(k in equal for k in table.partition_keys):
+            partitions = [tuple(equal[k] for k in table.partition_keys)]
+        else:
+            # DISTINCT sau ALLOW FILTERING: se parcurg toate partițiile
+            partitions = list(table.partitions)
+
+        rows = []
+        for partition_key in partitions:
+            candidates = table.rows(partition_key)
+            if order and table.clustering:
+                first, *_ = [o.split() for o in order.split(",")]
+                descending = len(first) > 1 and first[1].upper() == 'DESC'
+                column_desc = dict(table.clustering).get(first[0], False)
+                if descending != column_desc:
+                    candidates = list(reversed(candidates))
+            rows.extend(
+                r for r in candidates
+                if _matches(r, conditions)
+            )
+        return rows
+
+    @staticmethod
+    def _project(table: Table, rows: List[Dict], selection: str) -> List[Dict]:
+        selected = None
+        if selection.strip() != '*':
+            selected = []
+            for item in selection.split(","):
+                parts = item.split()
+                selected.append((parts[0], parts[-1] if len(parts) == 3 else parts[0]))
+
+        def value(row: Dict, name: str) -> Any:
+            # Coloanele `date` vin ca cassandra.util.Date, exact ca din driver
+            found = row.get(name)
+            return Date(found) if found is not None and name in table.date_columns else found
+
+        return [
+            {alias: value(r, name) for name, alias in (selected or ((n, n) for n in r))}
+            for r in rows
+        ]
+
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from events import INGEST_COMPLETED, TRAINING_COMPLETED, event_bus
+
+
+class LRUCache:
+    """Cache LRU thread-safe cu capacitate fixă"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RangeAggregationCache(LRUCache):
+    """
+    Memorează agregările pe interval, cheie (asset, sursă, start, end, metrici).
+    Intrările care conțin datele scrise de o ingestie sunt invalidate, iar
+    generația (asset, sursă) crește, ca un calcul început înainte de ingestie
+    să nu-și poată pune rezultatul înapoi după invalidare.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__(max_entries)
+        self._generations: Dict[Tuple[str, str], int] = {}
+
+    def make_key(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start_date: date,
+        end_date: date,
+        metrics: Iterable[str]
+    ) -> Tuple:
+        return (asset_id, data_source_id, start_date, end_date, tuple(sorted(metrics)))
+
+    def generation(self, asset_id: str, data_source_id: str) -> int:
+        """Se citește înainte de calcul și se transmite la `put_if_current`"""
+        with self._lock:
+            return self._generations.get((asset_id, data_source_id), 0)
+
+    def put_if_current(self, key: Tuple, value: Any, generation: int) -> bool:
+        """Memorează rezultatul doar dacă nu a avut loc nicio invalidare între timp"""
+        with self._lock:
+            if self._generations.get((key[0], key[1]), 0) != generation:
+                return False
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, asset_id: str, data_source_id: str, dates: Iterable[date]) -> int:
+        """Elimină intervalele care conțin cel puțin una dintre datele scrise"""
+        dates = sorted(dates)
+        if not dates:
+            return 0
+        return self._invalidate(asset_id, data_source_id,
+                                lambda start, end: any(start <= d <= end for d in dates))
+
+    def invalidate_range(self, asset_id: str, data_source_id: str, first: date, last: date) -> int:
+        """Elimină intervalele care se suprapun cu [first, last]; pentru evenimentele compactate"""
+        return self._invalidate(asset_id, data_source_id, lambda start, end: start <= last and first <= end)
+
+    def _invalidate(self, asset_id: str, data_source_id: str, touched: Callable[[date, date], bool]) -> int:
+        with self._lock:
+            source = (asset_id, data_source_id)
+            self._generations[source] = self._generations.get(source, 0) + 1
+
+        removed = 0
+        for key in self.keys():
+            key_asset, key_source, start_date, end_date, _ = key
+            if key_asset != asset_id or key_source != data_source_id:
+                continue
+            if touched(start_date, end_date):
+                self.discard(key)
+                removed += 1
+        return removed
+
+    def on_ingest(self, event: Dict[str, Any]) -> None:
+        asset_id, data_source_id = event['asset_id'], event['data_source_id']
+        if 'date_range' in event:
+            first, last = event['date_range']
+            self.invalidate_range(asset_id, data_source_id, first, last)
+        elif event.get('compacted'):
+            # Eveniment redus la identificatori: tot asset-ul
+            self.invalidate_range(asset_id, data_source_id, date.min, date.max)
+        else:
+            self.invalidate(asset_id, data_source_id, event.get('dates', []))
+
+
+# Cache-ul global al agregărilor ad-hoc
+range_aggregation_cache = RangeAggregationCache()
+event_bus.subscribe(INGEST_COMPLETED, range_aggregation_cache.on_ingest)
+
+
+class PredictionCache(LRUCache):
+    """
+    Ultima rulare de predicții per asset, servită din memorie. Intrarea este
+    înlocuită la finalul fiecărei antrenări din proces; `ttl` (secunde), dacă
+    este setat, prinde rulările făcute din alte procese, de ex. `python model_training.py`.
+    Asset-urile fără rulări în registru folosesc tabela veche `predictions`,
+    memorată separat, inclusiv rezultatele goale.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Dict]] = None,
+                 legacy_loader: Callable[[str], list] = None,
+                 max_entries: int = 4096, ttl: Optional[float] = None):
+        super().__init__(max_entries)
+        self.loader = loader
+        self.legacy_loader = legacy_loader
+        self.legacy = LRUCache(max_entries)
+        self.ttl = ttl
+
+    def _fresh(self, entry: Optional[Tuple[float, Any]]) -> bool:
+        return entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl)
+
+    def get_run(self, asset_id: str) -> Optional[Dict]:
+        entry = self.get(asset_id)
+        if self._fresh(entry):
+            return entry[1]
+
+        run = self.loader(asset_id)
+        self.put(asset_id, (time.monotonic(), run))
+        return run
+
+    def run_token(self, asset_id: str) -> str:
+        """Identitatea scurtă a rulării servite acum (sau "0"), pentru ETag-uri"""
+        run = self.get_run(asset_id)
+        if run is None:
+            return "0"
+        return hashlib.blake2b(str(run['run_id']).encode('utf-8'), digest_size=4).hexdigest()
+
+    def get_legacy(self, asset_id: str) -> list:
+        entry = self.legacy.get(asset_id)
+        if self._fresh(entry):
+            return entry[1]
+
+        rows = self.legacy_loader(asset_id)
+        self.legacy.put(asset_id, (time.monotonic(), rows))
+        return rows
+
+    def on_training_completed(self, event: Dict[str, Any]) -> None:
+        self.legacy.discard(event['asset_id'])
+        if event.get('run') is not None:
+            self.put(event['asset_id'], (time.monotonic(), event['run']))
+        else:
+            self.discard(event['asset_id'])
+
+    def clear(self) -> None:
+        super().clear()
+        self.legacy.clear()
+
+
+# Cache-ul global al predicțiilor servite online
+_prediction_ttl = os.getenv("PREDICTION_CACHE_TTL")
+prediction_cache = PredictionCache(ttl=float(_prediction_ttl) if _prediction_ttl else None)
+event_bus.subscribe(TRAINING_COMPLETED, prediction_cache.on_training_completed)
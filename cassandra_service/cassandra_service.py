@@ -1,41 +1,34 @@
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from database import EXEC_PROFILE_TUPLES, connection_manager
 
 class CassandraService:
-    def __init__(self):
-        self.cluster = None
-        self.session = None
-        
+    def __init__(self, manager=connection_manager):
+        self.manager = manager
+
+    @property
+    def cluster(self):
+        return self.manager.cluster
+
+    @property
+    def session(self):
+        return self.manager.session if self.manager.connected else None
+
     def connect(self):
-        cloud_config = {
-            'secure_connect_bundle': 'data/secure-connect-dw-cassandra.zip'
-        }
-        auth_provider = PlainTextAuthProvider(
-            'token',
-            os.getenv("ASTRA_DB_APPLICATION_TOKEN")
-        )
-        self.cluster = Cluster(cloud=cloud_config, auth_provider=auth_provider)
-        self.session = self.cluster.connect(os.getenv("ASTRA_DB_KEYSPACE"))
-        
+        # Conexiunea comună a procesului; managerul instalează și metricile
+        self.manager.connect()
+
     def get_session(self):
-        if not self.session:
-            self.connect()
-        return self.session
-    
+        return self.manager.session
+
     def close(self):
-        if self.cluster:
-            self.cluster.shutdown()
-            
+        self.manager.shutdown()
+
     def execute_query(self, query, params=None):
         try:
-            return self.get_session().execute(query, params)
+            # Rutele API citesc rândurile ca namedtuple (row.id)
+            return self.get_session().execute(query, params, execution_profile=EXEC_PROFILE_TUPLES)
         except Exception as e:
             print(f"Eroare la executarea query: {e}")
             raise
 
 # Inițializează serviciul global
-cassandra_service = CassandraService()
\ No newline at end of file
+cassandra_service = CassandraService()
@@ -1,53 +1,154 @@
-from fastapi import FastAPI, HTTPException, Query, Path
+import asyncio
+import os
+from fastapi import FastAPI, HTTPException, Query, Path, Request
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
-from database import get_cassandra_session
-from app_services import AssetService, DataIngestionService
+from database import connection_manager
+from app_services import (
+    AssetService,
+    DataIngestionService,
+    RangeAggregationService,
+    SketchAggregationService,
+    BulkTimeSeriesService
+)
 from dotenv import load_dotenv
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
-from typing import AsyncIterator
+from typing import AsyncIterator, List, Optional
 from datetime import date
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 import json
-from repositories import TimeSeriesRepository
+from repositories import HOT_STATEMENTS, DataSourceRepository, TimeSeriesRepository
+from retraining import RetrainingScheduler
+from model_registry import ModelRegistry
+from cache import prediction_cache
+from feature_store import FeatureStoreUpdater
+from repositories import IndicatorRepository
+from http_cache import DATA, PREDICTIONS, StaticPage, response_cache
+from events import INGEST_COMPLETED, TRAINING_COMPLETED, WorkerRelay
+from streaming import event_stream, latest_rows_per_year
+from exports import MEDIA_TYPES, export_stream, validate_format
+from serialization import FastJSONResponse, dumps
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware, registry as metrics_registry
+from tracing import TracingMiddleware, install_query_tracing
+from admission import AdmissionMiddleware, admission_controller
+from initialize_data import initialize_required_data
+from setup_db import missing_tables
+from startup import logger as startup_logger, startup_tracker
+
+# Pagina dashboard-ului, servită precomprimată din memorie
+dashboard_page = StaticPage(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "dashboard.html"))
 
 load_dotenv()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    session, cluster = get_cassandra_session()
-    app.state.session = session
-    app.state.cluster = cluster
-    app.state.asset_service = AssetService(app.state.session)
-    app.state.data_ingestion_service = DataIngestionService(app.state.session)
-
-    from initialize_data import initialize_required_data
-    initialize_required_data(app.state.session)
-
-    yield
-
-    cluster.shutdown()
+async def warm_up(app: FastAPI) -> None:
+    """Pașii de după conectare; instanța devine gata când instrucțiunile fierbinți sunt pregătite"""
+    session = app.state.session
+    tracker = startup_tracker
+    # Verificarea schemei și pregătirea instrucțiunilor rulează concurent
+    missing, _ = await asyncio.gather(
+        tracker.run("schema_check", missing_tables, session),
+        tracker.run("prepare_statements", connection_manager.warm_up, HOT_STATEMENTS),
+    )
+    tracker.details['missing_tables'] = missing or []
+    if missing:
+        startup_logger.warning("missing tables %s, run `python setup_db.py`", ", ".join(missing))
+    await tracker.run("prepare_bulk", app.state.bulk_time_series_service.prepare)
+    failed = [name for name in ("prepare_statements", "prepare_bulk") if tracker.status.get(name) != "ok"]
+    if failed:
+        # Fără instrucțiunile pregătite instanța nu primește trafic: /ready rămâne 503, cu eroarea
+        startup_logger.error("not ready, failed phases: %s", ", ".join(failed))
+    else:
+        tracker.mark_ready()
+    # Seed-ul este idempotent și nu blochează traficul
+    await tracker.run("seed_data", initialize_required_data, session)
 
-app = FastAPI(lifespan=lifespan)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    # Cod de inițializare la pornirea aplicației
-    session, cluster = get_cassandra_session()
-    app.state.session = session
-    app.state.cluster = cluster
-    app.state.asset_service = AssetService(app.state.session)
-    app.state.data_ingestion_service = DataIngestionService(app.state.session)
-    
-    # Importul și inițializarea datelor necesare (ex: data sources, assets)
-    # Asigură-te că `initialize_data` este un modul valid și că funcția este corectă
-    from initialize_data import initialize_required_data
-    initialize_required_data(app.state.session)
-    
+    tracker = startup_tracker
+    tracker.reset()
+
+    # Conexiunea comună a procesului (metricile driver-ului se instalează la conectare)
+    with tracker.phase("connect"):
+        session = await run_in_threadpool(connection_manager.connect)
+        install_query_tracing(session)
+
+    with tracker.phase("services"):
+        app.state.session = session
+        app.state.cluster = connection_manager.cluster
+        app.state.asset_service = AssetService(session)
+        app.state.data_ingestion_service = DataIngestionService(session)
+        app.state.range_aggregation_service = RangeAggregationService(session)
+        app.state.sketch_aggregation_service = SketchAggregationService(session)
+        app.state.bulk_time_series_service = BulkTimeSeriesService(session)
+        app.state.model_registry = ModelRegistry(session)
+        prediction_cache.loader = app.state.model_registry.latest_run
+        prediction_cache.legacy_loader = load_legacy_predictions
+
+        # Reantrenare automată a asset-urilor atinse de ingestie
+        app.state.retraining_scheduler = RetrainingScheduler(session)
+        app.state.retraining_scheduler.start()
+        app.state.feature_store_updater = FeatureStoreUpdater(session)
+        app.state.feature_store_updater.start()
+        # Ultimul abonat: versiunile cresc după ce consumatorii ingestiei au scris
+        response_cache.start()
+        dashboard_page.load()
+        # Datele noi și predicțiile ajung la dashboard-urile deschise prin SSE
+        event_stream.start(asyncio.get_running_loop())
+        event_stream.forward(INGEST_COMPLETED, "data", lambda e: latest_rows_per_year(e.get('data_points', [])))
+        event_stream.forward(TRAINING_COMPLETED, "predictions", lambda e: format_run_predictions(e['run'])[:5])
+        # Cu mai multe procese worker, evenimentele ajung și la cache-urile și stream-urile celorlalte
+        relay_dir = os.getenv("WORKER_RELAY_DIR")
+        app.state.worker_relay = WorkerRelay(relay_dir) if relay_dir else None
+        if app.state.worker_relay is not None:
+            app.state.worker_relay.start()
+        tracker.details['pid'] = os.getpid()
+
+    # Serverul acceptă conexiuni imediat; /ready răspunde 200 după warm-up
+    warm_up_task = asyncio.create_task(warm_up(app))
+
     yield  # Aici aplicația rulează
-    
+
     # Cod de curățare la oprirea aplicației
-    cluster.shutdown()
+    warm_up_task.cancel()
+    if app.state.worker_relay is not None:
+        app.state.worker_relay.stop()
+    event_stream.stop()
+    response_cache.stop()
+    app.state.feature_store_updater.stop()
+    app.state.retraining_scheduler.stop()
+    connection_manager.shutdown()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(TracingMiddleware)
+# Cererile respinse la suprasarcină nu mai trec prin tracing și compresie
+app.add_middleware(AdmissionMiddleware)
+# Ultimul adăugat rulează primul: măsoară și timpul de compresie
+app.add_middleware(MetricsMiddleware)
+
+# Liveness: procesul răspunde
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+# Readiness: conexiune deschisă și instrucțiunile fierbinți pregătite
+@app.get("/ready")
+async def ready():
+    return FastJSONResponse(startup_tracker.snapshot(), status_code=200 if startup_tracker.ready else 503)
+
+# Metrici în formatul text Prometheus
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Starea controlului de admitere: locuri ocupate, cozi și respingeri per clasă
+@app.get("/admission")
+async def get_admission_stats():
+    return FastJSONResponse(admission_controller.snapshot())
 
 # Endpoint pentru crearea unui nou asset
 @app.post("/assets/{symbol}", response_model=dict)
@@ -66,7 +167,8 @@ async def ingest_data(
     end: str = Query(default=datetime.now().strftime('%Y-%m-%d'))
 ):
     try:
-        result = app.state.data_ingestion_service.ingest_data(symbol, start, end)
+        # Ingestia blochează (HTTP + pauze de rate limit); rulează în afara buclei
+        result = await run_in_threadpool(app.state.data_ingestion_service.ingest_data, symbol, start, end)
         return {
             "status": "success",
             "symbol": symbol,
@@ -80,7 +182,7 @@ async def ingest_data(
 async def get_asset(asset_id: str = Path(..., title="ID-ul asset-ului")):
     try:
         # Presupunând că AssetService are un atribut `repository` cu metoda `find_all`
-        return app.state.asset_service.repository.find_all(asset_id)
+        return FastJSONResponse(app.state.asset_service.repository.find_all(asset_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -88,9 +190,8 @@ async def get_asset(asset_id: str = Path(..., title="ID-ul asset-ului")):
 @app.get("/data-sources/{data_source_id}", response_model=list)
 async def get_data_source(data_source_id: str = Path(..., title="ID-ul sursei de date")):
     try:
-        from repositories import DataSourceRepository
         repo = DataSourceRepository(app.state.session)
-        return repo.find_all(data_source_id)
+        return FastJSONResponse(repo.find_all(data_source_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -112,8 +213,7 @@ async def get_time_series_data(
                 status_code=400, 
                 detail="start_date must be before end_date"
             )
-            
-        from repositories import TimeSeriesRepository
+
         repo = TimeSeriesRepository(app.state.session)
         
         # Setare valori implicite pentru intervalul de date dacă nu sunt specificate
@@ -129,11 +229,65 @@ async def get_time_series_data(
             start_date,
             end_date
         )
-        return data[offset:offset+limit]
+        return FastJSONResponse(data[offset:offset+limit])
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+# Cerere pentru mai multe asset-uri deodată (ex. ecrane de portofoliu)
+class BulkTimeSeriesRequest(BaseModel):
+    assets: List[str] = Field(..., min_length=1, max_length=500)
+    data_source_id: str = "ALPHAVANTAGE"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    # Ultimele N zile per asset; implicit tot intervalul
+    limit: Optional[int] = Field(None, ge=1)
+
+@app.post("/time-series/bulk")
+async def get_time_series_bulk(body: BulkTimeSeriesRequest):
+    end_date = body.end_date or date.today()
+    start_date = body.start_date or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    # NDJSON: câte o linie per asset, cu `rows` sau `error`, în ordinea terminării
+    async def lines():
+        async for result in app.state.bulk_time_series_service.stream(
+            body.assets, body.data_source_id, start_date, end_date, body.limit
+        ):
+            yield dumps(result) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Export în flux pentru intervale mari: memorie constantă, indiferent de interval
+@app.get("/export/time-series")
+async def export_time_series(
+    assets: List[str] = Query(..., title="Asset-urile exportate"),
+    data_source_id: str = Query("ALPHAVANTAGE"),
+    # Implicit tot istoricul; anii fără date sunt săriți prin indexul de ani
+    start_date: date = Query(date(1900, 1, 1)),
+    end_date: date = Query(None),
+    format: str = Query("ndjson", title="ndjson, csv sau arrow"),
+    compression: Optional[str] = Query(None, pattern="^gzip$")
+):
+    end_date = end_date or date.today()
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+    try:
+        validate_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"Content-Disposition": f'attachment; filename="time-series.{format}"'}
+    if compression == "gzip":
+        headers["Content-Encoding"] = "gzip"
+
+    chunks = export_stream(
+        TimeSeriesRepository(app.state.session),
+        assets, data_source_id, start_date, end_date, format, compression
+    )
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers=headers)
+
 # Agregări adăugate la sfârșitul fișierului `controllers.py`
 @app.get("/aggregations/record-counts", response_model=list)
 async def get_record_counts():
@@ -144,7 +298,7 @@ async def get_record_counts():
     try:
         query = "SELECT asset_id, business_date_year AS year, cnt AS count FROM totals"
         rows = app.state.session.execute(query)
-        return [dict(row) for row in rows]
+        return FastJSONResponse([dict(row) for row in rows])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -157,7 +311,7 @@ async def get_avg_volume():
     try:
         query = "SELECT asset_id, business_date_year AS year, business_date_month AS month, avg_volume FROM monthly_avg_volume"
         rows = app.state.session.execute(query)
-        return [dict(row) for row in rows]
+        return FastJSONResponse([dict(row) for row in rows])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -169,431 +323,243 @@ async def get_avg_volume_by_asset(asset_id: str):
     try:
         query = "SELECT asset_id, business_date_year AS year, business_date_month AS month, avg_volume FROM monthly_avg_volume WHERE asset_id = %s"
         rows = app.state.session.execute(query, [asset_id])
-        return [dict(row) for row in rows]
+        return FastJSONResponse([dict(row) for row in rows])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/aggregations/{asset_id}/range")
+async def get_range_aggregation(
+    asset_id: str,
+    start: date = Query(..., title="Începutul intervalului"),
+    end: date = Query(..., title="Sfârșitul intervalului"),
+    metrics: str = Query(",".join(RangeAggregationService.DEFAULT_METRICS)),
+    data_source_id: str = Query("ALPHAVANTAGE")
+):
+    """
+    Calculează la cerere agregări pe interval din time_series_data
+    Exemplu: /aggregations/IBM/range?start=2024-01-01&end=2024-06-30&metrics=avg_close,vwap
+    """
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    requested = [m.strip() for m in metrics.split(",") if m.strip()]
+    try:
+        return FastJSONResponse(app.state.range_aggregation_service.aggregate(
+            asset_id, data_source_id, start, end, requested
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def parse_month(value: str) -> tuple:
+    """Transformă 'YYYY-MM' în (an, lună)"""
+    try:
+        parsed = datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid month '{value}', expected YYYY-MM")
+    return parsed.year, parsed.month
+
+@app.get("/aggregations/{asset_id}/percentiles")
+async def get_percentiles(
+    asset_id: str,
+    start: str = Query(..., title="Prima lună (YYYY-MM)"),
+    end: str = Query(..., title="Ultima lună (YYYY-MM)"),
+    quantiles: str = Query("0.5,0.95,0.99"),
+    data_source_id: str = Query("ALPHAVANTAGE")
+):
+    """
+    Percentile aproximative pentru randamente și volum, combinând sketch-urile lunare
+    Exemplu: /aggregations/IBM/percentiles?start=2020-01&end=2024-12
+    """
+    start_month, end_month = parse_month(start), parse_month(end)
+    if start_month > end_month:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    try:
+        requested = [float(q) for q in quantiles.split(",") if q.strip()]
+        return FastJSONResponse(app.state.sketch_aggregation_service.summarize(
+            asset_id, data_source_id, start_month, end_month, requested
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 load_dotenv()
 
 @app.get("/api/dashboard/{asset_id}/years", response_model=list)
-async def get_available_years(asset_id: str):
+async def get_available_years(asset_id: str, request: Request):
     try:
-        query = """
-            SELECT business_date_year 
-            FROM time_series_data 
-            WHERE asset_id = %s AND data_source_id = 'ALPHAVANTAGE' 
-            ALLOW FILTERING
-        """
-        rows = app.state.session.execute(query, [asset_id])
-        
-        # Construim un set de ani unici — folosind accesare dict dacă rezultatul e dict
-        years = {row["business_date_year"] for row in rows if "business_date_year" in row}
-        return sorted(years)
+        return response_cache.respond(request, asset_id, DATA, lambda: load_available_years(asset_id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def load_available_years(asset_id: str) -> list:
+    # Anii vin din indexul `asset_year_index` (o singură partiție), nu dintr-o scanare
+    return TimeSeriesRepository(app.state.session).find_years(asset_id, 'ALPHAVANTAGE')
 
+# Datele inițiale ale dashboard-ului (ani, ultimele zile, predicții) într-o singură cerere
+@app.get("/api/dashboard/{asset_id}/summary")
+async def get_dashboard_summary(asset_id: str, request: Request):
+    try:
+        return await response_cache.respond_async(
+            request, asset_id, (DATA, PREDICTIONS), lambda: load_dashboard_summary(asset_id)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_dashboard_summary(asset_id: str) -> dict:
+    # Cele trei interogări rulează concurent, fiecare pe un fir din threadpool
+    years, actual_data, predictions = await asyncio.gather(
+        run_in_threadpool(load_available_years, asset_id),
+        run_in_threadpool(load_actual_data, asset_id),
+        run_in_threadpool(load_predictions, asset_id)
+    )
+    return {
+        'asset_id': asset_id,
+        'years': years,
+        'actual_data': actual_data,
+        'predictions': predictions
+    }
+
+# Stream SSE cu rândurile ingerate și predicțiile noi ale unui asset
+@app.get("/api/dashboard/{asset_id}/stream")
+async def stream_dashboard_updates(asset_id: str, request: Request):
+    return StreamingResponse(
+        event_stream.stream(request, asset_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Endpoint pentru predicții
 @app.get("/api/dashboard/{asset_id}/predictions")
-async def get_predictions_data(asset_id: str):
+async def get_predictions_data(asset_id: str, request: Request):
     try:
-        pred_query = "SELECT * FROM predictions WHERE asset_id = %s ORDER BY prediction_date ASC LIMIT 5"
-        prediction_rows = list(app.state.session.execute(pred_query, [asset_id]))
-        
-        # Formatare timpi de predicție
-        formatted_rows = []
-        for p in prediction_rows:
-            row = dict(p)
-            if hasattr(p['prediction_time'], 'strftime'):
-                row['formatted_time'] = p['prediction_time'].strftime('%Y-%m-%d %H:%M')
-            else:
-                row['formatted_time'] = str(p['prediction_time'])
-            formatted_rows.append(row)        
-        return formatted_rows
+        return response_cache.respond(request, asset_id, PREDICTIONS, lambda: load_predictions(asset_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Adăugăm un nou endpoint pentru datele efective (ultimele 5 zile)
-@app.get("/api/dashboard/{asset_id}/actual-data")
-async def get_actual_data(asset_id: str, year: int = None):
-    try:
-        ts_repo = TimeSeriesRepository(app.state.session)
+def load_predictions(asset_id: str) -> list:
+    # Ultima rulare a modelului, servită din cache-ul de predicții
+    run = prediction_cache.get_run(asset_id)
+    if run is not None:
+        return format_run_predictions(run)[:5]
+
+    # Compatibilitate: asset-uri antrenate înainte de registrul de modele
+    return prediction_cache.get_legacy(asset_id)
 
-        if year:
-            start_date = date(year, 1, 1)
-            end_date = date(year, 12, 31)
+def load_legacy_predictions(asset_id: str) -> list:
+    pred_query = "SELECT * FROM predictions WHERE asset_id = %s ORDER BY prediction_date ASC LIMIT 5"
+    prediction_rows = list(app.state.session.execute(pred_query, [asset_id]))
+    
+    # Formatare timpi de predicție
+    formatted_rows = []
+    for p in prediction_rows:
+        row = dict(p)
+        if hasattr(p['prediction_time'], 'strftime'):
+            row['formatted_time'] = p['prediction_time'].strftime('%Y-%m-%d %H:%M')
         else:
-            end_date = date.today()
-            start_date = end_date - timedelta(days=5)
+            row['formatted_time'] = str(p['prediction_time'])
+        formatted_rows.append(row)        
+    return formatted_rows
+
+def format_run_predictions(run: dict) -> list:
+    """Rândurile unei rulări în formatul așteptat de dashboard"""
+    return [
+        {
+            'asset_id': run['asset_id'],
+            'prediction_date': p['prediction_date'],
+            'predicted_close': p['predicted_close'],
+            'prediction_time': run['created_at'],
+            'formatted_time': run['created_at'].strftime('%Y-%m-%d %H:%M'),
+            'model_name': run['model_name'],
+            'model_version': run['model_version'],
+            'run_id': str(run['run_id'])
+        }
+        for p in run['predictions']
+    ]
 
-        actual_data = ts_repo.find_latest_per_date(
-            asset_id, 'ALPHAVANTAGE', start_date, end_date
-        )
+# Inferență online: ultima rulare servită din memorie
+@app.get("/predict/{asset_id}")
+async def predict(asset_id: str):
+    try:
+        run = prediction_cache.get_run(asset_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No model run for {asset_id}")
+    return FastJSONResponse(run)
 
-        # Sortăm descrescător după dată și luăm ultimele 5
-        actual_data_sorted = sorted(
-            actual_data, key=lambda x: x['business_date'], reverse=True
-        )[:5]
+# Registrul de modele
+@app.get("/models/{model_name}", response_model=list)
+async def get_model_versions(model_name: str):
+    try:
+        return FastJSONResponse(app.state.model_registry.list_models(model_name))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return actual_data_sorted
+@app.get("/models/runs/{asset_id}", response_model=list)
+async def get_model_runs(asset_id: str, limit: int = Query(20, ge=1, le=1000)):
+    try:
+        runs = app.state.model_registry.list_runs(asset_id, limit)
+        return FastJSONResponse(runs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+# Adăugăm un nou endpoint pentru datele efective (ultimele 5 zile)
+@app.get("/api/dashboard/{asset_id}/actual-data")
+async def get_actual_data(asset_id: str, request: Request, year: int = None):
+    try:
+        return response_cache.respond(request, asset_id, DATA, lambda: load_actual_data(asset_id, year))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Actualizăm endpoint-ul principal pentru dashboard
+def load_actual_data(asset_id: str, year: int = None) -> list:
+    ts_repo = TimeSeriesRepository(app.state.session)
+
+    if year:
+        start_date = date(year, 1, 1)
+        end_date = date(year, 12, 31)
+    else:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=5)
+
+    actual_data = ts_repo.find_latest_per_date(
+        asset_id, 'ALPHAVANTAGE', start_date, end_date
+    )
+
+    # Sortăm descrescător după dată și luăm ultimele 5
+    actual_data_sorted = sorted(
+        actual_data, key=lambda x: x['business_date'], reverse=True
+    )[:5]
+
+    return actual_data_sorted
+
+# Indicatorii tehnici din feature store (ultimele 5 zile sau un an întreg)
+@app.get("/api/dashboard/{asset_id}/indicators")
+async def get_indicators(
+    asset_id: str,
+    request: Request,
+    year: int = None,
+    limit: int = Query(5, ge=1, le=366)
+):
+    try:
+        return response_cache.respond(request, asset_id, DATA, lambda: load_indicators(asset_id, year, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def load_indicators(asset_id: str, year: int = None, limit: int = 5) -> list:
+    repo = IndicatorRepository(app.state.session)
+    if year:
+        rows = repo.find_range(asset_id, 'ALPHAVANTAGE', date(year, 1, 1), date(year, 12, 31))
+    else:
+        rows = repo.find_latest({'asset_id': asset_id, 'data_source_id': 'ALPHAVANTAGE'}, limit)
+
+    # Descrescător după dată, ca în tabelul de date efective
+    return list(reversed(rows))[:limit]
+
+# Pagina dashboard-ului: un fișier static, identic pentru toate asset-urile
 @app.get("/dashboard/{asset_id}", response_class=HTMLResponse)
-async def dashboard(asset_id: str):
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="ro">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Dashboard Financiar - {asset_id}</title>
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-        <style>
-            * {{
-                box-sizing: border-box;
-                margin: 0;
-                padding: 0;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            }}
-            
-            body {{
-                background-color: #f5f7fa;
-                color: #333;
-                line-height: 1.6;
-                padding: 20px;
-            }}
-            
-            .container {{
-                max-width: 1200px;
-                margin: 0 auto;
-            }}
-            
-            header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 30px;
-                padding-bottom: 15px;
-                border-bottom: 1px solid #e0e6ed;
-            }}
-            
-            .logo {{
-                font-size: 24px;
-                font-weight: 700;
-                color: #2563eb;
-            }}
-            
-            .card-container {{
-                display: flex;
-                flex-direction: column;
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            
-            .card {{
-                background: white;
-                border-radius: 10px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                padding: 25px;
-                transition: transform 0.3s ease;
-            }}
-            
-            .card:hover {{
-                transform: translateY(-5px);
-                box-shadow: 0 6px 12px rgba(0, 0, 0, 0.15);
-            }}
-            
-            .card-title {{
-                display: flex;
-                align-items: center;
-                margin-bottom: 20px;
-                color: #1e293b;
-                font-size: 1.2rem;
-            }}
-            
-            .card-title i {{
-                margin-right: 10px;
-                font-size: 1.4rem;
-            }}
-            
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-top: 15px;
-            }}
-            
-            th, td {{
-                padding: 12px 15px;
-                text-align: left;
-                border-bottom: 1px solid #e2e8f0;
-            }}
-            
-            th {{
-                background-color: #f1f5f9;
-                font-weight: 600;
-            }}
-            
-            tbody tr:hover {{
-                background-color: #f8fafc;
-            }}
-            
-            .loader {{
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                padding: 30px;
-            }}
-            
-            .spinner {{
-                width: 40px;
-                height: 40px;
-                border: 4px solid rgba(0, 0, 0, 0.1);
-                border-left-color: #2563eb;
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-                margin-bottom: 15px;
-            }}
-            
-            @keyframes spin {{
-                to {{ transform: rotate(360deg); }}
-            }}
-            
-            .error {{
-                display: flex;
-                align-items: center;
-                padding: 15px;
-                background-color: #fee2e2;
-                border-radius: 8px;
-                color: #b91c1c;
-            }}
-            
-            .error i {{
-                margin-right: 10px;
-                font-size: 1.5rem;
-            }}
-            
-            footer {{
-                text-align: center;
-                padding: 20px;
-                color: #64748b;
-                border-top: 1px solid #e2e8f0;
-                margin-top: 30px;
-            }}
-            
-            h1 {{
-                margin-bottom: 20px;
-                color: #1e293b;
-            }}
-
-            select {{
-                padding: 10px 14px;
-                border: 1px solid #cbd5e1;
-                border-radius: 6px;
-                background-color: white;
-                color: #1e293b;
-                font-size: 14px;
-                outline: none;
-                transition: border-color 0.3s ease;
-                margin-left: 10px;
-                margin-bottom: 15px;
-            }}
-
-            select:focus {{
-                border-color: #2563eb;
-                box-shadow: 0 0 0 2px rgba(37, 99, 235, 0.2);
-                background-color: #f8fafc;
-                color: #111827;
-                cursor: pointer;
-            }}
-
-            select:hover {{
-                border-color: #60a5fa;
-            }}
-
-        </style>
-        <script>
-        const assetId = "{asset_id}";
-
-        function showError(containerId, message) {{
-            const container = document.getElementById(containerId);
-            container.innerHTML = `
-                <div class="error">
-                    <i class="fas fa-exclamation-triangle"></i> ${{message}}
-                </div>
-            `;
-        }}
-
-
-        function showLoader(containerId) {{
-            const container = document.getElementById(containerId);
-            container.innerHTML = `
-                <div class="loader">
-                    <div class="spinner"></div>
-                    <p>Se încarcă datele...</p>
-                </div>
-            `;
-        }}
-
-        async function loadAvailableYears() {{
-            try {{
-                const response = await fetch(`/api/dashboard/${{assetId}}/years`);
-                if (!response.ok) throw new Error("Nu se pot încărca anii");
-                const years = await response.json();
-
-                const select = document.getElementById("year-select");
-                years.forEach(year => {{
-                    const option = document.createElement("option");
-                    option.value = year;
-                    option.textContent = year;
-                    select.appendChild(option);
-                }});
-            }} catch (err) {{
-                console.error("Eroare la încărcarea anilor:", err);
-            }}
-        }}
-
-        async function loadActualDataByYear() {{
-                const year = document.getElementById("year-select").value;
-                showLoader("actual-data-table");
-
-                try {{
-                    const url = year
-                        ? `/api/dashboard/${{assetId}}/actual-data?year=${{year}}`
-                        : `/api/dashboard/${{assetId}}/actual-data`;
-                    const response = await fetch(url);
-                    if (!response.ok) throw new Error("Eroare server");
-                    const data = await response.json();
-
-                    let rows = '';
-                    if (data.length > 0) {{
-                        rows = data.map(d => {{
-                            const epochDays = d.business_date.days_from_epoch;
-                            const date = new Date(epochDays * 86400000);
-                            const formattedDate = !isNaN(date.getTime())
-                                ? date.toISOString().split("T")[0]
-                                : "—";
-
-                            return `
-                                <tr>
-                                    <td>${{formattedDate}}</td>
-                                    <td>$${{parseFloat(d.data_values.close).toFixed(2)}}</td>
-                                    <td>${{parseInt(d.data_values.volume)}}</td>
-                                    <td>${{parseFloat(d.data_values.open).toFixed(2)}}</td>
-                                    <td>${{parseFloat(d.data_values.high).toFixed(2)}}</td>
-                                    <td>${{parseFloat(d.data_values.low).toFixed(2)}}</td>
-                                </tr>
-                            `;
-                        }}).join('');
-                    }} else {{
-                        rows = '<tr><td colspan="6">Nu există date pentru anul selectat</td></tr>';
-                    }}
-
-                    const table = `
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Dată</th>
-                                    <th>Închidere</th>
-                                    <th>Volum</th>
-                                    <th>Deschidere</th>
-                                    <th>Maxim</th>
-                                    <th>Minim</th>
-                                </tr>
-                            </thead>
-                            <tbody>${{rows}}</tbody>
-                        </table>
-                    `;
-
-                    document.getElementById("actual-data-table").innerHTML = table;
-                }} catch (error) {{
-                    showError("actual-data-table", error.message);
-                }}
-            }}
-
-            async function loadPredictions() {{
-                try {{
-                    const response = await fetch(`/api/dashboard/${{assetId}}/predictions`);
-                    if (!response.ok) throw new Error("Eroare la încărcarea predicțiilor");
-                    const data = await response.json();
-
-                    let rows = '';
-                    if (data.length > 0) {{
-                        rows = data.map(p => `
-                            <tr>
-                                <td>${{p.formatted_time}}</td>
-                                <td>$${{p.predicted_close.toFixed(2)}}</td>
-                            </tr>
-                        `).join('');
-                    }} else {{
-                        rows = '<tr><td colspan="2">Nu există predicții disponibile</td></tr>';
-                    }}
-
-                    const table = `
-                        <h2 class="card-title"><i class="fas fa-chart-line"></i> Predicții</h2>
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th>Timp</th>
-                                    <th>Preț prezis</th>
-                                </tr>
-                            </thead>
-                            <tbody>${{rows}}</tbody>
-                        </table>
-                    `;
-
-                    document.getElementById("predictions-content").innerHTML = table;
-                }} catch (error) {{
-                    document.getElementById("predictions-content").innerHTML = `
-                        <div class="error"><i class="fas fa-exclamation-triangle"></i> ${{error.message}}</div>
-                    `;
-                }}
-            }}
-
-            document.addEventListener("DOMContentLoaded", () => {{
-                loadAvailableYears();
-                loadPredictions();
-                loadActualDataByYear(); // inițial, încarcă ultimele 5 zile
-            }});
-        </script>
-`
-    </head>
-    <body>
-        <div class="container">
-            <header>
-                <div class="logo">Dashboard Financiar</div>
-                <h1>Analiză pentru {asset_id}</h1>
-            </header>
-            
-            <div class="card-container">
-
-                <div class="card" id="actual-data-content">
-                    <div class="card" id="actual-data-content">
-                        <h2 class="card-title"><i class="fas fa-database"></i> Date Efective</h2>
-                        <label for="year-select">Alege anul:</label>
-                        <select id="year-select" onchange="loadActualDataByYear()">
-                            <option value="">An</option>
-                        </select>
-                        <div id="actual-data-table"></div>
-                    </div>
-                </div>
-            
-                <div class="card" id="predictions-content">
-                    <div class="loader">
-                        <div class="spinner"></div>
-                        <p>Se încarcă predicțiile...</p>
-                    </div>
-                </div>
-            </div>
-            
-            <footer>
-                <p>Dashboard financiar {asset_id} &copy; {datetime.now().year} | Date actualizate în timp real</p>
-            </footer>
-        </div>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
\ No newline at end of file
+async def dashboard(asset_id: str, request: Request):
+    return dashboard_page.respond(request)
\ No newline at end of file
@@ -1,25 +1,208 @@
+import asyncio
 import os
-from cassandra.cluster import Cluster
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
 from cassandra.auth import PlainTextAuthProvider
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile, Session
+from cassandra.policies import (
+    ConstantSpeculativeExecutionPolicy,
+    DCAwareRoundRobinPolicy,
+    TokenAwarePolicy
+)
+from cassandra.query import PreparedStatement, dict_factory, named_tuple_factory
 from dotenv import load_dotenv
 
+from metrics import install_request_listener
+
 load_dotenv()
 
 ASTRA_DB_KEYSPACE = os.getenv("ASTRA_DB_KEYSPACE")
 ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
+ASTRA_DB_SECURE_BUNDLE = os.getenv("ASTRA_DB_SECURE_BUNDLE", "./data/secure-connect-dw-cassandra.zip")
+
+# Profilul pentru codul vechi care citește rândurile ca namedtuple (row.asset_id)
+EXEC_PROFILE_TUPLES = "tuples"
+
+
+class ConnectionManager:
+    """
+    Singurul `Cluster` al procesului. Conexiunea se deschide la primul acces
+    la `session`, iar toate modulele (API, CLI-uri, worker-e) o folosesc pe aceeași.
+
+    - echilibrare token-aware peste DC-aware: cererea ajunge direct la o replică
+      a partiției, în datacenter-ul local
+    - execuție speculativă doar pentru instrucțiunile marcate idempotente
+      (citirile pregătite prin `prepare(..., idempotent=True)`)
+    - rândurile vin ca dict (profilul implicit); protocolul v4 multiplexează
+      cererile pe o conexiune per nod, deci pool-ul se reglează prin numărul de
+      fire ale driver-ului și timeout-uri
+    """
+
+    def __init__(
+        self,
+        secure_bundle: str = ASTRA_DB_SECURE_BUNDLE,
+        keyspace: Optional[str] = ASTRA_DB_KEYSPACE,
+        token: Optional[str] = ASTRA_DB_APPLICATION_TOKEN
+    ):
+        self.secure_bundle = secure_bundle
+        self.keyspace = keyspace
+        self.token = token
+        self.local_dc = os.getenv("CASSANDRA_LOCAL_DC", "")
+        self.request_timeout = float(os.getenv("CASSANDRA_REQUEST_TIMEOUT", "10"))
+        self.speculative_delay = float(os.getenv("CASSANDRA_SPECULATIVE_DELAY_MS", "50")) / 1000
+        self.speculative_attempts = int(os.getenv("CASSANDRA_SPECULATIVE_ATTEMPTS", "2"))
+        self.executor_threads = int(os.getenv("CASSANDRA_EXECUTOR_THREADS", "4"))
+        self._cluster: Optional[Cluster] = None
+        self._session: Optional[Session] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _profile(self, row_factory) -> ExecutionProfile:
+        return ExecutionProfile(
+            load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=self.local_dc)),
+            speculative_execution_policy=ConstantSpeculativeExecutionPolicy(
+                self.speculative_delay, self.speculative_attempts
+            ),
+            request_timeout=self.request_timeout,
+            row_factory=row_factory
+        )
+
+    def _build_cluster(self) -> Cluster:
+        return Cluster(
+            cloud={'secure_connect_bundle': self.secure_bundle},
+            auth_provider=PlainTextAuthProvider('token', self.token),
+            execution_profiles={
+                EXEC_PROFILE_DEFAULT: self._profile(dict_factory),
+                EXEC_PROFILE_TUPLES: self._profile(named_tuple_factory)
+            },
+            executor_threads=self.executor_threads,
+            connect_timeout=self.request_timeout
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    @property
+    def cluster(self) -> Cluster:
+        self.connect()
+        return self._cluster
+
+    @property
+    def session(self) -> Session:
+        return self.connect()
+
+    def connect(self) -> Session:
+        """Deschide conexiunea la primul apel; apelurile următoare întorc aceeași sesiune"""
+        if self._session is not None and self._pid != os.getpid():
+            # Proces creat prin fork după conectare: firele driver-ului nu există aici
+            self.after_fork()
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    cluster = self._build_cluster()
+                    session = cluster.connect(self.keyspace)
+                    # Latența și erorile fiecărei interogări ajung în metrici
+                    install_request_listener(session)
+                    self._cluster, self._session = cluster, session
+                    self._pid = os.getpid()
+        return self._session
+
+    def use_session(self, session: Session, cluster: Optional[Cluster] = None) -> None:
+        """
+        Folosește o sesiune deja deschisă (de ex. una în memorie, în benchmark-uri)
+        în locul celei construite din configurație; `shutdown` o închide la fel
+        """
+        with self._lock:
+            self._cluster = cluster if cluster is not None else session.cluster
+            self._session = session
+            self._pid = os.getpid()
+
+    def after_fork(self) -> None:
+        """În procesul copil: uită conexiunea părintelui (fără shutdown), următorul acces reconectează"""
+        self._cluster, self._session, self._pid = None, None, None
+        self._lock = threading.Lock()
+
+    def prepare(self, query: str, idempotent: bool = False) -> PreparedStatement:
+        return prepare(self.session, query, idempotent)
+
+    def warm_up(self, queries: Iterable[Tuple[str, bool]], concurrency: int = 8) -> int:
+        """Pregătește concurent instrucțiunile fierbinți, ca primele cereri să nu plătească pregătirea"""
+        session = self.session
+        queries = list(queries)
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(queries)))) as pool:
+            list(pool.map(lambda q: prepare(session, *q), queries))
+        return len(queries)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._cluster is not None:
+                self._cluster.shutdown()
+            self._cluster, self._session = None, None
+
+
+# Instrucțiunile pregătite, per sesiune și text
+_prepared: "weakref.WeakKeyDictionary[Session, Dict[str, PreparedStatement]]" = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+def prepare(session: Session, query: str, idempotent: bool = False) -> PreparedStatement:
+    """
+    Pregătește o instrucțiune o singură dată per sesiune. Instrucțiunile
+    idempotente (citirile) pot fi trimise speculativ și la o a doua replică.
+    """
+    statements = _prepared.get(session)
+    if statements is None:
+        with _prepared_lock:
+            statements = _prepared.setdefault(session, {})
+    statement = statements.get(query)
+    if statement is None:
+        statement = session.prepare(query)
+        statement.is_idempotent = idempotent
+        statements[query] = statement
+    return statement
+
+
+# Managerul global al procesului
+connection_manager = ConnectionManager()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=connection_manager.after_fork)
+
 
 def get_cassandra_session():
-    cloud_path = './data/secure-connect-dw-cassandra.zip'
+    """Sesiunea și cluster-ul managerului global (pentru codul care le folosește ca pereche)"""
+    return connection_manager.session, connection_manager.cluster
+
+async def execute_async(session, query, params=None) -> list:
+    """
+    Execută o interogare fără a bloca bucla asyncio și întoarce toate rândurile
+    (toate paginile). Callback-urile driver-ului rulează pe firele lui, deci
+    rezultatul se predă buclei prin `call_soon_threadsafe`.
+    """
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    rows = []
+    response = session.execute_async(query, params)
 
-    cloud_config = {
-        'secure_connect_bundle': cloud_path
-    }
+    def resolve(callback, value):
+        # Cererea poate fi anulată, iar bucla oprită, înainte ca driver-ul să răspundă
+        try:
+            loop.call_soon_threadsafe(lambda: done.done() or callback(value))
+        except RuntimeError:
+            pass
 
-    auth_provider = PlainTextAuthProvider('token', ASTRA_DB_APPLICATION_TOKEN)
-    cluster = Cluster(cloud=cloud_config, auth_provider=auth_provider)
-    session = cluster.connect()
+    def on_page(page):
+        rows.extend(page)
+        if response.has_more_pages:
+            response.start_fetching_next_page()
+        else:
+            resolve(done.set_result, rows)
 
-    # selectăm keyspace-ul
-    session.set_keyspace(ASTRA_DB_KEYSPACE)
+    def on_error(exc):
+        resolve(done.set_exception, exc)
 
-    return session, cluster
+    response.add_callbacks(on_page, on_error)
+    return await done
@@ -32,4 +32,96 @@ class Prediction(models.Model):
     prediction_date = columns.Date(primary_key=True)
     prediction_time = columns.DateTime()
     predicted_close = columns.Float()
-    model_name = columns.Text()
\ No newline at end of file
+    model_name = columns.Text()
+
+class MonthlySketch(models.Model):
+    __table_name__ = 'monthly_sketches'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    data_source_id = columns.Text(primary_key=True, partition_key=True)
+    business_date_year = columns.Integer(primary_key=True, clustering_order="ASC")
+    business_date_month = columns.Integer(primary_key=True, clustering_order="ASC")
+    returns_digest = columns.Blob()
+    volume_digest = columns.Blob()
+    distinct_dates = columns.Blob()
+    row_count = columns.Integer()
+    updated_at = columns.DateTime()
+
+class ModelState(models.Model):
+    __table_name__ = 'model_state'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    data_source_id = columns.Text(primary_key=True, partition_key=True)
+    model_name = columns.Text(primary_key=True)
+    last_date = columns.Date()
+    window_dates = columns.List(columns.Date())
+    window_closes = columns.List(columns.Double())
+    rows_seen = columns.Integer()
+    updated_at = columns.DateTime()
+
+class ModelVersion(models.Model):
+    __table_name__ = 'model_registry'
+    model_name = columns.Text(primary_key=True, partition_key=True)
+    version = columns.Integer(primary_key=True, clustering_order="DESC")
+    created_at = columns.DateTime()
+    description = columns.Text()
+    parameters = columns.Map(columns.Text(), columns.Text())
+
+class ModelRun(models.Model):
+    __table_name__ = 'model_runs'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    run_id = columns.TimeUUID(primary_key=True, clustering_order="DESC")
+    model_name = columns.Text()
+    model_version = columns.Integer()
+    data_source_id = columns.Text()
+    trained_until = columns.Date()
+    created_at = columns.DateTime()
+
+class RunPrediction(models.Model):
+    __table_name__ = 'run_predictions'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    run_id = columns.TimeUUID(primary_key=True, partition_key=True)
+    prediction_date = columns.Date(primary_key=True, clustering_order="ASC")
+    predicted_close = columns.Double()
+
+class BacktestResult(models.Model):
+    __table_name__ = 'backtest_results'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    model_name = columns.Text(primary_key=True, clustering_order="ASC")
+    backtest_time = columns.DateTime(primary_key=True, clustering_order="DESC")
+    horizon = columns.Integer(primary_key=True, clustering_order="ASC")
+    data_source_id = columns.Text()
+    mae = columns.Double()
+    mape = columns.Double()
+    samples = columns.Integer()
+    start_date = columns.Date()
+    end_date = columns.Date()
+
+class TechnicalIndicators(models.Model):
+    __table_name__ = 'technical_indicators'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    data_source_id = columns.Text(primary_key=True, partition_key=True)
+    business_date_year = columns.Integer(primary_key=True, partition_key=True)
+    business_date = columns.Date(primary_key=True, clustering_order="DESC")
+    close = columns.Double()
+    observations = columns.Integer()
+    ema_12 = columns.Double()
+    ema_26 = columns.Double()
+    macd = columns.Double()
+    macd_signal = columns.Double()
+    macd_histogram = columns.Double()
+    avg_gain = columns.Double()
+    avg_loss = columns.Double()
+    rsi_14 = columns.Double()
+    bb_middle = columns.Double()
+    bb_upper = columns.Double()
+    bb_lower = columns.Double()
+    updated_at = columns.DateTime()
+
+class AssetYearIndex(models.Model):
+    __table_name__ = 'asset_year_index'
+    asset_id = columns.Text(primary_key=True, partition_key=True)
+    data_source_id = columns.Text(primary_key=True, partition_key=True)
+    business_date_year = columns.Integer(primary_key=True, clustering_order="ASC")
+    min_date = columns.Date()
+    max_date = columns.Date()
+    row_count = columns.BigInt()
+    updated_at = columns.DateTime()
@@ -0,0 +1,234 @@
+import glob
+import json
+import os
+import socket
+import stat
+import threading
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from cassandra.util import Date
+
+from serialization import dumps
+
+# Subiecte publicate de aplicație
+INGEST_COMPLETED = "ingest.completed"
+TRAINING_COMPLETED = "training.completed"
+INDICATORS_UPDATED = "indicators.updated"
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class EventBus:
+    """Publicare/abonare in-process între ingestie, antrenare și consumatori"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        with self._lock:
+            if handler not in self._handlers[topic]:
+                self._handlers[topic].append(handler)
+
+    def unsubscribe(self, topic: str, handler: Handler) -> None:
+        with self._lock:
+            if handler in self._handlers[topic]:
+                self._handlers[topic].remove(handler)
+
+    def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Livrează evenimentul sincron; un abonat defect nu îi afectează pe ceilalți"""
+        with self._lock:
+            handlers = list(self._handlers[topic])
+
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                print(f"Eroare în abonatul pentru {topic}: {e}")
+
+
+# Magistrala globală a procesului
+event_bus = EventBus()
+
+# Cea mai mare datagramă trimisă între procese; peste, evenimentul se trimite compactat
+MAX_DATAGRAM = 64 * 1024
+
+# Câmpurile voluminoase, omise din forma compactă a unui eveniment
+BULKY_FIELDS = ('data_points', 'dates', 'predictions', 'run')
+
+
+def _tag(value: Any) -> Any:
+    """
+    Datele, momentele și UUID-urile devin obiecte marcate, ca să revină cu același
+    tip în procesul care primește (cache-urile compară date, SSE formatează momente)
+    """
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, Date):
+        value = value.date()
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, Mapping):
+        return {key: _tag(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_tag(item) for item in value]
+    return value
+
+
+_UNTAG = {"$datetime": datetime.fromisoformat, "$date": date.fromisoformat, "$uuid": UUID}
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        if key in _UNTAG:
+            return _UNTAG[key](value)
+    return obj
+
+
+def encode_event(topic: str, payload: Dict[str, Any]) -> bytes:
+    return dumps({'topic': topic, 'payload': _tag(payload)})
+
+
+def decode_event(data: bytes):
+    """Doar JSON cu tipurile de mai sus: o datagramă nu poate executa cod la decodare"""
+    message = json.loads(data, object_hook=_untag)
+    return message['topic'], message['payload']
+
+
+def compact_event(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Forma de mărime fixă a unui eveniment prea mare pentru o datagramă: fără rânduri
+    și predicții, iar datele scrise se reduc la intervalul [prima, ultima]
+    """
+    compact = {k: v for k, v in payload.items() if k not in BULKY_FIELDS}
+    dates = payload.get('dates')
+    if dates:
+        compact['date_range'] = [min(dates), max(dates)]
+    compact['compacted'] = True
+    return compact
+
+
+def coarse_event(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Doar identificatorii: cel care primește invalidează tot ce ține de asset"""
+    coarse = {k: payload[k] for k in ('asset_id', 'data_source_id') if k in payload}
+    coarse['compacted'] = True
+    return coarse
+
+
+class WorkerRelay:
+    """
+    Retransmite evenimentele către celelalte procese worker de pe aceeași mașină,
+    prin socket-uri Unix de tip datagramă dintr-un director comun (unul per proces).
+    Evenimentele primite se republică local cu `relayed: True`. Cache-urile și
+    SSE le aplică, iar consumatorii care scriu (reantrenare, feature store) le
+    ignoră, ca lucrul să se facă o singură dată, în procesul care a ingerat.
+    Un eveniment care nu încape în MAX_DATAGRAM pleacă compactat (`compacted: True`);
+    `dropped` numără livrările (eveniment × proces) care nu au ajuns întregi,
+    `compacted` evenimentele trimise în formă redusă.
+    """
+
+    def __init__(self, directory: str, bus: EventBus = event_bus,
+                 topics: Sequence[str] = (INGEST_COMPLETED, TRAINING_COMPLETED, INDICATORS_UPDATED)):
+        self.directory = directory
+        self.bus = bus
+        self.topics = tuple(topics)
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.compacted = 0
+        self._handlers: Dict[str, Handler] = {}
+        self._socket: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def check_directory(self) -> None:
+        """Directorul trebuie să fie al utilizatorului serviciului și inaccesibil celorlalți"""
+        info = os.stat(self.directory)
+        if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+            raise PermissionError(
+                f"{self.directory} must be owned by uid {os.getuid()} with mode 0700 "
+                f"(owner uid {info.st_uid}, mode {stat.S_IMODE(info.st_mode):o})"
+            )
+
+    def start(self) -> None:
+        # Doar utilizatorul serviciului poate trimite evenimente celorlalte procese
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.check_directory()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        for topic in self.topics:
+            self._handlers[topic] = lambda payload, topic=topic: self.send(topic, payload)
+            self.bus.subscribe(topic, self._handlers[topic])
+        self._thread = threading.Thread(target=self._receive, name="worker-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        for topic, handler in self._handlers.items():
+            self.bus.unsubscribe(topic, handler)
+        self._handlers.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def peers(self) -> List[str]:
+        return [path for path in glob.glob(os.path.join(self.directory, "*.sock")) if path != self.path]
+
+    def send(self, topic: str, payload: Dict[str, Any]) -> None:
+        if payload.get('relayed') or self._socket is None:
+            return
+        peers = self.peers()
+        if not peers:
+            return
+        data = encode_event(topic, payload)
+        if len(data) > MAX_DATAGRAM:
+            # Un backfill mare: celelalte procese primesc doar intervalul atins, nu rândurile
+            data = encode_event(topic, compact_event(payload))
+            if len(data) > MAX_DATAGRAM:
+                data = encode_event(topic, coarse_event(payload))
+            if len(data) > MAX_DATAGRAM:
+                print(f"Eveniment {topic} prea mare pentru celelalte procese ({len(data)} octeți)")
+                self.dropped += len(peers)
+                return
+            self.compacted += 1
+            self.dropped += len(peers)
+
+        for peer in peers:
+            try:
+                self._socket.sendto(data, peer)
+                self.sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket rămas de la un worker oprit
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except OSError:
+                self.dropped += 1
+
+    def _receive(self) -> None:
+        sock = self._socket
+        while True:
+            try:
+                data = sock.recv(MAX_DATAGRAM)
+            except OSError:
+                return  # socket închis la oprire
+            try:
+                topic, payload = decode_event(data)
+            except Exception as e:
+                print(f"Eveniment invalid de la alt worker: {e}")
+                self.dropped += 1
+                continue
+            self.received += 1
+            payload['relayed'] = True
+            self.bus.publish(topic, payload)
@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+import math
+import zlib
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from repositories import TimeSeriesRepository, as_date
+
+try:
+    import orjson
+except ImportError:  # Fără orjson se folosește modulul standard json
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Exportul Arrow IPC este opțional
+    pa = None
+
+FIELDS = ('asset_id', 'data_source_id', 'business_date', 'system_time',
+          'open', 'high', 'low', 'close', 'volume')
+CHUNK_ROWS = 1000
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def validate_format(export_format: str) -> None:
+    if export_format not in MEDIA_TYPES:
+        raise ValueError(f"Unknown export format: {export_format}. Available: {', '.join(MEDIA_TYPES)}")
+    if export_format == 'arrow' and pa is None:
+        raise ValueError("Arrow export requires pyarrow (pip install pyarrow)")
+
+
+def iter_records(
+    ts_repository: TimeSeriesRepository,
+    asset_ids: List[str],
+    data_source_id: str,
+    start_date: date,
+    end_date: date
+) -> Iterator[Dict]:
+    """Ultima versiune a fiecărei zile, aplatizată, asset după asset, crescător după dată"""
+    for asset_id in asset_ids:
+        for row in ts_repository.iter_latest_per_date(asset_id, data_source_id, start_date, end_date):
+            values = row['data_values'] or {}
+            yield {
+                'asset_id': row['asset_id'],
+                'data_source_id': row['data_source_id'],
+                'business_date': as_date(row['business_date']),
+                'system_time': row['system_time'],
+                'open': float(values.get('open', 'nan')),
+                'high': float(values.get('high', 'nan')),
+                'low': float(values.get('low', 'nan')),
+                'close': float(values.get('close', 'nan')),
+                'volume': int(float(values.get('volume', 0)))
+            }
+
+
+def chunked(records: Iterable[Dict], size: int = CHUNK_ROWS) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ndjson_line(record: Dict) -> bytes:
+    """O linie JSON validă: prețurile lipsă (NaN) și valorile infinite devin null"""
+    if orjson is not None:
+        # orjson scrie nativ null pentru float-urile ne-finite și datele în ISO 8601
+        return orjson.dumps(record)
+    finite = {k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in record.items()}
+    return json.dumps(finite, default=lambda v: v.isoformat(), separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+def ndjson_chunks(records: Iterable[Dict]) -> Iterator[bytes]:
+    for chunk in chunked(records):
+        yield b"\n".join(ndjson_line(r) for r in chunk) + b"\n"
+
+
+def csv_chunks(records: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    for chunk in chunked(records):
+        for r in chunk:
+            writer.writerow([
+                r['asset_id'], r['data_source_id'], r['business_date'].isoformat(),
+                r['system_time'].isoformat(), r['open'], r['high'], r['low'], r['close'], r['volume']
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def arrow_schema():
+    return pa.schema([
+        ('asset_id', pa.string()),
+        ('data_source_id', pa.string()),
+        ('business_date', pa.date32()),
+        ('system_time', pa.timestamp('ms')),
+        ('open', pa.float64()),
+        ('high', pa.float64()),
+        ('low', pa.float64()),
+        ('close', pa.float64()),
+        ('volume', pa.int64()),
+    ])
+
+
+def arrow_chunks(records: Iterable[Dict]) -> Iterator[bytes]:
+    """Format Arrow IPC stream: schema, apoi câte un record batch per bucată"""
+    schema = arrow_schema()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunked(records):
+            columns = {name: [r[name] for r in chunk] for name in FIELDS}
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    # Marcajul de sfârșit de stream, scris la închiderea writer-ului
+    yield sink.getvalue()
+
+
+ENCODERS = {
+    'ndjson': ndjson_chunks,
+    'csv': csv_chunks,
+    'arrow': arrow_chunks,
+}
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprimare gzip incrementală; fiecare bucată este trimisă imediat (sync flush)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(
+    ts_repository: TimeSeriesRepository,
+    asset_ids: List[str],
+    data_source_id: str,
+    start_date: date,
+    end_date: date,
+    export_format: str = 'ndjson',
+    compression: Optional[str] = None
+) -> Iterator[bytes]:
+    validate_format(export_format)
+    records = iter_records(ts_repository, asset_ids, data_source_id, start_date, end_date)
+    chunks = ENCODERS[export_format](records)
+    return gzip_chunks(chunks) if compression == 'gzip' else chunks
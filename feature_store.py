@@ -0,0 +1,224 @@
+import argparse
+import math
+import threading
+from collections import deque
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from events import INDICATORS_UPDATED, INGEST_COMPLETED, event_bus
+from repositories import AssetsRepository, IndicatorRepository, TimeSeriesRepository, as_date
+
+EMA_FAST, EMA_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_PERIOD = 14
+BOLLINGER_PERIOD, BOLLINGER_WIDTH = 20, 2.0
+
+
+def _ema_step(previous: Optional[float], value: float, span: int) -> float:
+    if previous is None:
+        return value
+    alpha = 2.0 / (span + 1)
+    return previous + alpha * (value - previous)
+
+
+def next_indicators(previous: Optional[Dict], closes: deque, business_date: date, close: float) -> Dict:
+    """
+    Calculează indicatorii unei zile doar din rândul zilei precedente și din
+    ultimele prețuri de închidere (pentru Bollinger), fără a reciti fereastra.
+    `closes` trebuie să conțină cel mult BOLLINGER_PERIOD - 1 prețuri anterioare.
+    """
+    previous = previous or {}
+    observations = (previous.get('observations') or 0) + 1
+
+    ema_fast = _ema_step(previous.get('ema_12'), close, EMA_FAST)
+    ema_slow = _ema_step(previous.get('ema_26'), close, EMA_SLOW)
+    macd = ema_fast - ema_slow
+    signal = _ema_step(previous.get('macd_signal'), macd, MACD_SIGNAL)
+
+    # RSI Wilder; până la RSI_PERIOD variații se folosește media simplă
+    avg_gain, avg_loss, rsi = previous.get('avg_gain'), previous.get('avg_loss'), None
+    if previous.get('close') is not None:
+        change = close - previous['close']
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        period = min(observations - 1, RSI_PERIOD)
+        avg_gain = (avg_gain or 0.0) + (gain - (avg_gain or 0.0)) / period
+        avg_loss = (avg_loss or 0.0) + (loss - (avg_loss or 0.0)) / period
+        rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1 + avg_gain / avg_loss)
+
+    window = list(closes) + [close]
+    middle = sum(window) / len(window)
+    deviation = math.sqrt(sum((c - middle) ** 2 for c in window) / len(window))
+
+    return {
+        'business_date': business_date,
+        'business_date_year': business_date.year,
+        'close': close,
+        'observations': observations,
+        'ema_12': ema_fast,
+        'ema_26': ema_slow,
+        'macd': macd,
+        'macd_signal': signal,
+        'macd_histogram': macd - signal,
+        'avg_gain': avg_gain,
+        'avg_loss': avg_loss,
+        'rsi_14': rsi,
+        'bb_middle': middle,
+        'bb_upper': middle + BOLLINGER_WIDTH * deviation,
+        'bb_lower': middle - BOLLINGER_WIDTH * deviation
+    }
+
+
+class FeatureStoreUpdater:
+    """
+    Menține tabela `technical_indicators` la zi. La fiecare ingestie se
+    recalculează doar zilele de la prima dată scrisă încolo, pornind din
+    starea (rândul) zilei precedente. Reconstruirea completă (primul contact
+    cu un asset sau starea pierdută după o pauză lungă) rulează pe un fir de
+    fundal, nu pe firul ingestiei.
+    """
+
+    def __init__(self, session, bus=event_bus):
+        self.repository = IndicatorRepository(session)
+        self.ts_repository = TimeSeriesRepository(session)
+        self.bus = bus
+        self._pending: Dict[Tuple[str, str], None] = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.rebuilt = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="feature-store", daemon=True)
+            self._thread.start()
+        self.bus.subscribe(INGEST_COMPLETED, self.on_ingest)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.bus.unsubscribe(INGEST_COMPLETED, self.on_ingest)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def on_ingest(self, event: Dict) -> None:
+        # Indicatorii se scriu doar în procesul care a ingerat
+        if event.get('relayed'):
+            return
+        closes = {
+            as_date(p['business_date']): float(p['data_values']['close'])
+            for p in event.get('data_points', [])
+        }
+        if not closes:
+            return
+
+        key = {'asset_id': event['asset_id'], 'data_source_id': event['data_source_id']}
+        if self.repository.find_latest(key):
+            self.update(event['asset_id'], event['data_source_id'], closes)
+        else:
+            # Primul contact cu asset-ul: indicatorii pornesc de la tot istoricul
+            self.schedule_rebuild(event['asset_id'], event['data_source_id'])
+
+    def schedule_rebuild(self, asset_id: str, data_source_id: str) -> None:
+        """Cererile repetate pentru același asset se comasează într-o singură reconstruire"""
+        with self._condition:
+            self._pending[(asset_id, data_source_id)] = None
+            self._condition.notify()
+
+    def pending(self) -> list:
+        with self._condition:
+            return list(self._pending)
+
+    def _next(self) -> Optional[Tuple[str, str]]:
+        with self._condition:
+            while self._running and not self._pending:
+                self._condition.wait()
+            if not self._running:
+                return None
+            key = next(iter(self._pending))
+            del self._pending[key]
+            return key
+
+    def _run(self) -> None:
+        while True:
+            key = self._next()
+            if key is None:
+                return
+            asset_id, data_source_id = key
+            try:
+                self.rebuild(asset_id, data_source_id)
+                self.rebuilt += 1
+                self.bus.publish(INDICATORS_UPDATED, {'asset_id': asset_id, 'data_source_id': data_source_id})
+            except Exception as e:
+                print(f"Eroare la reconstruirea indicatorilor pentru {asset_id}: {e}")
+
+    def update(self, asset_id: str, data_source_id: str, new_closes: Dict[date, float],
+               fallback: bool = True) -> int:
+        """Integrează prețurile noi/revizuite și rescrie indicatorii afectați"""
+        start = min(new_closes)
+
+        # Starea de dinainte de prima zi afectată
+        context = self.repository.find_before(asset_id, data_source_id, start, BOLLINGER_PERIOD - 1)
+        if not context and fallback and self.has_history_before(asset_id, data_source_id, start):
+            # Nicio zi calculată în fereastra de căutare, deși istoricul există (o pauză mai
+            # lungă decât `lookback_years`): EMA/RSI ar reporni de la zero, deci se reconstruiește
+            self.schedule_rebuild(asset_id, data_source_id)
+            return 0
+        previous = context[-1] if context else None
+        window = deque((r['close'] for r in context), maxlen=BOLLINGER_PERIOD - 1)
+
+        # Zilele deja calculate după `start` (la backfill) se recalculează cu prețul lor
+        end = max(date.today(), max(new_closes))
+        closes = {
+            as_date(r['business_date']): r['close']
+            for r in self.repository.find_range(asset_id, data_source_id, start, end)
+        }
+        closes.update(new_closes)
+
+        rows = []
+        for business_date in sorted(closes):
+            row = next_indicators(previous, window, business_date, closes[business_date])
+            row.update({'asset_id': asset_id, 'data_source_id': data_source_id})
+            rows.append(row)
+            window.append(row['close'])
+            previous = row
+
+        self.repository.save_batch(rows)
+        return len(rows)
+
+    def has_history_before(self, asset_id: str, data_source_id: str, start: date) -> bool:
+        """Există prețuri din anii dinaintea lui `start`; anul lui `start` este acoperit de `find_before`"""
+        years = self.ts_repository.find_years(asset_id, data_source_id)
+        return bool(years) and years[0] < start.year
+
+    def rebuild(self, asset_id: str, data_source_id: str = 'ALPHAVANTAGE') -> int:
+        """Construiește indicatorii pentru tot istoricul unui asset (o singură dată)"""
+        years = self.ts_repository.find_years(asset_id, data_source_id)
+        if not years:
+            return 0
+        rows = self.ts_repository.find_latest_per_date(
+            asset_id, data_source_id, date(years[0], 1, 1), date(years[-1], 12, 31)
+        )
+        closes = {as_date(r['business_date']): float(r['data_values']['close']) for r in rows}
+        return self.update(asset_id, data_source_id, closes, fallback=False) if closes else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construiește feature store-ul de indicatori tehnici")
+    parser.add_argument("--assets", nargs="*", help="Asset-urile reconstruite (implicit toate)")
+    parser.add_argument("--data-source", default="ALPHAVANTAGE")
+    args = parser.parse_args()
+
+    from database import connection_manager
+    session = connection_manager.session
+    try:
+        updater = FeatureStoreUpdater(session)
+        for asset_id in args.assets or AssetsRepository(session).find_all_ids():
+            print(f"{asset_id}: {updater.rebuild(asset_id, args.data_source)} zile calculate")
+    finally:
+        connection_manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
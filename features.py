@@ -0,0 +1,130 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Sequence
+
+# Ponderile modelului WeightedMovingAverage, de la cea mai veche la cea mai recentă valoare
+WMA_WEIGHTS = np.array([0.5 ** i for i in range(5, 0, -1)])
+
+# Toate funcțiile lucrează pe ultima axă: un vector (un asset) sau o matrice
+# (un rând per asset, aceeași lungime), fără bucle Python pe elemente.
+
+
+def align_tail(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stivuiește seriile mai multor asset-uri păstrând ultimele n valori comune"""
+    length = min(len(s) for s in series)
+    return np.vstack([np.asarray(s, dtype=np.float64)[len(s) - length:] for s in series])
+
+
+def _cumsum0(x: np.ndarray) -> np.ndarray:
+    """Suma cumulativă cu un zero în față, pentru sume pe ferestre în O(n)"""
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    return np.pad(np.cumsum(x, axis=-1), pad)
+
+
+def sma(x, window: int = 5) -> np.ndarray:
+    """
+    Media mobilă simplă în O(n) prin sume cumulative. Primele window-1 valori
+    sunt medii pe fereastra disponibilă (la fel ca `calculate_moving_average`).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    c = _cumsum0(x)
+    n = x.shape[-1]
+    counts = np.minimum(np.arange(1, n + 1), window)
+    starts = np.arange(1, n + 1) - counts
+    return (c[..., 1:] - c[..., starts]) / counts
+
+
+def ema(x, span: int = None, alpha: float = None) -> np.ndarray:
+    """
+    Media mobilă exponențială, inițializată cu prima valoare. Recurența este
+    rezolvată pe blocuri cu sume cumulative scalate, ca factorii să nu depășească
+    intervalul numeric al float64.
+    """
+    if alpha is None:
+        if span is None:
+            raise ValueError("Either span or alpha is required")
+        alpha = 2.0 / (span + 1)
+    x = np.asarray(x, dtype=np.float64)
+    decay = 1.0 - alpha
+    n = x.shape[-1]
+    out = np.empty_like(x)
+    if n == 0:
+        return out
+    if decay == 0:
+        return x.copy()
+
+    block = max(1, int(12 * math.log(10) / -math.log(decay)))
+    previous = x[..., :1]
+    first = 1
+    out[..., 0] = x[..., 0]
+
+    while first < n:
+        last = min(first + block, n)
+        k = np.arange(1, last - first + 1)
+        scaled = alpha * np.cumsum(x[..., first:last] * decay ** -k, axis=-1)
+        out[..., first:last] = decay ** k * (previous + scaled)
+        previous = out[..., last - 1:last]
+        first = last
+    return out
+
+
+def wma(x, weights: Sequence[float] = WMA_WEIGHTS) -> np.ndarray:
+    """Media mobilă ponderată (ponderi normalizate) pe ferestre complete"""
+    x = np.asarray(x, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    windows = sliding_window_view(x, len(weights), axis=-1)
+    return windows @ (weights / weights.sum())
+
+
+def returns(x) -> np.ndarray:
+    """Randamente simple între zile consecutive (lungime n-1)"""
+    x = np.asarray(x, dtype=np.float64)
+    return x[..., 1:] / x[..., :-1] - 1
+
+
+def log_returns(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return np.diff(np.log(x), axis=-1)
+
+
+def rolling_volatility(r, window: int = 20, ddof: int = 1) -> np.ndarray:
+    """Deviația standard pe ferestre complete, din sumele cumulative ale lui r și r²"""
+    r = np.asarray(r, dtype=np.float64)
+    # Centrăm seria ca să limităm pierderea de precizie din formula cu pătrate
+    centered = r - r.mean(axis=-1, keepdims=True)
+    s1 = _cumsum0(centered)
+    s2 = _cumsum0(centered * centered)
+    total = s1[..., window:] - s1[..., :-window]
+    total_sq = s2[..., window:] - s2[..., :-window]
+    variance = (total_sq - total * total / window) / (window - ddof)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def rolling_min(x, window: int) -> np.ndarray:
+    return sliding_window_view(np.asarray(x, dtype=np.float64), window, axis=-1).min(axis=-1)
+
+
+def rolling_max(x, window: int) -> np.ndarray:
+    return sliding_window_view(np.asarray(x, dtype=np.float64), window, axis=-1).max(axis=-1)
+
+
+def wma_forecast(prices, horizon: int = 7, weights: Sequence[float] = WMA_WEIGHTS) -> np.ndarray:
+    """
+    Predicții recursive cu media mobilă ponderată pentru orice orizont, pe toate
+    asset-urile deodată. Nu modifică `prices`; fiecare predicție intră în
+    fereastra următoarei.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    size = len(weights)
+    if prices.shape[-1] < size:
+        raise ValueError(f"At least {size} prices are required for the forecast")
+
+    normalized = weights / weights.sum()
+    buffer = np.concatenate(
+        [prices[..., -size:], np.empty(prices.shape[:-1] + (horizon,))], axis=-1
+    )
+    for step in range(horizon):
+        buffer[..., size + step] = buffer[..., step:step + size] @ normalized
+    return buffer[..., size:]
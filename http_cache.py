@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import threading
+import uuid
+from collections import defaultdict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from fastapi import Request, Response
+
+from cache import LRUCache, prediction_cache
+from events import INDICATORS_UPDATED, INGEST_COMPLETED, TRAINING_COMPLETED, event_bus
+from serialization import dumps
+
+# Tipurile de date versionate per asset și evenimentele care le schimbă
+DATA = "data"
+PREDICTIONS = "predictions"
+
+
+class AssetVersions:
+    """Contor de versiune per (asset, tip de date), incrementat la fiecare scriere"""
+
+    def __init__(self):
+        self._versions: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, asset_id: str, kind: str) -> int:
+        return self._versions[(asset_id, kind)]
+
+    def bump(self, asset_id: str, kind: str) -> int:
+        with self._lock:
+            self._versions[(asset_id, kind)] += 1
+            return self._versions[(asset_id, kind)]
+
+
+class ResponseCache:
+    """
+    Cache HTTP pentru endpoint-urile dashboard-ului. ETag-ul se calculează din
+    versiunea în memorie a asset-ului și din identitatea datelor deja memorate
+    (rularea de predicții), deci un `If-None-Match` valid primește 304 fără
+    interogări în afara reîncărcărilor cache-ului; un ETag nou se servește din
+    corpul memorat.
+    """
+
+    def __init__(self, max_entries: int = 4096, bus=event_bus,
+                 sources: Dict[str, Callable[[str], str]] = None):
+        self.versions = AssetVersions()
+        # Identitatea datelor servite efectiv, per tip (de ex. rularea de predicții
+        # încărcată), pentru schimbări care nu trec prin evenimentele procesului
+        self.sources = dict(sources or {})
+        self.entries = LRUCache(max_entries)
+        self.bus = bus
+        # Diferă la fiecare pornire, ca ETag-urile vechi să nu fie validate greșit
+        self.boot_id = uuid.uuid4().hex[:8]
+        self.not_modified = 0
+
+    def start(self) -> None:
+        """Se abonează ultimul, ca versiunea să crească după ce toți consumatorii au scris"""
+        self.bus.subscribe(INGEST_COMPLETED, self.on_ingest)
+        self.bus.subscribe(TRAINING_COMPLETED, self.on_training_completed)
+        self.bus.subscribe(INDICATORS_UPDATED, self.on_ingest)
+
+    def stop(self) -> None:
+        self.bus.unsubscribe(INGEST_COMPLETED, self.on_ingest)
+        self.bus.unsubscribe(TRAINING_COMPLETED, self.on_training_completed)
+        self.bus.unsubscribe(INDICATORS_UPDATED, self.on_ingest)
+
+    def on_ingest(self, event: Dict[str, Any]) -> None:
+        self.versions.bump(event['asset_id'], DATA)
+
+    def on_training_completed(self, event: Dict[str, Any]) -> None:
+        self.versions.bump(event['asset_id'], PREDICTIONS)
+
+    def make_etag(self, key: Tuple[str, str], asset_id: str, kind: Union[str, Tuple[str, ...]]) -> str:
+        # Data curentă intră în ETag: intervalele implicite ("ultimele zile") se mută zilnic.
+        # Un răspuns compus din mai multe tipuri de date depinde de versiunea fiecăruia.
+        kinds = (kind,) if isinstance(kind, str) else kind
+        version = ".".join(self.version_token(asset_id, k) for k in kinds)
+        digest = hashlib.blake2b("|".join(key).encode('utf-8'), digest_size=6).hexdigest()
+        return f'W/"{self.boot_id}-{version}-{date.today().toordinal()}-{digest}"'
+
+    def version_token(self, asset_id: str, kind: str) -> str:
+        token = f"{kind}{self.versions.get(asset_id, kind)}"
+        source = self.sources.get(kind)
+        if source is not None:
+            token += "~" + source(asset_id)
+        return token
+
+    @staticmethod
+    def matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = [tag.strip() for tag in header.split(",")]
+        return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+    def lookup(self, request: Request, asset_id: str, kind) -> Tuple[Tuple[str, str], str, Optional[Response]]:
+        """Cheia, ETag-ul și răspunsul gata făcut (304 sau corp memorat), dacă există"""
+        key = (request.url.path, str(request.query_params))
+        # Versiunea se citește înainte de a produce răspunsul: o scriere concurentă
+        # poate doar să invalideze intrarea, nu să marcheze date vechi ca noi
+        etag = self.make_etag(key, asset_id, kind)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if self.matches(request, etag):
+            self.not_modified += 1
+            return key, etag, Response(status_code=304, headers=headers)
+
+        cached = self.entries.get(key)
+        if cached is not None and cached[0] == etag:
+            return key, etag, Response(content=cached[1], media_type="application/json", headers=headers)
+        return key, etag, None
+
+    def store(self, key: Tuple[str, str], etag: str, content: Any) -> Response:
+        body = dumps(content)
+        self.entries.put(key, (etag, body))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def respond(self, request: Request, asset_id: str, kind, producer: Callable[[], Any]) -> Response:
+        key, etag, response = self.lookup(request, asset_id, kind)
+        if response is not None:
+            return response
+        return self.store(key, etag, producer())
+
+    async def respond_async(self, request: Request, asset_id: str, kind,
+                            producer: Callable[[], Awaitable[Any]]) -> Response:
+        """Ca `respond`, pentru răspunsuri produse asincron (de ex. interogări concurente)"""
+        key, etag, response = self.lookup(request, asset_id, kind)
+        if response is not None:
+            return response
+        return self.store(key, etag, await producer())
+
+
+class StaticPage:
+    """
+    Pagină statică încărcată o singură dată la pornire, păstrată în memorie
+    atât necomprimată cât și comprimată gzip. Cererile nu mai randează nimic.
+    """
+
+    def __init__(self, path: str, media_type: str = "text/html; charset=utf-8", max_age: int = 3600):
+        self.path = path
+        self.media_type = media_type
+        self.max_age = max_age
+        self.body = b""
+        self.gzipped = b""
+        self.etag = ""
+
+    def load(self) -> "StaticPage":
+        with open(self.path, "rb") as f:
+            self.body = f.read()
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.blake2b(self.body, digest_size=8).hexdigest()
+        self.etag = f'"{digest}"'
+        return self
+
+    def respond(self, request: Request) -> Response:
+        if not self.body:
+            self.load()
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding"
+        }
+        if ResponseCache.matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzipped, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+# Cache-ul HTTP global al procesului; ETag-ul predicțiilor urmează rularea servită,
+# inclusiv una reîncărcată după `PREDICTION_CACHE_TTL` dintr-un alt proces
+response_cache = ResponseCache(sources={PREDICTIONS: prediction_cache.run_token})
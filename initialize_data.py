@@ -1,5 +1,9 @@
 from datetime import datetime
-from repositories import DataSourceRepository
+from repositories import AlreadyExistsError, DataSourceRepository
+
+# Versiunea inițială are un system_time fix: `IF NOT EXISTS` se aplică aceluiași
+# rând în toate procesele, deci un singur worker o poate crea
+SEED_SYSTEM_TIME = datetime(2000, 1, 1)
 
 def initialize_required_data(session):
     data_source_repo = DataSourceRepository(session)
@@ -9,12 +13,16 @@ def initialize_required_data(session):
         
         new_source = {
             'id': 'ALPHAVANTAGE',
-            'system_time': datetime.now(),
+            'system_time': SEED_SYSTEM_TIME,
             'name': 'Alpha Vantage',
             'description': 'Financial data from Alpha Vantage',
             'attributes': attributes  # Direct set
         }
-        data_source_repo.save(new_source)
-        print("Created ALPHAVANTAGE data source")
+        try:
+            data_source_repo.save(new_source)
+            print("Created ALPHAVANTAGE data source")
+        except AlreadyExistsError:
+            # Alt worker a creat-o între citire și scriere
+            print("ALPHAVANTAGE data source already exists")
     else:
         print("ALPHAVANTAGE data source already exists")
\ No newline at end of file
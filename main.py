@@ -1,5 +1,57 @@
+"""
+Pornește API-ul.
+
+    python main.py                  # un proces, cu --reload pentru dezvoltare
+    python main.py --workers 4      # N procese worker (implicit WEB_CONCURRENCY)
+    python main.py --workers auto   # câte un worker per nucleu
+
+Fiecare worker este un proces nou (spawn) care își deschide propria conexiune
+Cassandra în lifespan. `kill -HUP <pid master>` înlocuiește worker-ii unul câte
+unul (noul worker intră în serviciu înainte ca cel vechi să fie oprit), iar
+`kill -TTIN` / `kill -TTOU` adaugă sau scot un worker.
+"""
+import argparse
+import os
+import tempfile
+
 from controllers import app
 
-if __name__ == "__main__":
+APP = "controllers:app"
+
+
+def worker_count(value: str) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pornește API-ul FastAPI")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=worker_count, default=worker_count(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Numărul de procese worker sau `auto` (câte unul per nucleu)")
+    parser.add_argument("--reload", action="store_true", help="Repornire la modificarea codului (un singur proces)")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Secunde lăsate cererilor în curs la oprirea unui worker")
+    args = parser.parse_args()
+
     import uvicorn
-    uvicorn.run("app.controller:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+
+    if args.workers > 1:
+        # Directorul prin care worker-ii își trimit evenimentele (invalidare cache, SSE)
+        os.environ.setdefault("WORKER_RELAY_DIR", tempfile.mkdtemp(prefix="workers-"))
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=args.reload and args.workers == 1,
+        timeout_graceful_shutdown=args.graceful_timeout
+    )
+
+
+if __name__ == "__main__":
+    main()
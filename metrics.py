@@ -0,0 +1,265 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limitele (secunde) ale histogramelor de latență
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Sharded:
+    """
+    Valori numerice împărțite pe fire de execuție. Fiecare fir scrie doar în
+    propriul shard, deci înregistrarea nu ia niciun lock; lock-ul se folosește
+    doar la crearea shard-ului unui fir nou și la citire.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        values = getattr(self._local, 'values', None)
+        if values is None:
+            values = [0.0] * self._size
+            self._local.values = values
+            with self._lock:
+                self._shards.append(values)
+        return values
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0.0] * self._size
+
+
+class Counter:
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values.shard()[0] += amount
+
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+
+class Histogram:
+    """Histogramă cumulativă în stilul Prometheus; ultimele două celule sunt suma și numărul"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._values = _Sharded(len(self.buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        values = self._values.shard()
+        # Celula len(buckets) este +Inf
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        totals = self._values.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:len(self.buckets) + 1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class MetricFamily:
+    """O metrică cu etichete; copiii se creează la prima folosire a unei combinații"""
+
+    def __init__(self, name: str, help_text: str, kind: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels_for(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+                    self._children[values] = child
+        return child
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels_for(*labels).observe(value)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.labels_for(*labels).inc(amount)
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = None) -> str:
+        pairs = [f'{k}="{self._escape(str(v))}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            if self.kind == 'histogram':
+                cumulative, total, count = child.snapshot()
+                bounds = [f"{b:g}" for b in child.buckets] + ["+Inf"]
+                for bound, running in zip(bounds, cumulative):
+                    labels = self._label_text(values, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {running:g}")
+                lines.append(f"{self.name}_sum{self._label_text(values)} {total:.6f}")
+                lines.append(f"{self.name}_count{self._label_text(values)} {count:g}")
+            else:
+                lines.append(f"{self.name}{self._label_text(values)} {child.value():g}")
+        return lines
+
+
+class GaugeFamily:
+    """Valori instantanee (ex. adâncimea unei cozi), citite la fiecare colectare"""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str],
+                 collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for values, value in self.collect().items():
+            pairs = ",".join(f'{k}="{MetricFamily._escape(str(v))}"' for k, v in zip(self.labels, values))
+            lines.append(f"{self.name}{{{pairs}}} {value:g}" if pairs else f"{self.name} {value:g}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families: Dict[str, object] = {}
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._families.setdefault(name, MetricFamily(name, help_text, 'histogram', labels, buckets))
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> MetricFamily:
+        return self._families.setdefault(name, MetricFamily(name, help_text, 'counter', labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str],
+              collect: Callable[[], Dict[Tuple[str, ...], float]]) -> GaugeFamily:
+        return self._families.setdefault(name, GaugeFamily(name, help_text, labels, collect))
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registrul global și metricile aplicației
+registry = MetricsRegistry()
+
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Durata cererilor HTTP, per rută", ("method", "route", "status"))
+CQL_LATENCY = registry.histogram(
+    "cassandra_query_duration_seconds", "Durata interogărilor Cassandra, per instrucțiune", ("statement",))
+CQL_ERRORS = registry.counter(
+    "cassandra_query_errors_total", "Interogări Cassandra eșuate, per instrucțiune", ("statement", "error"))
+CQL_ROWS = registry.counter(
+    "cassandra_rows_returned_total", "Rânduri întoarse de Cassandra, per instrucțiune", ("statement",))
+INGEST_ROWS = registry.counter(
+    "ingest_rows_total", "Rânduri scrise de ingestie, per sursă", ("data_source",))
+INGEST_LATENCY = registry.histogram(
+    "ingest_duration_seconds", "Durata unei ingestii complete", ("data_source", "outcome"),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+OUTBOUND_LATENCY = registry.histogram(
+    "outbound_request_duration_seconds", "Durata apelurilor către API-uri externe", ("service", "outcome"))
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_label(query) -> str:
+    """Textul instrucțiunii (fără parametri), normalizat; lotul apare ca BATCH"""
+    statement = getattr(query, 'prepared_statement', None) or query
+    text = statement if isinstance(statement, str) else getattr(statement, 'query_string', None)
+    if text is None:
+        return type(query).__name__.replace('Statement', '').upper() or 'UNKNOWN'
+    return _WHITESPACE.sub(" ", text).strip()[:160]
+
+
+def install_request_listener(session) -> None:
+    """
+    Măsoară fiecare cerere trimisă de driver prin sesiunea dată (inclusiv cele
+    asincrone): latența până la prima pagină și rândurile tuturor paginilor
+    """
+
+    def on_request(response_future) -> None:
+        label = statement_label(response_future.query)
+        started = time.perf_counter()
+        # Driver-ul reapelează callback-urile pentru fiecare pagină următoare, dar
+        # `started` rămâne cel al primei pagini: latența se înregistrează o singură dată
+        pending = [True]
+
+        def observe_first() -> None:
+            if pending[0]:
+                pending[0] = False
+                CQL_LATENCY.observe(time.perf_counter() - started, label)
+
+        def on_success(rows, *args) -> None:
+            observe_first()
+            if isinstance(rows, list):
+                CQL_ROWS.inc(label, amount=len(rows))
+
+        def on_error(exc, *args) -> None:
+            observe_first()
+            CQL_ERRORS.inc(label, type(exc).__name__)
+
+        response_future.add_callbacks(on_success, on_error)
+
+    session.add_request_init_listener(on_request)
+
+
+class MetricsMiddleware:
+    """Latența fiecărei cereri HTTP, etichetată cu șablonul rutei (ex. /assets/{asset_id})"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            route = scope.get("route")
+            # Căile fără rută se grupează, ca URL-urile arbitrare să nu creeze serii noi
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - started, scope["method"], path, str(status or 0))
@@ -0,0 +1,76 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from repositories import ModelRegistryRepository, ModelRunRepository, as_date
+
+
+class ModelRegistry:
+    """
+    Versionează modelele și rulările lor. Fiecare rulare are propriul run_id,
+    deci o rulare nouă nu mai suprascrie predicțiile celei anterioare.
+    """
+
+    def __init__(self, session):
+        self.models = ModelRegistryRepository(session)
+        self.runs = ModelRunRepository(session)
+        self._registered = set()
+
+    def register(self, model_name: str, version: int, description: str = '', parameters: Dict = None) -> None:
+        """Înregistrează versiunea modelului o singură dată per proces"""
+        if (model_name, version) in self._registered:
+            return
+        if not any(m['version'] == version for m in self.models.find_all(model_name)):
+            self.models.save({
+                'model_name': model_name,
+                'version': version,
+                'description': description,
+                'parameters': parameters or {}
+            })
+        self._registered.add((model_name, version))
+
+    def list_models(self, model_name: str) -> List[Dict]:
+        return self.models.find_all(model_name)
+
+    def record_run(
+        self,
+        asset_id: str,
+        model_name: str,
+        version: int,
+        predictions: List[float],
+        data_source_id: str = 'ALPHAVANTAGE',
+        trained_until: date = None
+    ) -> Dict:
+        """Salvează o rulare cu predicțiile ei pentru zilele următoare"""
+        created_at = datetime.now()
+        today = created_at.date()
+        run = {
+            'asset_id': asset_id,
+            'run_id': uuid.uuid1(),
+            'model_name': model_name,
+            'model_version': version,
+            'data_source_id': data_source_id,
+            'trained_until': trained_until,
+            'created_at': created_at,
+            'predictions': [
+                {'prediction_date': today + timedelta(days=days_ahead), 'predicted_close': float(p)}
+                for days_ahead, p in enumerate(predictions, start=1)
+            ]
+        }
+        return self.runs.save(run)
+
+    def list_runs(self, asset_id: str, limit: int = 20) -> List[Dict]:
+        return self.runs.find_all(asset_id, limit)
+
+    def latest_run(self, asset_id: str) -> Optional[Dict]:
+        """Ultima rulare a unui asset, împreună cu predicțiile ei"""
+        run = self.runs.find_latest(asset_id)
+        if run is None:
+            return None
+        run = dict(run)
+        run['trained_until'] = as_date(run.get('trained_until'))
+        run['predictions'] = [
+            {'prediction_date': as_date(p['prediction_date']), 'predicted_close': p['predicted_close']}
+            for p in self.runs.find_predictions(asset_id, run['run_id'])
+        ]
+        return run
@@ -1,50 +1,57 @@
 import os
 import math
+import time
+import atexit
+import argparse
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
+from cassandra.concurrent import execute_concurrent_with_args
 from dotenv import load_dotenv
 
+import features
+from database import connection_manager, prepare
+from model_registry import ModelRegistry
+from repositories import IndicatorRepository, TimeSeriesRepository, as_date
+
 load_dotenv()
 
-# Configurare Cassandra
-ASTRA_DB_KEYSPACE = os.getenv("ASTRA_DB_KEYSPACE")
-ASTRA_DB_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
-ASTRA_DB_BUNDLE = "data/secure-connect-dw-cassandra.zip"
+MODEL_NAME = "WeightedMovingAverage"
+MODEL_VERSION = 1
+MODEL_DESCRIPTION = "Medie mobilă ponderată recursivă pe ultimele 5 prețuri de închidere"
+MODEL_PARAMETERS = {'weights': features.WMA_WEIGHTS.tolist(), 'window': 100, 'horizon': 7}
+INSERT_CONCURRENCY = 32
 
-cloud_config = {'secure_connect_bundle': ASTRA_DB_BUNDLE}
-auth_provider = PlainTextAuthProvider("token", ASTRA_DB_TOKEN)
-cluster = Cluster(cloud=cloud_config, auth_provider=auth_provider)
-session = cluster.connect()
-session.set_keyspace(ASTRA_DB_KEYSPACE)
+# Sesiunea driver-ului din procesul worker curent (una per proces)
+_worker_session = None
+_worker_insert = None
+_worker_registry = None
 
-print("Connected to Cassandra for model training")
 
-def get_historical_data(asset_id='IBM', data_source_id='ALPHAVANTAGE'):
+def get_historical_data(session, asset_id='IBM', data_source_id='ALPHAVANTAGE'):
     """Obține datele istorice pentru un asset"""
     # Obținem ultimii 3 ani pentru a acoperi partitionarea
     current_year = datetime.now().year
     years = [current_year, current_year - 1, current_year - 2]
     
     historical_data = []
+    repository = TimeSeriesRepository(session)
     
     for year in years:
-        query = """
-        SELECT business_date, data_values
-        FROM time_series_data
-        WHERE asset_id = %s 
-          AND data_source_id = %s 
-          AND business_date_year = %s
-        """
-        rows = session.execute(query, (asset_id, data_source_id, year))
-        historical_data.extend(list(rows))
+        rows = repository.find_all({
+            'asset_id': asset_id,
+            'data_source_id': data_source_id,
+            'business_date_year': year
+        })
+        historical_data.extend(rows)
     
     # Sortăm descrescător după dată și luăm ultimele 100 de înregistrări
-    historical_data.sort(key=lambda x: x.business_date, reverse=True)
+    historical_data.sort(key=lambda x: x['business_date'], reverse=True)
     return historical_data[:100]
 
 def calculate_moving_average(data, window_size=5):
-    """Calculează media mobilă simplă"""
+    """Calculează media mobilă simplă (implementarea de referință, vezi features.sma)"""
     ma = []
     for i in range(len(data)):
         start = max(0, i - window_size + 1)
@@ -54,7 +61,11 @@ def calculate_moving_average(data, window_size=5):
     return ma
 
 def predict_future_prices(prices, num_predictions=7):
-    """Prezice prețurile viitoare folosind o medie mobilă ponderată"""
+    """
+    Prezice prețurile viitoare folosind o medie mobilă ponderată
+    (implementarea de referință, vezi features.wma_forecast)
+    """
+    prices = list(prices)  # Nu modificăm lista apelantului
     # Calculăm ponderile - mai recentele au pondere mai mare
     weights = [0.5**i for i in range(5, 0, -1)]
     total_weight = sum(weights)
@@ -74,55 +85,168 @@ def predict_future_prices(prices, num_predictions=7):
     
     return predictions
 
-def save_predictions(asset_id, predictions):
-    """Salvează predicțiile în Cassandra"""
-    query = """
+def save_predictions(session, asset_id, predictions, insert_statement=None):
+    """Salvează predicțiile în Cassandra prin inserări pregătite, concurente"""
+    if insert_statement is None:
+        insert_statement = prepare_insert(session)
+
+    today = datetime.now().date()
+    prediction_time = datetime.now()
+    params = [
+        (asset_id, today + timedelta(days=days_ahead), prediction_time, prediction, MODEL_NAME)
+        for days_ahead, prediction in enumerate(predictions, start=1)
+    ]
+
+    results = execute_concurrent_with_args(
+        session, insert_statement, params,
+        concurrency=INSERT_CONCURRENCY, raise_on_first_error=True
+    )
+    return len(results)
+
+def prepare_insert(session):
+    return prepare(session, """
     INSERT INTO predictions (
         asset_id, 
         prediction_date, 
         prediction_time,
         predicted_close,
         model_name
-    ) VALUES (%s, %s, %s, %s, %s)
+    ) VALUES (?, ?, ?, ?, ?)
+    """)
+
+def get_training_closes(session, asset_id, data_source_id='ALPHAVANTAGE', window=100):
+    """
+    Ultimele `window` prețuri de închidere, în ordine cronologică, și data ultimului.
+    Se citesc din feature store (valori numerice deja calculate); dacă asset-ul nu
+    are încă indicatori, din time_series_data.
     """
+    rows = IndicatorRepository(session).find_latest(
+        {'asset_id': asset_id, 'data_source_id': data_source_id}, window
+    )
+    if rows:
+        closes = np.fromiter((r['close'] for r in rows), dtype=np.float64, count=len(rows))
+        return closes, as_date(rows[-1]['business_date'])
     
-    today = datetime.now().date()
-    for days_ahead, prediction in enumerate(predictions, start=1):
-        prediction_date = today + timedelta(days=days_ahead)
-        session.execute(query, (
-            asset_id,
-            prediction_date,
-            datetime.now(),
-            prediction,
-            "WeightedMovingAverage"
-        ))
+    historical_data = get_historical_data(session, asset_id, data_source_id)
+    closes = np.fromiter(
+        (float(row['data_values']['close']) for row in reversed(historical_data)),
+        dtype=np.float64, count=len(historical_data)
+    )
+    trained_until = as_date(historical_data[0]['business_date']) if historical_data else None
+    return closes, trained_until
+
+def register_model(registry):
+    registry.register(MODEL_NAME, MODEL_VERSION, MODEL_DESCRIPTION, MODEL_PARAMETERS)
+
+def train_asset(session, asset_id, insert_statement=None, registry=None):
+    """Antrenează modelul pentru un asset și returnează durata fiecărei etape"""
+    if registry is None:
+        registry = ModelRegistry(session)
+        register_model(registry)
+
+    timings = {'asset_id': asset_id, 'pid': os.getpid()}
+    started = time.perf_counter()
+
+    # 1. Obține prețurile de închidere, în ordine cronologică
+    closing_prices, trained_until = get_training_closes(session, asset_id)
+    timings['fetch_s'] = time.perf_counter() - started
+    timings['rows'] = len(closing_prices)
+    if not len(closing_prices):
+        raise Exception(f"Nu s-au găsit date istorice pentru {asset_id}")
+
+    # 2. Calculează predicțiile pentru următoarele 7 zile
+    step = time.perf_counter()
+    if len(closing_prices) >= len(features.WMA_WEIGHTS):
+        predictions = features.wma_forecast(closing_prices, 7).tolist()
+    else:
+        predictions = predict_future_prices(closing_prices.tolist())
+    timings['train_s'] = time.perf_counter() - step
+
+    # 3. Salvează predicțiile
+    step = time.perf_counter()
+    save_predictions(session, asset_id, predictions, insert_statement)
+    run = registry.record_run(
+        asset_id, MODEL_NAME, MODEL_VERSION, predictions,
+        trained_until=trained_until
+    )
+    timings['run_id'] = str(run['run_id'])
+    timings['save_s'] = time.perf_counter() - step
+
+    timings['total_s'] = time.perf_counter() - started
+    return timings
+
+
+def _init_worker():
+    """Fiecare proces din pool își deschide propria conexiune la Cassandra"""
+    global _worker_session, _worker_insert, _worker_registry
+    # Procesul "spawn" pornește cu un manager nou, deci cu propriul cluster
+    _worker_session = connection_manager.session
+    _worker_insert = prepare_insert(_worker_session)
+    _worker_registry = ModelRegistry(_worker_session)
+    register_model(_worker_registry)
+    atexit.register(connection_manager.shutdown)
+
+
+def _train_in_worker(asset_id):
+    return train_asset(_worker_session, asset_id, _worker_insert, _worker_registry)
+
+
+def discover_assets():
+    """Citește lista de asset-uri din tabela `asset`"""
+    from repositories import AssetsRepository
+    try:
+        return AssetsRepository(connection_manager.session).find_all_ids()
+    finally:
+        connection_manager.shutdown()
+
+
+def train_assets(asset_ids=None, processes=None):
+    """
+    Antrenează asset-urile în paralel într-un pool de procese.
+    Returnează (timpi per asset reușit, erori per asset).
+    """
+    asset_ids = asset_ids or discover_assets()
+    processes = min(processes or os.cpu_count() or 1, len(asset_ids)) or 1
+
+    results, errors = [], {}
+    # "spawn": driver-ul Cassandra nu suportă fork după conectare
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(_train_in_worker, asset_id): asset_id for asset_id in asset_ids}
+        for future in as_completed(futures):
+            asset_id = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors[asset_id] = str(e)
+
+    return results, errors
+
+
+def print_report(results, errors, elapsed):
+    print(f"{'Asset':<10} {'PID':>7} {'Rows':>6} {'Fetch':>8} {'Train':>8} {'Save':>8} {'Total':>8}")
+    for t in sorted(results, key=lambda r: r['asset_id']):
+        print(f"{t['asset_id']:<10} {t['pid']:>7} {t['rows']:>6} "
+              f"{t['fetch_s']:>7.3f}s {t['train_s']:>7.3f}s {t['save_s']:>7.3f}s {t['total_s']:>7.3f}s")
+    for asset_id, error in sorted(errors.items()):
+        print(f"{asset_id:<10} EROARE: {error}")
+    print(f"{len(results)} asset-uri antrenate, {len(errors)} erori, în {elapsed:.2f}s")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Antrenează modelele și scrie predicțiile")
+    parser.add_argument("--assets", nargs="*", help="Asset-urile antrenate (implicit toate)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Numărul de procese (implicit numărul de nuclee)")
+    args = parser.parse_args()
+
     try:
-        # 1. Obține date istorice
-        historical_data = get_historical_data()
-        
-        if not historical_data:
-            raise Exception("Nu s-au găsit date istorice")
-        
-        print(f"S-au găsit {len(historical_data)} înregistrări istorice")
-        
-        # Extrage prețurile de închidere
-        closing_prices = [float(row.data_values['close']) for row in historical_data]
-        
-        # 2. Calculează media mobilă
-        moving_avg = calculate_moving_average(closing_prices)
-        
-        # 3. Generează predicții pentru următoarele 7 zile
-        predictions = predict_future_prices(closing_prices.copy())
-        
-        # 4. Salvează predicțiile
-        save_predictions('IBM', predictions)
+        started = time.perf_counter()
+        results, errors = train_assets(args.assets, args.processes)
+        print_report(results, errors, time.perf_counter() - started)
         print("Predicțiile au fost salvate în Cassandra")
-        
     except Exception as e:
         print(f"Eroare: {str(e)}")
         import traceback
         traceback.print_exc()
-    finally:
-        cluster.shutdown()
\ No newline at end of file
@@ -1,17 +1,33 @@
-from typing import TypeVar, Generic, List, Optional, Dict, Any, Iterable
+from typing import TypeVar, Generic, List, Optional, Dict, Any, Callable, Iterable, Iterator
 from cassandra.cluster import Session
-from cassandra.query import BatchStatement, dict_factory
-from datetime import datetime, date
+from cassandra.concurrent import execute_concurrent_with_args
+from cassandra.query import BatchStatement, SimpleStatement, dict_factory
+from cassandra.util import Date
+from datetime import datetime, date, timedelta
 import json
 
+from database import prepare
+
 E = TypeVar('E')  # Entity type
 K = TypeVar('K')  # Key type
 
+
+def as_date(value) -> date:
+    """Convertește `cassandra.util.Date` întors de driver în `datetime.date`"""
+    if isinstance(value, Date):
+        return value.date()
+    return value
+
+
 class WarehouseRepository(Generic[E, K]):
     def __init__(self, session: Session, table_name: str):
         self.session = session
         self.table_name = table_name
-        self.session.row_factory = dict_factory
+        try:
+            self.session.row_factory = dict_factory
+        except ValueError:
+            # Sesiunile managerului folosesc profiluri, iar profilul implicit întoarce deja dict-uri
+            pass
 
     def save(self, entity: E) -> E:
         raise NotImplementedError
@@ -75,6 +91,15 @@ class AssetsRepository(WarehouseRepository):
         result = self.session.execute(query, (id,))
         return list(result)
 
+    def find_all_ids(self) -> List[str]:
+        """Returnează ID-urile tuturor asset-urilor înregistrate"""
+        result = self.session.execute("SELECT DISTINCT id FROM asset")
+        return sorted(row['id'] for row in result)
+
+
+class AlreadyExistsError(Exception):
+    """Inserarea condiționată (`IF NOT EXISTS`) nu s-a aplicat: rândul există deja"""
+
 
 class DataSourceRepository(WarehouseRepository):
     def __init__(self, session: Session):
@@ -96,8 +121,8 @@ class DataSourceRepository(WarehouseRepository):
             entity['name']
         ))
         
-        if not result.one().applied:
-            raise Exception("Data source already exists")
+        if not result.was_applied:
+            raise AlreadyExistsError("Data source already exists")
         return True
     
     def delete(self, data_source: Dict) -> None:
@@ -124,9 +149,100 @@ class DataSourceRepository(WarehouseRepository):
         return list(result)
 
 
+class YearIndexRepository(WarehouseRepository):
+    """
+    Indexul anilor prezenți în time_series_data per (asset, sursă), cu limitele
+    de dată și numărul de rânduri per an. Se citește dintr-o singură partiție.
+    """
+
+    def __init__(self, session: Session):
+        super().__init__(session, "asset_year_index")
+
+    def save(self, entry: Dict) -> Dict:
+        query = """
+        INSERT INTO asset_year_index 
+        (asset_id, data_source_id, business_date_year,
+         min_date, max_date, row_count, updated_at) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        self.session.execute(query, (
+            entry['asset_id'],
+            entry['data_source_id'],
+            entry['business_date_year'],
+            entry['min_date'],
+            entry['max_date'],
+            entry['row_count'],
+            entry.get('updated_at', datetime.now())
+        ))
+        return entry
+
+    def delete_all(self, key: Dict) -> None:
+        query = "DELETE FROM asset_year_index WHERE asset_id = %s AND data_source_id = %s"
+        self.session.execute(query, (key['asset_id'], key['data_source_id']))
+
+    SELECT = """
+        SELECT * FROM asset_year_index 
+        WHERE asset_id = ? AND data_source_id = ?
+        """
+
+    def find_all(self, key: Dict) -> List[Dict]:
+        statement = prepare(self.session, self.SELECT, idempotent=True)
+        rows = list(self.session.execute(statement, (key['asset_id'], key['data_source_id'])))
+        for row in rows:
+            row['min_date'] = as_date(row['min_date'])
+            row['max_date'] = as_date(row['max_date'])
+        return rows
+
+    def record(self, data_points: List[Dict], backfill: Callable[[str, str], Any] = None) -> None:
+        """
+        Actualizează indexul cu rândurile abia scrise (citire + scriere pe o singură
+        partiție). Două ingestii simultane pentru același asset pot pierde o parte
+        din `row_count`; anii și limitele de dată rămân corecte.
+        Când asset-ul nu are încă index, `backfill` îl construiește din toate datele
+        existente (inclusiv cele ingerate înainte de index), ca un index nevid să
+        fie mereu complet.
+        """
+        groups: Dict[tuple, List[date]] = {}
+        for point in data_points:
+            key = (point['asset_id'], point['data_source_id'])
+            groups.setdefault(key, []).append(as_date(point['business_date']))
+
+        for (asset_id, data_source_id), dates in groups.items():
+            existing = {
+                row['business_date_year']: row
+                for row in self.find_all({'asset_id': asset_id, 'data_source_id': data_source_id})
+            }
+            if not existing and backfill is not None:
+                # Rândurile abia scrise sunt deja în tabelă, deci intră în reconstruire
+                backfill(asset_id, data_source_id)
+                continue
+            per_year: Dict[int, List[date]] = {}
+            for business_date in dates:
+                per_year.setdefault(business_date.year, []).append(business_date)
+
+            for year, year_dates in per_year.items():
+                current = existing.get(year)
+                self.save({
+                    'asset_id': asset_id,
+                    'data_source_id': data_source_id,
+                    'business_date_year': year,
+                    'min_date': min(year_dates + ([current['min_date']] if current else [])),
+                    'max_date': max(year_dates + ([current['max_date']] if current else [])),
+                    'row_count': len(year_dates) + ((current['row_count'] or 0) if current else 0)
+                })
+
+
 class TimeSeriesRepository(WarehouseRepository):
+    INSERT = """
+        INSERT INTO time_series_data 
+        (asset_id, data_source_id, business_date_year, 
+         business_date, system_time, data_values) 
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+
     def __init__(self, session: Session):
         super().__init__(session, "time_series_data")
+        self.year_index = YearIndexRepository(session)
 
     def save(self, data_point: Dict) -> Dict:
         query = """
@@ -143,6 +259,7 @@ class TimeSeriesRepository(WarehouseRepository):
             data_point['system_time'],
             {k: str(v) for k, v in data_point["data_values"].items()}
         ))
+        self.year_index.record([data_point], backfill=self.rebuild_year_index)
         return data_point
     
     def save_batch(self, data_points: List[Dict]) -> None:
@@ -150,14 +267,8 @@ class TimeSeriesRepository(WarehouseRepository):
         if not data_points:
             return
         
-        # Pregătim interogarea
-        query = """
-        INSERT INTO time_series_data 
-        (asset_id, data_source_id, business_date_year, 
-         business_date, system_time, data_values) 
-        VALUES (?, ?, ?, ?, ?, ?)
-        """
-        prepared = self.session.prepare(query)
+        # Interogarea se pregătește o singură dată per sesiune
+        prepared = prepare(self.session, self.INSERT)
         
         # Creăm un batch
         batch = BatchStatement()
@@ -175,7 +286,36 @@ class TimeSeriesRepository(WarehouseRepository):
         
         # Executăm batch-ul
         self.session.execute(batch)
-    
+        self.year_index.record(data_points, backfill=self.rebuild_year_index)
+
+    def save_concurrent(self, data_points: Iterable[Dict], concurrency: int = 64) -> int:
+        """
+        Încărcare în volum mare: inserări pregătite individuale, cu până la
+        `concurrency` cereri în zbor, apoi indexul de ani o singură dată.
+        Întoarce numărul de rânduri scrise.
+        """
+        data_points = list(data_points)
+        if not data_points:
+            return 0
+        prepared = prepare(self.session, self.INSERT)
+        params = (
+            (
+                point['asset_id'],
+                point['data_source_id'],
+                point['business_date_year'],
+                point['business_date'],
+                point['system_time'],
+                {k: str(v) for k, v in point['data_values'].items()}
+            )
+            for point in data_points
+        )
+        # Rezultatele se consumă pe măsură ce sosesc, fără a fi păstrate în memorie
+        for _ in execute_concurrent_with_args(self.session, prepared, params, concurrency=concurrency,
+                                              raise_on_first_error=True, results_generator=True):
+            pass
+        self.year_index.record(data_points, backfill=self.rebuild_year_index)
+        return len(data_points)
+
     def delete(self, data_point: Dict) -> None:
         query = """
         DELETE FROM time_series_data 
@@ -213,8 +353,8 @@ class TimeSeriesRepository(WarehouseRepository):
         """
         Returnează cea mai recentă versiune pentru fiecare dată într-un interval
         """
-        # Obținem toate anii din interval
-        years = list(range(start_date.year, end_date.year + 1))
+        # Obținem anii din interval care au date, conform indexului de ani
+        years = self.find_years_between(asset_id, data_source_id, start_date, end_date)
         all_data = []
         
         # Colectăm datele pentru fiecare an
@@ -246,6 +386,45 @@ class TimeSeriesRepository(WarehouseRepository):
         sorted_dates = sorted(latest_per_date.keys(), reverse=True)
         return [latest_per_date[d] for d in sorted_dates]
 
+    def iter_latest_per_date(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start_date: date,
+        end_date: date,
+        fetch_size: int = 1000
+    ) -> Iterator[Dict]:
+        """
+        Ca `find_latest_per_date`, dar în ordine crescătoare și fără a încărca
+        intervalul în memorie: partițiile se citesc pe pagini de `fetch_size`
+        rânduri, iar în memorie stă doar grupul de versiuni al datei curente.
+        """
+        query = SimpleStatement("""
+        SELECT * FROM time_series_data 
+        WHERE asset_id = %s 
+        AND data_source_id = %s 
+        AND business_date_year = %s
+        AND business_date >= %s AND business_date <= %s
+        ORDER BY business_date ASC, system_time ASC
+        """, fetch_size=fetch_size)
+
+        for year in self.find_years_between(asset_id, data_source_id, start_date, end_date):
+            rows = self.session.execute(query, (
+                asset_id,
+                data_source_id,
+                year,
+                max(start_date, date(year, 1, 1)),
+                min(end_date, date(year, 12, 31))
+            ))
+            # În ordine crescătoare, ultima versiune a unei date este ultimul rând al grupului
+            current = None
+            for row in rows:
+                if current is not None and row['business_date'] != current['business_date']:
+                    yield current
+                current = row
+            if current is not None:
+                yield current
+
     def find_all(
         self, 
         key: Dict, 
@@ -255,12 +434,6 @@ class TimeSeriesRepository(WarehouseRepository):
         """
         Găsește toate datele de serie temporală cu filtrare opțională
         """
-        query = """
-        SELECT * FROM time_series_data 
-        WHERE asset_id = %s 
-        AND data_source_id = %s 
-        AND business_date_year = %s
-        """
         params = [
             key['asset_id'],
             key['data_source_id'],
@@ -269,11 +442,434 @@ class TimeSeriesRepository(WarehouseRepository):
         
         # Adăugăm filtrele pentru dată dacă sunt specificate
         if start_date:
-            query += " AND business_date >= %s"
             params.append(start_date)
         if end_date:
-            query += " AND business_date <= %s"
             params.append(end_date)
         
+        # Citire idempotentă: poate fi trimisă speculativ la o a doua replică
+        statement = prepare(self.session, self.select_query(bool(start_date), bool(end_date)), idempotent=True)
+        result = self.session.execute(statement, tuple(params))
+        return list(result)
+
+    @staticmethod
+    def select_query(with_start: bool, with_end: bool) -> str:
+        query = """
+        SELECT * FROM time_series_data 
+        WHERE asset_id = ? 
+        AND data_source_id = ? 
+        AND business_date_year = ?
+        """
+        if with_start:
+            query += " AND business_date >= ?"
+        if with_end:
+            query += " AND business_date <= ?"
+        return query
+
+    def find_years(self, asset_id: str, data_source_id: str) -> List[int]:
+        """
+        Returnează anii (partițiile) care conțin date pentru asset și sursă, doar din
+        index. Un asset fără index (necunoscut sau neindexat încă) nu are ani; datele
+        vechi se indexează cu `python setup_db.py --rebuild-year-index`.
+        """
+        index = self.year_index.find_all({'asset_id': asset_id, 'data_source_id': data_source_id})
+        return [row['business_date_year'] for row in index]
+
+    def find_years_between(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[int]:
+        """
+        Anii de citit pentru un interval. Pentru un singur an nu se consultă
+        indexul; altfel se sar anii fără date în interval. Fără index (date
+        ingerate înainte de el) se citesc toți anii.
+        """
+        if start_date.year == end_date.year:
+            return [start_date.year]
+        index = self.year_index.find_all({'asset_id': asset_id, 'data_source_id': data_source_id})
+        return self.select_years(index, start_date, end_date)
+
+    @staticmethod
+    def select_years(index: List[Dict], start_date: date, end_date: date) -> List[int]:
+        """Anii din index care au date în interval; fără index, toți anii intervalului"""
+        if not index:
+            return list(range(start_date.year, end_date.year + 1))
+        return [
+            row['business_date_year'] for row in index
+            if start_date.year <= row['business_date_year'] <= end_date.year
+            and as_date(row['max_date']) >= start_date and as_date(row['min_date']) <= end_date
+        ]
+
+    def scan_years(self, asset_id: str, data_source_id: str) -> List[int]:
+        """
+        Găsește anii printr-o scanare cu ALLOW FILTERING. Se folosește doar la
+        reconstruirea indexului, niciodată pe calea cererilor.
+        """
+        query = """
+        SELECT business_date_year 
+        FROM time_series_data 
+        WHERE asset_id = %s AND data_source_id = %s 
+        ALLOW FILTERING
+        """
+        rows = self.session.execute(query, (asset_id, data_source_id))
+        return sorted({row['business_date_year'] for row in rows})
+
+    def rebuild_year_index(self, asset_id: str, data_source_id: str) -> int:
+        """Reconstruiește indexul de ani pentru datele existente; întoarce numărul de ani"""
+        key = {'asset_id': asset_id, 'data_source_id': data_source_id}
+        self.year_index.delete_all(key)
+        years = self.scan_years(asset_id, data_source_id)
+        for year in years:
+            rows = self.find_all({**key, 'business_date_year': year})
+            dates = [as_date(row['business_date']) for row in rows]
+            self.year_index.save({
+                **key,
+                'business_date_year': year,
+                'min_date': min(dates),
+                'max_date': max(dates),
+                'row_count': len(rows)
+            })
+        return len(years)
+
+
+class SketchRepository(WarehouseRepository):
+    """Sketch-uri lunare (t-digest, HyperLogLog) per asset și sursă"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, "monthly_sketches")
+
+    def save(self, bucket: Dict) -> Dict:
+        query = """
+        INSERT INTO monthly_sketches 
+        (asset_id, data_source_id, business_date_year, business_date_month,
+         returns_digest, volume_digest, distinct_dates, row_count, updated_at) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        self.session.execute(query, (
+            bucket['asset_id'],
+            bucket['data_source_id'],
+            bucket['business_date_year'],
+            bucket['business_date_month'],
+            bucket['returns_digest'],
+            bucket['volume_digest'],
+            bucket['distinct_dates'],
+            bucket['row_count'],
+            bucket.get('updated_at', datetime.now())
+        ))
+        return bucket
+
+    def delete_all(self, key: Dict) -> None:
+        query = "DELETE FROM monthly_sketches WHERE asset_id = %s AND data_source_id = %s"
+        self.session.execute(query, (key['asset_id'], key['data_source_id']))
+
+    def find_all(
+        self,
+        key: Dict,
+        start: tuple = None,
+        end: tuple = None
+    ) -> List[Dict]:
+        """
+        Citește bucket-urile dintr-o singură partiție, opțional între
+        (an, lună) de start și (an, lună) de final inclusiv
+        """
+        query = """
+        SELECT * FROM monthly_sketches 
+        WHERE asset_id = %s AND data_source_id = %s
+        """
+        params = [key['asset_id'], key['data_source_id']]
+
+        if start:
+            query += " AND (business_date_year, business_date_month) >= (%s, %s)"
+            params.extend(start)
+        if end:
+            query += " AND (business_date_year, business_date_month) <= (%s, %s)"
+            params.extend(end)
+
         result = self.session.execute(query, tuple(params))
-        return list(result)
\ No newline at end of file
+        return list(result)
+
+
+class ModelStateRepository(WarehouseRepository):
+    """Starea persistată a unui model (fereastra de prețuri) între rulări"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, "model_state")
+
+    def save(self, state: Dict) -> Dict:
+        query = """
+        INSERT INTO model_state 
+        (asset_id, data_source_id, model_name, last_date,
+         window_dates, window_closes, rows_seen, updated_at) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        self.session.execute(query, (
+            state['asset_id'],
+            state['data_source_id'],
+            state['model_name'],
+            state['last_date'],
+            state['window_dates'],
+            state['window_closes'],
+            state['rows_seen'],
+            state.get('updated_at', datetime.now())
+        ))
+        return state
+
+    def delete(self, state: Dict) -> None:
+        query = """
+        DELETE FROM model_state 
+        WHERE asset_id = %s AND data_source_id = %s AND model_name = %s
+        """
+        self.session.execute(query, (state['asset_id'], state['data_source_id'], state['model_name']))
+
+    def find_latest(self, key: Dict) -> Optional[Dict]:
+        query = """
+        SELECT * FROM model_state 
+        WHERE asset_id = %s AND data_source_id = %s AND model_name = %s
+        """
+        result = self.session.execute(query, (
+            key['asset_id'], key['data_source_id'], key['model_name']
+        ))
+        state = result.one()
+        if state:
+            state['last_date'] = as_date(state['last_date'])
+            state['window_dates'] = [as_date(d) for d in state['window_dates'] or []]
+            state['window_closes'] = list(state['window_closes'] or [])
+        return state
+
+
+class ModelRegistryRepository(WarehouseRepository):
+    """Versiunile modelelor înregistrate"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, "model_registry")
+
+    def save(self, model: Dict) -> Dict:
+        query = """
+        INSERT INTO model_registry 
+        (model_name, version, created_at, description, parameters) 
+        VALUES (%s, %s, %s, %s, %s)
+        """
+        self.session.execute(query, (
+            model['model_name'],
+            model['version'],
+            model.get('created_at', datetime.now()),
+            model.get('description', ''),
+            {k: str(v) for k, v in model.get('parameters', {}).items()}
+        ))
+        return model
+
+    def find_latest(self, model_name: str) -> Optional[Dict]:
+        query = "SELECT * FROM model_registry WHERE model_name = %s LIMIT 1"
+        return self.session.execute(query, (model_name,)).one()
+
+    def find_all(self, model_name: str) -> List[Dict]:
+        query = "SELECT * FROM model_registry WHERE model_name = %s"
+        return list(self.session.execute(query, (model_name,)))
+
+
+class ModelRunRepository(WarehouseRepository):
+    """Rulările de antrenare per asset și predicțiile fiecărei rulări"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, "model_runs")
+
+    def save(self, run: Dict) -> Dict:
+        """Scrie întâi predicțiile, apoi rularea, ca o rulare vizibilă să fie completă"""
+        prediction_query = """
+        INSERT INTO run_predictions 
+        (asset_id, run_id, prediction_date, predicted_close) 
+        VALUES (%s, %s, %s, %s)
+        """
+        batch = BatchStatement()
+        for prediction in run['predictions']:
+            batch.add(prediction_query, (
+                run['asset_id'],
+                run['run_id'],
+                prediction['prediction_date'],
+                prediction['predicted_close']
+            ))
+        self.session.execute(batch)
+
+        run_query = """
+        INSERT INTO model_runs 
+        (asset_id, run_id, model_name, model_version, data_source_id,
+         trained_until, created_at) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        self.session.execute(run_query, (
+            run['asset_id'],
+            run['run_id'],
+            run['model_name'],
+            run['model_version'],
+            run['data_source_id'],
+            run.get('trained_until'),
+            run['created_at']
+        ))
+        return run
+
+    def find_latest(self, asset_id: str) -> Optional[Dict]:
+        query = "SELECT * FROM model_runs WHERE asset_id = %s LIMIT 1"
+        return self.session.execute(query, (asset_id,)).one()
+
+    def find_all(self, asset_id: str, limit: int = 20) -> List[Dict]:
+        query = "SELECT * FROM model_runs WHERE asset_id = %s LIMIT %s"
+        return list(self.session.execute(query, (asset_id, limit)))
+
+    def find_predictions(self, asset_id: str, run_id) -> List[Dict]:
+        query = """
+        SELECT prediction_date, predicted_close FROM run_predictions 
+        WHERE asset_id = %s AND run_id = %s
+        """
+        return list(self.session.execute(query, (asset_id, run_id)))
+
+
+class BacktestRepository(WarehouseRepository):
+    """Erorile MAE/MAPE per orizont, pentru compararea modelelor"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, "backtest_results")
+
+    def save(self, result: Dict) -> Dict:
+        """Scrie un rând per orizont de predicție, într-un singur batch"""
+        query = """
+        INSERT INTO backtest_results 
+        (asset_id, model_name, backtest_time, horizon, data_source_id,
+         mae, mape, samples, start_date, end_date) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        batch = BatchStatement()
+        for horizon, (mae, mape) in enumerate(zip(result['mae'], result['mape']), start=1):
+            batch.add(query, (
+                result['asset_id'],
+                result['model_name'],
+                result['backtest_time'],
+                horizon,
+                result['data_source_id'],
+                mae,
+                mape,
+                result['samples'],
+                result.get('start_date'),
+                result.get('end_date')
+            ))
+        self.session.execute(batch)
+        return result
+
+    def find_all(self, asset_id: str, model_name: str = None) -> List[Dict]:
+        query = "SELECT * FROM backtest_results WHERE asset_id = %s"
+        params = [asset_id]
+        if model_name:
+            query += " AND model_name = %s"
+            params.append(model_name)
+        return list(self.session.execute(query, tuple(params)))
+
+
+class IndicatorRepository(WarehouseRepository):
+    """Feature store: indicatorii tehnici per zi, cu aceeași cheie ca time_series_data"""
+
+    COLUMNS = (
+        'close', 'observations', 'ema_12', 'ema_26', 'macd', 'macd_signal',
+        'macd_histogram', 'avg_gain', 'avg_loss', 'rsi_14',
+        'bb_middle', 'bb_upper', 'bb_lower'
+    )
+
+    def __init__(self, session: Session):
+        super().__init__(session, "technical_indicators")
+        self._insert = None
+
+    def save_batch(self, rows: List[Dict]) -> None:
+        """Scrie rândurile concurent, printr-o interogare pregătită o singură dată"""
+        if not rows:
+            return
+        if self._insert is None:
+            names = ", ".join(self.COLUMNS)
+            markers = ", ".join("?" for _ in self.COLUMNS)
+            self._insert = self.session.prepare(f"""
+            INSERT INTO technical_indicators 
+            (asset_id, data_source_id, business_date_year, business_date,
+             {names}, updated_at) 
+            VALUES (?, ?, ?, ?, {markers}, ?)
+            """)
+
+        now = datetime.now()
+        params = [
+            (
+                row['asset_id'],
+                row['data_source_id'],
+                row['business_date_year'],
+                row['business_date'],
+                *(row.get(column) for column in self.COLUMNS),
+                now
+            )
+            for row in rows
+        ]
+        execute_concurrent_with_args(self.session, self._insert, params,
+                                     concurrency=32, raise_on_first_error=True)
+
+    def find_range(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Dict]:
+        """Indicatorii dintr-un interval, în ordine cronologică"""
+        query = """
+        SELECT * FROM technical_indicators 
+        WHERE asset_id = %s AND data_source_id = %s 
+        AND business_date_year = %s 
+        AND business_date >= %s AND business_date <= %s
+        """
+        rows = []
+        for year in range(start_date.year, end_date.year + 1):
+            rows.extend(self.session.execute(query, (
+                asset_id, data_source_id, year,
+                max(start_date, date(year, 1, 1)), min(end_date, date(year, 12, 31))
+            )))
+        rows.sort(key=lambda r: r['business_date'])
+        return rows
+
+    def find_before(
+        self,
+        asset_id: str,
+        data_source_id: str,
+        before: date,
+        limit: int,
+        lookback_years: int = 2
+    ) -> List[Dict]:
+        """
+        Ultimele `limit` zile dinaintea unei date, în ordine cronologică. Se caută
+        doar în anul datei și în `lookback_years` ani anteriori; după o pauză mai
+        lungă rezultatul este gol, iar apelantul trebuie să reconstruiască starea.
+        """
+        query = """
+        SELECT * FROM technical_indicators 
+        WHERE asset_id = %s AND data_source_id = %s 
+        AND business_date_year = %s AND business_date < %s 
+        LIMIT %s
+        """
+        rows = []
+        for year in range(before.year, before.year - lookback_years - 1, -1):
+            rows.extend(self.session.execute(query, (
+                asset_id, data_source_id, year, before, limit - len(rows)
+            )))
+            if len(rows) >= limit:
+                break
+        return list(reversed(rows))
+
+    def find_latest(self, key: Dict, limit: int = 1) -> List[Dict]:
+        """Cele mai recente `limit` zile calculate, în ordine cronologică"""
+        return self.find_before(
+            key['asset_id'], key['data_source_id'], date.today() + timedelta(days=1), limit
+        )
+
+
+# Instrucțiunile căii fierbinți, pregătite la pornire (text, idempotentă)
+HOT_STATEMENTS = [
+    (TimeSeriesRepository.select_query(with_start, with_end), True)
+    for with_start in (False, True) for with_end in (False, True)
+] + [
+    (YearIndexRepository.SELECT, True),
+    (TimeSeriesRepository.INSERT, False)
+]
@@ -0,0 +1,207 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import features
+from events import INGEST_COMPLETED, TRAINING_COMPLETED, event_bus
+from model_registry import ModelRegistry
+from model_training import (
+    MODEL_NAME,
+    MODEL_VERSION,
+    predict_future_prices,
+    prepare_insert,
+    register_model,
+    save_predictions
+)
+from repositories import ModelStateRepository, TimeSeriesRepository, as_date
+
+WINDOW_SIZE = 100  # Aceeași fereastră ca la antrenarea completă
+BOOTSTRAP_DAYS = 3 * 366
+HORIZON = 7
+
+
+class IncrementalModel:
+    """
+    Modelul WeightedMovingAverage cu stare persistată: fereastra ultimelor
+    WINDOW_SIZE prețuri de închidere. O actualizare costă O(rânduri noi).
+    """
+
+    def __init__(self, session, data_source_id: str = 'ALPHAVANTAGE'):
+        self.data_source_id = data_source_id
+        self.state_repository = ModelStateRepository(session)
+        self.ts_repository = TimeSeriesRepository(session)
+
+    def load_state(self, asset_id: str) -> Optional[Dict]:
+        return self.state_repository.find_latest({
+            'asset_id': asset_id,
+            'data_source_id': self.data_source_id,
+            'model_name': MODEL_NAME
+        })
+
+    def bootstrap_state(self, asset_id: str) -> Dict:
+        """Prima rulare pentru un asset: citește o singură dată istoricul recent"""
+        end = date.today()
+        rows = self.ts_repository.find_latest_per_date(
+            asset_id, self.data_source_id, end - timedelta(days=BOOTSTRAP_DAYS), end
+        )
+        rows = list(reversed(rows[:WINDOW_SIZE]))
+        return {
+            'asset_id': asset_id,
+            'data_source_id': self.data_source_id,
+            'model_name': MODEL_NAME,
+            'last_date': as_date(rows[-1]['business_date']) if rows else None,
+            'window_dates': [as_date(r['business_date']) for r in rows],
+            'window_closes': [float(r['data_values']['close']) for r in rows],
+            'rows_seen': len(rows)
+        }
+
+    @staticmethod
+    def apply(state: Dict, data_points: List[Dict]) -> Dict:
+        """
+        Integrează rândurile noi în fereastră. Datele mai noi se adaugă, revizuirile
+        din fereastră înlocuiesc valoarea veche, iar cele mai vechi decât fereastra
+        nu influențează modelul și sunt ignorate.
+        """
+        window = dict(zip(state['window_dates'], state['window_closes']))
+        oldest = state['window_dates'][0] if len(window) >= WINDOW_SIZE else None
+
+        for point in sorted(data_points, key=lambda p: p['business_date']):
+            business_date = as_date(point['business_date'])
+            if oldest is not None and business_date < oldest:
+                continue
+            window[business_date] = float(point['data_values']['close'])
+
+        dates = sorted(window)[-WINDOW_SIZE:]
+        state['window_dates'] = dates
+        state['window_closes'] = [window[d] for d in dates]
+        state['last_date'] = dates[-1] if dates else None
+        state['rows_seen'] = (state.get('rows_seen') or 0) + len(data_points)
+        state['updated_at'] = datetime.now()
+        return state
+
+    @staticmethod
+    def predict(state: Dict, horizon: int = HORIZON) -> List[float]:
+        closes = np.asarray(state['window_closes'], dtype=np.float64)
+        if len(closes) >= len(features.WMA_WEIGHTS):
+            return features.wma_forecast(closes, horizon).tolist()
+        return predict_future_prices(closes.tolist(), horizon)
+
+    def update(self, asset_id: str, data_points: List[Dict]) -> Dict:
+        state = self.load_state(asset_id)
+        if state is None:
+            # Starea inițială include deja rândurile abia scrise
+            state = self.bootstrap_state(asset_id)
+        else:
+            state = self.apply(state, data_points)
+        if state['window_closes']:
+            self.state_repository.save(state)
+        return state
+
+
+class RetrainingScheduler:
+    """
+    Reantrenează, pe un fir de fundal, doar asset-urile atinse de ingestie.
+    Declanșările repetate pentru același asset se comasează într-una singură.
+    """
+
+    def __init__(self, session, data_source_id: str = 'ALPHAVANTAGE', bus=event_bus):
+        self.session = session
+        self.data_source_id = data_source_id
+        self.bus = bus
+        self.model = IncrementalModel(session, data_source_id)
+        self.registry = ModelRegistry(session)
+        self._pending: Dict[str, List[Dict]] = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._insert_statement = None
+        self.completed = 0
+        self.coalesced = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="retraining", daemon=True)
+        self._thread.start()
+        self.bus.subscribe(INGEST_COMPLETED, self.on_ingest)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.bus.unsubscribe(INGEST_COMPLETED, self.on_ingest)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def on_ingest(self, event: Dict) -> None:
+        # Reantrenarea rulează doar în procesul care a ingerat
+        if event.get('relayed') or event.get('data_source_id') != self.data_source_id:
+            return
+        self.trigger(event['asset_id'], event.get('data_points', []))
+
+    def trigger(self, asset_id: str, data_points: List[Dict] = None) -> None:
+        with self._condition:
+            if asset_id in self._pending:
+                self.coalesced += 1
+                self._pending[asset_id].extend(data_points or [])
+            else:
+                self._pending[asset_id] = list(data_points or [])
+            self._condition.notify()
+
+    def pending(self) -> List[str]:
+        with self._condition:
+            return list(self._pending)
+
+    def _next(self):
+        with self._condition:
+            while self._running and not self._pending:
+                self._condition.wait()
+            if not self._running:
+                return None
+            asset_id = next(iter(self._pending))
+            return asset_id, self._pending.pop(asset_id)
+
+    def _run(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            asset_id, data_points = item
+            try:
+                self.retrain(asset_id, data_points)
+            except Exception as e:
+                print(f"Eroare la reantrenarea {asset_id}: {e}")
+
+    def retrain(self, asset_id: str, data_points: List[Dict]) -> Dict:
+        started = time.perf_counter()
+        state = self.model.update(asset_id, data_points)
+        if not state['window_closes']:
+            return {'asset_id': asset_id, 'predictions': []}
+
+        predictions = self.model.predict(state)
+        if self._insert_statement is None:
+            self._insert_statement = prepare_insert(self.session)
+        save_predictions(self.session, asset_id, predictions, self._insert_statement)
+        register_model(self.registry)
+        run = self.registry.record_run(
+            asset_id, MODEL_NAME, MODEL_VERSION, predictions,
+            data_source_id=self.data_source_id, trained_until=state['last_date']
+        )
+
+        result = {
+            'asset_id': asset_id,
+            'data_source_id': self.data_source_id,
+            'model_name': MODEL_NAME,
+            'last_date': state['last_date'],
+            'predictions': predictions,
+            'run': run,
+            'duration_s': time.perf_counter() - started
+        }
+        self.completed += 1
+        self.bus.publish(TRAINING_COMPLETED, result)
+        return result
@@ -0,0 +1,68 @@
+import json
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from cassandra.util import Date, Duration, SortedSet
+from fastapi.responses import JSONResponse
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # Fără orjson se folosește modulul standard json
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Tipurile pe care encoder-ul nativ nu le cunoaște (în special cele ale driver-ului)"""
+    if isinstance(value, Date):
+        # Date-ul driver-ului devine dată ISO, nu {"days_from_epoch": ...}
+        try:
+            return value.date().isoformat()
+        except ValueError:
+            return str(value)
+    if isinstance(value, Mapping):
+        # OrderedMapSerializedKey, tipul coloanelor map
+        return dict(value)
+    if isinstance(value, (set, frozenset, SortedSet)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Duration):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    # Doar pentru json standard; orjson le serializează nativ
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializează direct rândurile din Cassandra, fără trecerea prin jsonable_encoder"""
+    with span("serialize"):
+        if orjson is not None:
+            return orjson.dumps(
+                content,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Răspuns JSON serializat cu orjson. Endpoint-urile îl returnează explicit:
+    un dict returnat simplu trece întâi prin jsonable_encoder-ul FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
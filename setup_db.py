@@ -1,47 +1,74 @@
-from cassandra.cluster import Cluster
-from cassandra.auth import PlainTextAuthProvider
 from cassandra.cqlengine import connection, management
-from dotenv import load_dotenv
 import os
+import sys
+
+from database import connection_manager
 
 from entities import (
     Asset, 
     DataSource, 
     TimeSeriesData,
-    Prediction
+    Prediction,
+    MonthlySketch,
+    ModelState,
+    ModelVersion,
+    ModelRun,
+    RunPrediction,
+    BacktestResult,
+    TechnicalIndicators,
+    AssetYearIndex
 )
+from repositories import AssetsRepository, TimeSeriesRepository
 
-def create_tables():
-    # Încarcă variabilele din fișierul .env
-    load_dotenv()
-
-    ASTRA_DB_ID = os.getenv("ASTRA_DB_ID")
-    ASTRA_DB_REGION = os.getenv("ASTRA_DB_REGION")
-    ASTRA_DB_KEYSPACE = os.getenv("ASTRA_DB_KEYSPACE")
-    ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRA_DB_APPLICATION_TOKEN")
+# Entitățile sincronizate de `create_tables` și verificate la pornirea API-ului
+ENTITIES = (
+    Asset,
+    DataSource,
+    TimeSeriesData,
+    Prediction,
+    MonthlySketch,
+    ModelState,
+    ModelVersion,
+    ModelRun,
+    RunPrediction,
+    BacktestResult,
+    TechnicalIndicators,
+    AssetYearIndex
+)
 
+def create_tables():
     # Setează permisiunea pentru schema management
     os.environ["CQLENG_ALLOW_SCHEMA_MANAGEMENT"] = "1"
 
-    # Configurare conexiune Astra DB
-    cloud_config = {
-        'secure_connect_bundle': 'data/secure-connect-dw-cassandra.zip'
-    }
-    auth_provider = PlainTextAuthProvider('token', ASTRA_DB_APPLICATION_TOKEN)
-    cluster = Cluster(cloud=cloud_config, auth_provider=auth_provider)
-    session = cluster.connect()
-
-    # Selectează keyspace-ul tău
-    session.set_keyspace(ASTRA_DB_KEYSPACE)
+    # Conexiunea comună, deja pe keyspace-ul din .env
+    session = connection_manager.session
 
-    # Conectează CQLEngine la sesiune
+    # Conectează CQLEngine la sesiune (profilul implicit întoarce deja dict-uri)
     connection.set_session(session)
 
     # Creează tabelele
-    management.sync_table(Asset)
-    management.sync_table(DataSource)
-    management.sync_table(TimeSeriesData)
-    management.sync_table(Prediction)
+    for entity in ENTITIES:
+        management.sync_table(entity)
+
+    return session
+
+def missing_tables(session) -> list:
+    # Verificare fără DDL: tabelele lipsă din metadatele deja încărcate de driver
+    keyspace = session.cluster.metadata.keyspaces.get(session.keyspace)
+    existing = set(keyspace.tables) if keyspace is not None else set()
+    return [entity.__table_name__ for entity in ENTITIES if entity.__table_name__ not in existing]
+
+def rebuild_year_index(session, data_source_id: str = 'ALPHAVANTAGE'):
+    # Populează indexul de ani pentru datele ingerate înainte ca acesta să existe
+    ts_repo = TimeSeriesRepository(session)
+    for asset_id in AssetsRepository(session).find_all_ids():
+        years = ts_repo.rebuild_year_index(asset_id, data_source_id)
+        print(f"{asset_id}: {years} ani indexați")
 
 if __name__ == "__main__":
-    create_tables()
\ No newline at end of file
+    session = create_tables()
+    try:
+        if "--rebuild-year-index" in sys.argv:
+            rebuild_year_index(session)
+    finally:
+        connection_manager.shutdown()
\ No newline at end of file
@@ -0,0 +1,161 @@
+import hashlib
+import math
+import numpy as np
+from typing import Iterable, Optional
+
+
+class TDigest:
+    """
+    Sketch t-digest (varianta "merging") pentru cuantile aproximative.
+    Două digest-uri se pot combina fără a reciti datele brute.
+    """
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        if len(means) == 0:
+            return
+
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        new_means, new_weights = [], []
+        current_mean, current_weight = means[0], weights[0]
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (weight_so_far + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                new_means.append(current_mean)
+                new_weights.append(current_weight)
+                weight_so_far += current_weight
+                q_limit = self._k_inverse(self._k(weight_so_far / total) + 1)
+                current_mean, current_weight = mean, weight
+
+        new_means.append(current_mean)
+        new_weights.append(current_weight)
+        self.means = np.asarray(new_means, dtype=np.float64)
+        self.weights = np.asarray(new_weights, dtype=np.float64)
+
+    def update(self, values: Iterable[float]) -> "TDigest":
+        values = np.asarray(list(values) if not isinstance(values, np.ndarray) else values,
+                            dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(
+            np.concatenate([self.means, values]),
+            np.concatenate([self.weights, np.ones(len(values))])
+        )
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if other.count == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights])
+        )
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+
+        # Centrele centroizilor pe axa greutăților cumulate, mărginite de min/max
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.count, positions, values))
+
+    def to_bytes(self) -> bytes:
+        header = np.array([self.compression, self.min, self.max], dtype='<f8')
+        return np.concatenate([header, self.means, self.weights]).astype('<f8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        array = np.frombuffer(data, dtype='<f8')
+        digest = cls(compression=float(array[0]))
+        digest.min, digest.max = float(array[1]), float(array[2])
+        size = (len(array) - 3) // 2
+        digest.means = array[3:3 + size].copy()
+        digest.weights = array[3 + size:].copy()
+        return digest
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog pentru numărări distincte aproximative, combinabil prin max"""
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @staticmethod
+    def _hash(value) -> int:
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def update(self, values: Iterable) -> "HyperLogLog":
+        p = self.precision
+        for value in values:
+            h = self._hash(value)
+            index = h >> (64 - p)
+            remainder = h & ((1 << (64 - p)) - 1)
+            rank = (64 - p) - remainder.bit_length() + 1
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+
+        # Corecție pentru cardinalități mici (linear counting)
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        sketch = cls(precision=data[0])
+        sketch.registers = np.frombuffer(data[1:], dtype=np.uint8).copy()
+        return sketch
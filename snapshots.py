@@ -0,0 +1,208 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from repositories import AssetsRepository, TimeSeriesRepository, as_date
+
+SNAPSHOT_ROOT = os.getenv("SNAPSHOT_ROOT", "data/snapshots")
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Snapshot:
+    """
+    Snapshot columnar local al istoricului OHLCV pentru un asset.
+    Coloanele sunt tablouri NumPy mapate în memorie (fără copiere).
+    """
+
+    def __init__(self, asset_id: str, data_source_id: str, columns: Dict[str, np.ndarray], meta: dict):
+        self.asset_id = asset_id
+        self.data_source_id = data_source_id
+        self.columns = columns
+        self.meta = meta
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.columns['business_date']
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def between(self, start: date, end: date) -> Dict[str, np.ndarray]:
+        """Returnează vederi (nu copii) pe intervalul cerut, prin căutare binară"""
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')
+        return {name: column[lo:hi] for name, column in self.columns.items()}
+
+
+def snapshot_dir(asset_id: str, data_source_id: str = 'ALPHAVANTAGE', root: str = SNAPSHOT_ROOT) -> str:
+    return os.path.join(root, data_source_id, asset_id)
+
+
+def current_version_dir(directory: str) -> str:
+    """
+    Directorul versiunii curente, indicat de fișierul `CURRENT`; snapshot-urile
+    exportate înainte de versionare au coloanele direct în `directory`
+    """
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            return os.path.join(directory, f.read().strip())
+    except FileNotFoundError:
+        return directory
+
+
+def read_meta(directory: str) -> Optional[dict]:
+    path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_snapshot(asset_id: str, data_source_id: str = 'ALPHAVANTAGE', root: str = SNAPSHOT_ROOT) -> Optional[Snapshot]:
+    """Deschide snapshot-ul unui asset cu mmap; None dacă nu a fost exportat sau este incomplet"""
+    directory = current_version_dir(snapshot_dir(asset_id, data_source_id, root))
+    meta = read_meta(directory)
+    if meta is None:
+        return None
+
+    try:
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in ('business_date',) + FIELDS
+        }
+    except (FileNotFoundError, ValueError):
+        return None
+    # Coloane din exporturi diferite nu trebuie combinate niciodată
+    if any(len(column) != meta['rows'] for column in columns.values()):
+        return None
+    return Snapshot(asset_id, data_source_id, columns, meta)
+
+
+def rows_to_columns(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """Rândurile (ultima versiune per dată) devin coloane în ordine cronologică"""
+    rows = sorted(rows, key=lambda r: as_date(r['business_date']))
+    columns = {
+        'business_date': np.array(
+            [as_date(r['business_date']) for r in rows], dtype='datetime64[D]'
+        )
+    }
+    for field in FIELDS:
+        columns[field] = np.array(
+            [float(r['data_values'].get(field, 'nan')) for r in rows], dtype=np.float64
+        )
+    return columns
+
+
+def write_columns(directory: str, columns: Dict[str, np.ndarray], meta: dict) -> None:
+    """
+    Scrie exportul complet într-un director de versiune nou, apoi mută atomic
+    pointerul `CURRENT`. Cititorii văd fie versiunea veche, fie pe cea nouă,
+    niciodată un amestec; cei care au deja coloanele mapate le păstrează.
+    """
+    version = f"v{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir)
+    for name, column in columns.items():
+        np.save(os.path.join(version_dir, f"{name}.npy"), np.ascontiguousarray(column))
+    with open(os.path.join(version_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    pointer = os.path.join(directory, 'CURRENT')
+    with open(pointer + ".tmp", 'w') as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    remove_old_versions(directory, keep=(version,))
+
+
+def remove_old_versions(directory: str, keep: tuple, retain: int = 1) -> None:
+    """
+    Șterge versiunile vechi, păstrând ultimele `retain` dinaintea celei curente:
+    un cititor care tocmai a citit pointerul vechi le poate încă deschide
+    """
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith('v') and name not in keep and os.path.isdir(os.path.join(directory, name))
+    )
+    for name in versions[:max(0, len(versions) - retain)]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def export_snapshot(
+    ts_repository: TimeSeriesRepository,
+    asset_id: str,
+    data_source_id: str = 'ALPHAVANTAGE',
+    root: str = SNAPSHOT_ROOT,
+    full: bool = False
+) -> int:
+    """
+    Exportă (sau actualizează incremental de la ultima dată exportată) snapshot-ul
+    unui asset. Ultima zi exportată este recitită pentru a prinde versiuni noi.
+    Returnează numărul de rânduri citite din Cassandra.
+    """
+    directory = snapshot_dir(asset_id, data_source_id, root)
+    existing = None if full else load_snapshot(asset_id, data_source_id, root)
+    end = date.today()
+
+    if existing is not None and len(existing):
+        start = date.fromisoformat(existing.meta['last_date'])
+    else:
+        existing = None
+        years = ts_repository.find_years(asset_id, data_source_id)
+        if not years:
+            return 0
+        start = date(years[0], 1, 1)
+
+    rows = ts_repository.find_latest_per_date(asset_id, data_source_id, start, end)
+    if not rows:
+        return 0
+    fresh = rows_to_columns(rows)
+
+    if existing is not None:
+        keep = np.searchsorted(existing.dates, np.datetime64(start, 'D'), side='left')
+        columns = {
+            name: np.concatenate([existing.columns[name][:keep], fresh[name]])
+            for name in fresh
+        }
+    else:
+        columns = fresh
+
+    write_columns(directory, columns, {
+        'asset_id': asset_id,
+        'data_source_id': data_source_id,
+        'rows': int(len(columns['business_date'])),
+        'first_date': str(columns['business_date'][0]),
+        'last_date': str(columns['business_date'][-1]),
+        'exported_at': datetime.now().isoformat()
+    })
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export snapshot-uri columnare locale (NumPy mmap)")
+    parser.add_argument("--assets", nargs="*", help="Asset-urile exportate (implicit toate)")
+    parser.add_argument("--data-source", default="ALPHAVANTAGE")
+    parser.add_argument("--root", default=SNAPSHOT_ROOT)
+    parser.add_argument("--full", action="store_true", help="Ignoră snapshot-ul existent")
+    args = parser.parse_args()
+
+    from database import connection_manager
+    session = connection_manager.session
+    try:
+        ts_repository = TimeSeriesRepository(session)
+        assets = args.assets or AssetsRepository(session).find_all_ids()
+        for asset_id in assets:
+            count = export_snapshot(ts_repository, asset_id, args.data_source, args.root, args.full)
+            print(f"{asset_id}: {count} rânduri citite, snapshot în {snapshot_dir(asset_id, args.data_source, args.root)}")
+    finally:
+        connection_manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from metrics import registry
+
+logger = logging.getLogger("startup")
+
+
+class StartupTracker:
+    """
+    Etapele pornirii aplicației: durata fiecăreia, rezultatul pașilor din
+    fundal și momentul în care instanța devine gata să primească trafic.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.status: Dict[str, str] = {}
+        self.ready_after: Optional[float] = None
+        self.details: Dict = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+            self.status[name] = "ok"
+        except Exception as e:
+            self.status[name] = f"error: {e}"
+            raise
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    async def run(self, name: str, fn: Callable, *args):
+        """Rulează un pas blocant în threadpool; eroarea se înregistrează, nu oprește pornirea"""
+        try:
+            with self.phase(name):
+                return await run_in_threadpool(fn, *args)
+        except Exception:
+            logger.exception("startup phase %s failed", name)
+            return None
+
+    def mark_ready(self) -> None:
+        self.ready_after = time.perf_counter() - self.started
+        logger.info(
+            "ready in %.0f ms (%s)", self.ready_after * 1000,
+            ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        )
+
+    def snapshot(self) -> Dict:
+        return {
+            'ready': self.ready,
+            'startup_ms': round(self.ready_after * 1000, 1) if self.ready else None,
+            'uptime_s': round(time.perf_counter() - self.started, 1),
+            'phases_ms': {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            'status': dict(self.status),
+            **self.details
+        }
+
+
+# Starea pornirii procesului curent
+startup_tracker = StartupTracker()
+
+registry.gauge(
+    "app_startup_phase_seconds", "Durata fiecărei etape a pornirii", ("phase",),
+    lambda: {(name,): seconds for name, seconds in startup_tracker.phases.items()})
+registry.gauge(
+    "app_ready", "1 după ce instanța este gata să primească trafic", (),
+    lambda: {(): 1.0 if startup_tracker.ready else 0.0})
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import Request
+
+from events import event_bus
+from serialization import dumps
+
+HEARTBEAT_SECONDS = 15.0
+QUEUE_SIZE = 64
+
+Formatter = Callable[[Dict[str, Any]], Any]
+
+
+class EventStreamHub:
+    """
+    Difuzează evenimentele din bus către clienții SSE conectați, grupați pe asset.
+    Fiecare eveniment se serializează o singură dată, indiferent de numărul de
+    clienți, și nu generează nicio interogare Cassandra.
+    """
+
+    def __init__(self, bus=event_bus, queue_size: int = QUEUE_SIZE):
+        self.bus = bus
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._forwarders: List[Tuple[str, Callable]] = []
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def forward(self, topic: str, name: str, formatter: Formatter) -> None:
+        """Publică evenimentele `topic` pe stream-ul asset-ului, ca evenimente SSE `name`"""
+        def handler(event: Dict[str, Any]) -> None:
+            # Un eveniment compactat de la alt worker nu mai are conținut de afișat
+            if event.get('compacted'):
+                return
+            self.broadcast(event['asset_id'], name, formatter(event))
+
+        self._forwarders.append((topic, handler))
+        self.bus.subscribe(topic, handler)
+
+    def stop(self) -> None:
+        for topic, handler in self._forwarders:
+            self.bus.unsubscribe(topic, handler)
+        self._forwarders.clear()
+
+        # Închide stream-urile deschise
+        with self._lock:
+            queues = [q for clients in self._clients.values() for q in clients]
+        for queue in queues:
+            self._call(self._deliver, queue, None)
+
+    def connect(self, asset_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._clients[asset_id].add(queue)
+        return queue
+
+    def disconnect(self, asset_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._clients[asset_id].discard(queue)
+            if not self._clients[asset_id]:
+                del self._clients[asset_id]
+
+    def client_count(self, asset_id: str = None) -> int:
+        with self._lock:
+            if asset_id is not None:
+                return len(self._clients.get(asset_id, ()))
+            return sum(len(clients) for clients in self._clients.values())
+
+    def broadcast(self, asset_id: str, name: str, payload: Any) -> int:
+        """Poate fi apelat din orice fir; livrarea se face pe bucla de evenimente"""
+        with self._lock:
+            queues = list(self._clients.get(asset_id, ()))
+        if not queues or self.loop is None:
+            return 0
+
+        message = f"event: {name}\ndata: {dumps(payload).decode('utf-8')}\n\n"
+        for queue in queues:
+            self._call(self._deliver, queue, message)
+        return len(queues)
+
+    def _call(self, callback: Callable, *args) -> None:
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _deliver(self, queue: asyncio.Queue, message: Optional[str]) -> None:
+        # Un client lent pierde cele mai vechi mesaje, nu blochează publicarea
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(message)
+        self.sent += 1
+
+    async def stream(self, request: Request, asset_id: str) -> AsyncIterator[str]:
+        queue = self.connect(asset_id)
+        try:
+            # Reconectare automată a browserului după 3 secunde
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # Comentariu SSE: ține conexiunea deschisă prin proxy-uri
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.disconnect(asset_id, queue)
+
+
+def latest_rows_per_year(data_points: List[Dict[str, Any]], limit: int = 5) -> List[Dict[str, Any]]:
+    """Cele mai noi `limit` rânduri din fiecare an, descrescător după dată (ca în dashboard)"""
+    by_year: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for point in data_points:
+        by_year[point['business_date'].year].append(point)
+
+    rows = []
+    for year in sorted(by_year, reverse=True):
+        newest = sorted(by_year[year], key=lambda p: p['business_date'], reverse=True)[:limit]
+        rows.extend(
+            {
+                'asset_id': p['asset_id'],
+                'data_source_id': p['data_source_id'],
+                'business_date': p['business_date'],
+                'data_values': p['data_values']
+            }
+            for p in newest
+        )
+    return rows
+
+
+# Hub-ul global al stream-urilor SSE
+event_stream = EventStreamHub()
@@ -0,0 +1,286 @@
+"""
+Generator vectorizat de date de piață sintetice pentru teste de scalare:
+mii de simboluri, decenii de istoric zilnic sau bare intraday, cu mai multe
+versiuni (system_time) pentru unele date, ca în modelul bitemporal.
+
+    python synthetic.py --symbols 1000 --start 1995-01-01 --to cassandra --revised 0.05 --versions 3
+    python synthetic.py --symbols 20 --interval 5min --start 2024-01-01 --to ndjson --output data/synthetic
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from exports import csv_chunks, ndjson_chunks
+from repositories import TimeSeriesRepository
+from snapshots import FIELDS, snapshot_dir, write_columns
+
+# Intervalele Alpha Vantage; ședința NYSE are 390 de minute (09:30-16:00)
+INTERVALS = {'daily': None, '1min': 1, '5min': 5, '15min': 15, '30min': 30, '60min': 60}
+SESSION_OPEN_MINUTES = 9 * 60 + 30
+SESSION_MINUTES = 390
+PRICE_DECIMALS = 4
+MIN_PRICE = 0.01
+# Câte valori per coloană se generează deodată (simboluri x perioade)
+BLOCK_VALUES = 4_000_000
+INSERT_CONCURRENCY = 64
+
+
+def periods(start: date, end: date, interval: str = 'daily') -> Tuple[np.ndarray, np.ndarray]:
+    """Zilele lucrătoare din interval și momentul fiecărei bare (datetime64[s])"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    days = days[np.is_busday(days)]
+    minutes = INTERVALS[interval]
+    if minutes is None:
+        return days, days.astype('datetime64[s]')
+
+    # Bara de la 09:30 acoperă 09:30-09:35 și poartă ora de final, ca în Alpha Vantage
+    offsets = np.arange(SESSION_OPEN_MINUTES + minutes, SESSION_OPEN_MINUTES + SESSION_MINUTES + 1, minutes)
+    stamps = days.astype('datetime64[m]')[:, None] + offsets[None, :].astype('timedelta64[m]')
+    return np.repeat(days, len(offsets)), stamps.ravel().astype('datetime64[s]')
+
+
+def generate_ohlcv(rng: np.random.Generator, symbols: int, count: int, interval: str = 'daily') -> Dict[str, np.ndarray]:
+    """
+    OHLCV pentru `symbols` serii de lungime `count` (tablouri 2-D): închiderea
+    urmează un mers aleator geometric, deschiderea pornește de la închiderea
+    precedentă, iar high/low încadrează mereu open și close
+    """
+    minutes = INTERVALS[interval]
+    scale = 1.0 if minutes is None else np.sqrt(minutes / SESSION_MINUTES)
+    start_price = rng.uniform(5, 500, size=(symbols, 1))
+    volatility = rng.uniform(0.01, 0.03, size=(symbols, 1)) * scale
+    drift = rng.normal(0.0003, 0.0002, size=(symbols, 1)) * scale ** 2
+    shape = (symbols, count)
+
+    returns = rng.normal(0, 1, shape) * volatility + (drift - volatility ** 2 / 2)
+    close = np.maximum(start_price * np.exp(np.cumsum(returns, axis=1)), MIN_PRICE)
+    previous = np.concatenate([start_price, close[:, :-1]], axis=1)
+    open_ = np.maximum(previous * np.exp(rng.normal(0, 1, shape) * volatility / 4), MIN_PRICE)
+    close, open_ = close.round(PRICE_DECIMALS), open_.round(PRICE_DECIMALS)
+
+    # Umbrele se rotunjesc în afară, ca invarianta să reziste rotunjirii
+    factor = 10 ** PRICE_DECIMALS
+    wick = np.abs(rng.normal(0, 1, (2,) + shape)) * volatility / 2
+    high = np.ceil(np.maximum(open_, close) * np.exp(wick[0]) * factor) / factor
+    low = np.maximum(np.floor(np.minimum(open_, close) * np.exp(-wick[1]) * factor) / factor, MIN_PRICE)
+
+    # Volumul crește în zilele cu mișcări mari; întotdeauna cel puțin 1
+    base_volume = rng.uniform(1e5, 5e7, size=(symbols, 1)) * scale
+    volume = base_volume * rng.lognormal(0, 0.4, shape) * (1 + np.abs(returns) / volatility / 2)
+    volume = np.maximum(volume, 1).astype(np.int64)
+
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+def check_invariants(columns: Dict[str, np.ndarray]) -> None:
+    low, high = columns['low'], columns['high']
+    valid = (
+        (low > 0)
+        & (low <= np.minimum(columns['open'], columns['close']))
+        & (high >= np.maximum(columns['open'], columns['close']))
+        & (columns['volume'] > 0)
+    )
+    if not valid.all():
+        raise ValueError(f"{int((~valid).sum())} generated bars violate the OHLCV invariants")
+
+
+def add_versions(
+    rng: np.random.Generator,
+    columns: Dict[str, np.ndarray],
+    revised: float,
+    max_versions: int
+) -> Dict[str, np.ndarray]:
+    """
+    Adaugă revizii pentru fracțiunea `revised` din bare (până la `max_versions`
+    versiuni per bară). O revizie corectează ușor închiderea și volumul și este
+    înregistrată cu o zi mai târziu; ordinea rămâne (dată, versiune).
+    """
+    count = len(columns['close'])
+    if max_versions <= 1 or revised <= 0:
+        return {**columns, 'version': np.zeros(count, dtype=np.int64)}
+
+    extra = np.where(rng.random(count) < revised, rng.integers(1, max_versions, count), 0)
+    index = np.repeat(np.arange(count), extra + 1)
+    starts = np.cumsum(extra + 1) - (extra + 1)
+    version = np.arange(len(index)) - np.repeat(starts, extra + 1)
+    expanded = {name: column[index] for name, column in columns.items()}
+
+    revised_rows = version > 0
+    correction = np.exp(rng.normal(0, 0.002, int(revised_rows.sum())))
+    close = expanded['close'].copy()
+    close[revised_rows] = (close[revised_rows] * correction).round(PRICE_DECIMALS)
+    volume = expanded['volume'].copy()
+    volume[revised_rows] = np.maximum((volume[revised_rows] * correction).astype(np.int64), 1)
+
+    expanded.update({
+        'close': close,
+        'volume': volume,
+        'high': np.maximum(expanded['high'], close),
+        'low': np.minimum(expanded['low'], close),
+        'version': version
+    })
+    return expanded
+
+
+def generate(
+    symbols: List[str],
+    start: date,
+    end: date,
+    interval: str = 'daily',
+    revised: float = 0.0,
+    max_versions: int = 1,
+    seed: int = 42
+) -> Iterator[Tuple[str, Dict[str, np.ndarray]]]:
+    """
+    Coloanele fiecărui simbol, generate în blocuri de simboluri (un singur apel
+    NumPy per bloc). Pe lângă OHLCV: `business_date`, `business_time` (intraday),
+    `system_time` și `version`.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown interval: {interval}. Available: {', '.join(INTERVALS)}")
+    days, stamps = periods(start, end, interval)
+    if not len(days):
+        return
+    rng = np.random.default_rng(seed)
+    minutes = INTERVALS[interval]
+    lag = np.timedelta64(20 * 3600 if minutes is None else minutes * 60, 's')
+    block = max(1, BLOCK_VALUES // len(days))
+
+    for first in range(0, len(symbols), block):
+        names = symbols[first:first + block]
+        ohlcv = generate_ohlcv(rng, len(names), len(days), interval)
+        for i, symbol in enumerate(names):
+            columns = {name: values[i] for name, values in ohlcv.items()}
+            columns.update({'business_date': days, 'business_time': stamps})
+            columns = add_versions(rng, columns, revised, max_versions)
+            # Prima versiune se înregistrează după închiderea barei, reviziile cu câte o zi mai târziu
+            columns['system_time'] = (
+                columns['business_time'] + lag + columns['version'] * np.timedelta64(86400, 's')
+            ).astype('datetime64[us]')
+            check_invariants(columns)
+            if minutes is None:
+                del columns['business_time']
+            yield symbol, columns
+
+
+def data_points(symbol: str, columns: Dict[str, np.ndarray], data_source_id: str = 'ALPHAVANTAGE') -> List[Dict]:
+    """Rândurile în forma întoarsă de `process_time_series_data` (plus `business_time` intraday)"""
+    dates = columns['business_date'].tolist()
+    times = columns['system_time'].tolist()
+    values = zip(*(columns[field].tolist() for field in FIELDS))
+    points = [
+        {
+            'asset_id': symbol,
+            'data_source_id': data_source_id,
+            'business_date_year': business_date.year,
+            'business_date': business_date,
+            'system_time': system_time,
+            'data_values': dict(zip(FIELDS, bar))
+        }
+        for business_date, system_time, bar in zip(dates, times, values)
+    ]
+    if 'business_time' in columns:
+        for point, business_time in zip(points, columns['business_time'].tolist()):
+            point['business_time'] = business_time
+    return points
+
+
+def records(symbol: str, columns: Dict[str, np.ndarray], data_source_id: str = 'ALPHAVANTAGE') -> Iterator[Dict]:
+    """Rânduri aplatizate, ca în exporturile API (`exports.iter_records`)"""
+    for point in data_points(symbol, columns, data_source_id):
+        record = {
+            'asset_id': point['asset_id'],
+            'data_source_id': point['data_source_id'],
+            'business_date': point['business_date'],
+            'system_time': point['system_time'],
+            **point['data_values']
+        }
+        if 'business_time' in point:
+            record['business_time'] = point['business_time']
+        yield record
+
+
+def write_file(path: str, chunks: Iterator[bytes]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def write_snapshot(symbol: str, columns: Dict[str, np.ndarray], data_source_id: str, root: str) -> None:
+    """Ultima versiune a fiecărei zile, ca snapshot columnar citit de `snapshots.load_snapshot`"""
+    # Versiunile unei date sunt consecutive, ultima este cea mai recentă
+    last = np.append(columns['business_date'][1:] != columns['business_date'][:-1], True)
+    latest = {'business_date': columns['business_date'][last]}
+    latest.update({field: columns[field][last].astype(np.float64) for field in FIELDS})
+    write_columns(snapshot_dir(symbol, data_source_id, root), latest, {
+        'asset_id': symbol,
+        'data_source_id': data_source_id,
+        'rows': int(len(latest['business_date'])),
+        'first_date': str(latest['business_date'][0]),
+        'last_date': str(latest['business_date'][-1]),
+        'exported_at': datetime.now().isoformat(),
+        'synthetic': True
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generează date de piață sintetice pentru teste de scalare")
+    parser.add_argument("--symbols", type=int, default=100, help="Numărul de simboluri generate")
+    parser.add_argument("--prefix", default="SYN", help="Prefixul simbolurilor (SYN00001, ...)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2000, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--interval", choices=list(INTERVALS), default='daily')
+    parser.add_argument("--revised", type=float, default=0.0, help="Fracțiunea barelor cu revizii")
+    parser.add_argument("--versions", type=int, default=1, help="Numărul maxim de versiuni per bară")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--to", choices=['cassandra', 'ndjson', 'csv', 'snapshot'], default='ndjson')
+    parser.add_argument("--output", default="data/synthetic", help="Directorul fișierelor / snapshot-urilor")
+    parser.add_argument("--data-source", default="ALPHAVANTAGE")
+    parser.add_argument("--concurrency", type=int, default=INSERT_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.interval != 'daily' and args.to != 'ndjson':
+        # Schema păstrează o bară per dată; intraday se poate scrie doar în fișiere NDJSON
+        parser.error("intraday data can only be written with --to ndjson")
+
+    symbols = [f"{args.prefix}{i:05d}" for i in range(1, args.symbols + 1)]
+    series = generate(symbols, args.start, args.end, args.interval, args.revised, args.versions, args.seed)
+
+    session = None
+    if args.to == 'cassandra':
+        from app_services import AssetService, DataSourceService
+        from database import connection_manager
+        session = connection_manager.session
+        ts_repository = TimeSeriesRepository(session)
+        asset_service = AssetService(session)
+        DataSourceService(session).create_data_source(args.data_source)
+
+    started, rows = time.perf_counter(), 0
+    try:
+        for symbol, columns in series:
+            if args.to == 'cassandra':
+                asset_service.create_asset(symbol)
+                rows += ts_repository.save_concurrent(data_points(symbol, columns, args.data_source), args.concurrency)
+            elif args.to == 'snapshot':
+                write_snapshot(symbol, columns, args.data_source, args.output)
+                rows += len(columns['close'])
+            else:
+                encoder = ndjson_chunks if args.to == 'ndjson' else csv_chunks
+                path = os.path.join(args.output, f"{symbol}.{args.to}")
+                write_file(path, encoder(records(symbol, columns, args.data_source)))
+                rows += len(columns['close'])
+    finally:
+        if session is not None:
+            connection_manager.shutdown()
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(symbols)} simboluri, {rows} rânduri în {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rânduri/s)")
+
+
+if __name__ == "__main__":
+    main()
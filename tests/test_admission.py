@@ -0,0 +1,232 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, PriorityClass, Rejected
+
+CLASSES = {
+    'interactive': PriorityClass(0, 1.0, 4, 1.0),
+    'bulk': PriorityClass(1, 0.5, 1, 0.05),
+}
+ROUTES = {
+    '/i': ('interactive', None),
+    '/b': ('bulk', None),
+    '/cap': ('interactive', 1),
+}
+
+
+def make_controller(capacity: int = 2) -> AdmissionController:
+    return AdmissionController(capacity, CLASSES, ROUTES)
+
+
+def assert_idle(controller: AdmissionController) -> None:
+    assert controller.total_active == 0
+    assert all(v == 0 for v in controller.active.values())
+    assert all(v == 0 for v in controller.route_active.values())
+    assert all(not q for q in controller.waiters.values())
+
+
+async def settle():
+    # Câteva iterații ale buclei, ca sarcinile în așteptare să ajungă la coadă
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_acquire_and_release_within_capacity():
+    async def scenario():
+        controller = make_controller()
+        assert await controller.acquire('/i') == 'interactive'
+        assert await controller.acquire('/b') == 'bulk'
+        assert controller.total_active == 2
+        assert controller.active == {'interactive': 1, 'bulk': 1}
+
+        controller.release('/i', 'interactive')
+        controller.release('/b', 'bulk')
+        assert_idle(controller)
+        assert controller.stats['interactive']['admitted'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_released_slot_goes_to_highest_priority_waiter():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+
+        order = []
+
+        async def wait(route):
+            name = await controller.acquire(route)
+            order.append(name)
+            return name
+
+        # Bulk intră primul în coadă, dar interactive are prioritate
+        bulk = asyncio.create_task(wait('/b'))
+        await settle()
+        interactive = asyncio.create_task(wait('/i'))
+        await settle()
+        assert len(controller.waiters['bulk']) == 1
+        assert len(controller.waiters['interactive']) == 1
+
+        controller.release('/i', 'interactive')
+        await settle()
+        assert order == ['interactive']
+        assert not bulk.done()
+
+        controller.release('/i', 'interactive')
+        await settle()
+        assert order == ['interactive', 'bulk']
+
+        controller.release('/i', await interactive)
+        controller.release('/b', await bulk)
+        assert_idle(controller)
+
+    asyncio.run(scenario())
+
+
+def test_class_share_limits_dispatch():
+    async def scenario():
+        controller = make_controller(capacity=4)
+        assert controller.limits == {'interactive': 4, 'bulk': 2}
+        await controller.acquire('/b')
+        await controller.acquire('/b')
+
+        # Capacitate liberă, dar bulk și-a atins fracțiunea: cererea așteaptă
+        waiter = asyncio.create_task(controller.acquire('/b'))
+        await settle()
+        assert not waiter.done()
+        # Interactive folosește în continuare restul capacității
+        assert await controller.acquire('/i') == 'interactive'
+
+        controller.release('/b', 'bulk')
+        await settle()
+        assert await waiter == 'bulk'
+        assert controller.active == {'interactive': 1, 'bulk': 2}
+
+    asyncio.run(scenario())
+
+
+def test_route_limit_rejects_with_429_without_taking_a_slot():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/cap')
+        with pytest.raises(Rejected) as error:
+            await controller.acquire('/cap')
+        assert error.value.status_code == 429
+        assert error.value.retry_after == 1
+        assert controller.route_active['/cap'] == 1
+        assert controller.total_active == 1
+        assert controller.stats['interactive']['rejected_429'] == 1
+
+        controller.release('/cap', 'interactive')
+        assert_idle(controller)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_with_503():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+        queued = asyncio.create_task(controller.acquire('/b'))
+        await settle()
+
+        with pytest.raises(Rejected) as error:
+            await controller.acquire('/b')
+        assert error.value.status_code == 503
+        assert controller.route_active['/b'] == 1
+        assert len(controller.waiters['bulk']) == 1
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejects_with_503_and_frees_route_slot():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+
+        with pytest.raises(Rejected) as error:
+            await controller.acquire('/b')
+        assert error.value.status_code == 503
+        assert controller.stats['bulk']['rejected_503'] == 1
+        assert controller.route_active['/b'] == 0
+        assert not controller.waiters['bulk']
+        assert controller.total_active == 2
+
+        controller.release('/i', 'interactive')
+        controller.release('/i', 'interactive')
+        assert_idle(controller)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_no_trace():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+        waiter = asyncio.create_task(controller.acquire('/i'))
+        await settle()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.route_active['/i'] == 2
+        assert not controller.waiters['interactive']
+
+        # Locul eliberat nu ajunge la cererea anulată
+        controller.release('/i', 'interactive')
+        controller.release('/i', 'interactive')
+        assert_idle(controller)
+
+    asyncio.run(scenario())
+
+
+def test_cancellation_after_grant_does_not_leak_the_slot():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+        waiter = asyncio.create_task(controller.acquire('/i'))
+        await settle()
+
+        # Locul este acordat, iar clientul renunță înainte ca sarcina să se reia
+        controller.release('/i', 'interactive')
+        waiter.cancel()
+        result = (await asyncio.gather(waiter, return_exceptions=True))[0]
+        if result == 'interactive':
+            # Anularea a sosit după acordare: cererea rulează și își eliberează locul
+            controller.release('/i', result)
+        else:
+            assert isinstance(result, asyncio.CancelledError)
+
+        controller.release('/i', 'interactive')
+        assert_idle(controller)
+
+    asyncio.run(scenario())
+
+
+def test_dispatch_skips_abandoned_futures():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire('/i')
+        await controller.acquire('/i')
+        abandoned = asyncio.get_running_loop().create_future()
+        abandoned.cancel()
+        controller.waiters['interactive'].append(abandoned)
+        waiter = asyncio.create_task(controller.acquire('/i'))
+        await settle()
+
+        controller.release('/i', 'interactive')
+        await settle()
+        assert await waiter == 'interactive'
+        assert controller.total_active == 2
+        assert not controller.waiters['interactive']
+
+    asyncio.run(scenario())
@@ -0,0 +1,128 @@
+import threading
+from datetime import date
+
+from app_services import RangeAggregationService
+from cache import RangeAggregationCache
+
+
+def make_rows(closes):
+    return [
+        {'data_values': {'open': str(c), 'high': str(c + 1), 'low': str(c - 1),
+                         'close': str(c), 'volume': '100'}}
+        for c in closes
+    ]
+
+
+class FakeRepository:
+    """Întoarce rândurile curente; opțional se oprește la mijlocul calculului"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self.reached = threading.Event()
+        self.resume = None
+
+    def find_latest_per_date(self, asset_id, data_source_id, start, end):
+        self.calls += 1
+        rows = list(self.rows)
+        if self.resume is not None:
+            self.reached.set()
+            self.resume.wait(5)
+        return rows
+
+
+def make_service(rows):
+    service = RangeAggregationService.__new__(RangeAggregationService)
+    service.ts_repository = FakeRepository(rows)
+    service.cache = RangeAggregationCache()
+    return service
+
+
+START, END = date(2024, 1, 1), date(2024, 1, 31)
+
+
+def test_invalidate_removes_only_overlapping_ranges():
+    cache = RangeAggregationCache()
+    january = cache.make_key("A", "S", START, END, ["avg_close"])
+    february = cache.make_key("A", "S", date(2024, 2, 1), date(2024, 2, 29), ["avg_close"])
+    other_asset = cache.make_key("B", "S", START, END, ["avg_close"])
+    for key in (january, february, other_asset):
+        cache.put(key, {'metrics': {}})
+
+    assert cache.invalidate("A", "S", [date(2024, 1, 15)]) == 1
+    assert cache.get(january) is None
+    assert cache.get(february) is not None
+    assert cache.get(other_asset) is not None
+
+
+def test_invalidate_without_dates_is_noop():
+    cache = RangeAggregationCache()
+    key = cache.make_key("A", "S", START, END, ["avg_close"])
+    cache.put(key, {'metrics': {}})
+    generation = cache.generation("A", "S")
+
+    assert cache.invalidate("A", "S", []) == 0
+    assert cache.get(key) is not None
+    assert cache.generation("A", "S") == generation
+
+
+def test_on_ingest_invalidates_written_dates():
+    service = make_service(make_rows([10.0, 20.0]))
+    first = service.aggregate("A", "S", START, END, ["avg_close"])
+    assert first['metrics']['avg_close'] == 15.0
+
+    service.ts_repository.rows = make_rows([10.0, 20.0, 30.0])
+    service.cache.on_ingest({'asset_id': "A", 'data_source_id': "S", 'dates': [date(2024, 1, 3)]})
+
+    second = service.aggregate("A", "S", START, END, ["avg_close"])
+    assert second['metrics']['avg_close'] == 20.0
+    assert service.ts_repository.calls == 2
+
+
+def test_put_after_invalidation_is_rejected():
+    cache = RangeAggregationCache()
+    key = cache.make_key("A", "S", START, END, ["avg_close"])
+    generation = cache.generation("A", "S")
+    cache.invalidate("A", "S", [date(2024, 1, 10)])
+
+    assert not cache.put_if_current(key, {'metrics': {}}, generation)
+    assert cache.get(key) is None
+    assert cache.put_if_current(key, {'metrics': {}}, cache.generation("A", "S"))
+
+
+def test_stale_compute_does_not_repopulate_cache():
+    service = make_service(make_rows([10.0]))
+    repository = service.ts_repository
+    repository.resume = threading.Event()
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(
+        service.aggregate("A", "S", START, END, ["avg_close"])))
+    worker.start()
+    assert repository.reached.wait(5)
+
+    # Ingestia are loc cât timp calculul vechi este în curs
+    repository.rows = make_rows([10.0, 30.0])
+    service.cache.invalidate("A", "S", [date(2024, 1, 2)])
+    repository.resume.set()
+    worker.join(5)
+    assert results[0]['metrics']['avg_close'] == 10.0
+
+    repository.resume = None
+    fresh = service.aggregate("A", "S", START, END, ["avg_close"])
+    assert fresh['metrics']['avg_close'] == 20.0
+
+
+def test_cached_result_is_not_shared():
+    service = make_service(make_rows([10.0, 20.0]))
+    first = service.aggregate("A", "S", START, END, ["avg_close"])
+    first['metrics']['avg_close'] = -1
+    first['count'] = -1
+
+    second = service.aggregate("A", "S", START, END, ["avg_close"])
+    assert second['metrics']['avg_close'] == 15.0
+    assert second['count'] == 2
+    assert service.ts_repository.calls == 1
+
+    second['metrics']['avg_close'] = -1
+    assert service.aggregate("A", "S", START, END, ["avg_close"])['metrics']['avg_close'] == 15.0
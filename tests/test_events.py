@@ -0,0 +1,76 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from cache import RangeAggregationCache
+from events import INGEST_COMPLETED, MAX_DATAGRAM, EventBus, WorkerRelay, encode_event
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def start_pair(directory):
+    """Două relee în același proces, fiecare cu magistrala și socket-ul lui"""
+    sender = WorkerRelay(directory, bus=EventBus())
+    receiver = WorkerRelay(directory, bus=EventBus())
+    receiver.path = os.path.join(directory, "peer.sock")
+    sender.start()
+    receiver.start()
+    return sender, receiver
+
+
+def test_large_ingest_invalidates_peer_cache(tmp_path):
+    directory = str(tmp_path / "relay")
+    sender, receiver = start_pair(directory)
+    cache = RangeAggregationCache()
+    receiver.bus.subscribe(INGEST_COMPLETED, cache.on_ingest)
+    try:
+        first = date(1990, 1, 1)
+        dates = [first + timedelta(days=i) for i in range(10_000)]
+        event = {
+            'asset_id': 'IBM', 'data_source_id': 'ALPHAVANTAGE', 'dates': dates,
+            'data_points': [{'business_date': d, 'system_time': datetime(2024, 1, 1),
+                             'data_values': {'close': '1.0'}} for d in dates]
+        }
+        assert len(encode_event(INGEST_COMPLETED, event)) > MAX_DATAGRAM
+
+        inside = ('IBM', 'ALPHAVANTAGE', date(2000, 1, 1), date(2000, 12, 31), ('avg',))
+        outside = ('IBM', 'ALPHAVANTAGE', date(2020, 1, 1), date(2020, 12, 31), ('avg',))
+        other = ('AAPL', 'ALPHAVANTAGE', date(2000, 1, 1), date(2000, 12, 31), ('avg',))
+        for key in (inside, outside, other):
+            cache.put(key, {'metrics': {}})
+
+        sender.bus.publish(INGEST_COMPLETED, event)
+
+        assert wait_for(lambda: receiver.received == 1)
+        assert cache.get(inside) is None
+        assert cache.get(outside) is not None
+        assert cache.get(other) is not None
+        assert sender.compacted == 1
+        assert sender.dropped == 1
+    finally:
+        sender.stop()
+        receiver.stop()
+
+
+def test_small_event_arrives_whole(tmp_path):
+    sender, receiver = start_pair(str(tmp_path / "relay"))
+    received = []
+    receiver.bus.subscribe(INGEST_COMPLETED, received.append)
+    try:
+        sender.bus.publish(INGEST_COMPLETED, {
+            'asset_id': 'IBM', 'data_source_id': 'ALPHAVANTAGE', 'dates': [date(2024, 3, 1)],
+            'data_points': [{'business_date': date(2024, 3, 1)}]
+        })
+        assert wait_for(lambda: received)
+        assert received[0]['dates'] == [date(2024, 3, 1)]
+        assert received[0]['relayed'] is True
+        assert 'compacted' not in received[0]
+        assert sender.dropped == 0
+    finally:
+        sender.stop()
+        receiver.stop()
@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+import exports
+
+
+def record(**values):
+    return {
+        'asset_id': 'IBM', 'data_source_id': 'ALPHAVANTAGE',
+        'business_date': date(2024, 3, 1), 'system_time': datetime(2024, 3, 1, 18, 30),
+        'open': 10.0, 'high': 11.0, 'low': 9.5, 'close': 10.5, 'volume': 1000,
+        **values
+    }
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_ndjson_writes_nan_as_null(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(exports, 'orjson', None)
+    elif exports.orjson is None:
+        pytest.skip("orjson nu este instalat")
+
+    body = b"".join(exports.ndjson_chunks([record(open=float('nan'), close=float('inf')), record()]))
+    lines = body.decode('utf-8').splitlines()
+
+    # Parser strict: NaN/Infinity nu sunt JSON valid
+    def reject(constant):
+        raise ValueError(constant)
+
+    first, second = (json.loads(line, parse_constant=reject) for line in lines)
+    assert first['open'] is None and first['close'] is None
+    assert first['high'] == 11.0
+    assert first['business_date'] == '2024-03-01'
+    assert first['system_time'] == '2024-03-01T18:30:00'
+    assert second['open'] == 10.0
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from sketches import HyperLogLog, TDigest
+
+
+def rank_error(values: np.ndarray, estimate: float, q: float) -> float:
+    """Diferența dintre rangul estimării și rangul cerut, ca fracție din total"""
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+
+@pytest.mark.parametrize("q", [0.01, 0.25, 0.5, 0.75, 0.95, 0.99])
+def test_tdigest_merge_matches_exact_quantiles(q):
+    rng = np.random.default_rng(7)
+    # Luni cu distribuții diferite, ca la sketch-urile lunare
+    parts = [rng.lognormal(mean=m, sigma=0.4, size=5000) for m in (3.0, 3.5, 4.0, 4.5)]
+
+    merged = TDigest()
+    for part in parts:
+        merged.merge(TDigest().update(part))
+    values = np.concatenate(parts)
+
+    assert merged.count == len(values)
+    assert rank_error(values, merged.quantile(q), q) < 0.01
+
+
+def test_tdigest_merge_close_to_single_digest():
+    rng = np.random.default_rng(11)
+    values = rng.normal(100, 15, size=20000)
+    single = TDigest().update(values)
+
+    merged = TDigest()
+    for chunk in np.array_split(values, 12):
+        merged.merge(TDigest().update(chunk))
+
+    for q in (0.05, 0.5, 0.95):
+        assert abs(merged.quantile(q) - single.quantile(q)) < 0.5
+
+
+def test_tdigest_merge_keeps_extremes_and_bounded_size():
+    rng = np.random.default_rng(3)
+    left, right = rng.uniform(0, 10, 10000), rng.uniform(5, 50, 10000)
+    merged = TDigest().update(left).merge(TDigest().update(right))
+
+    assert merged.min == left.min()
+    assert merged.max == right.max()
+    assert merged.quantile(0.0) == merged.min
+    assert merged.quantile(1.0) == merged.max
+    assert len(merged.means) <= merged.compression
+
+
+def test_tdigest_merge_empty_and_roundtrip():
+    digest = TDigest().update([1.0, 2.0, 3.0, float('nan')])
+    assert digest.merge(TDigest()).count == 3
+
+    restored = TDigest.from_bytes(digest.to_bytes())
+    assert restored.count == digest.count
+    assert restored.quantile(0.5) == digest.quantile(0.5)
+    assert TDigest().merge(restored).quantile(0.5) == digest.quantile(0.5)
+
+
+@pytest.mark.parametrize("cardinality", [50, 1000, 50000])
+def test_hyperloglog_merge_accuracy(cardinality):
+    # Mulțimi care se suprapun parțial: reuniunea trebuie numărată o singură dată
+    first = HyperLogLog().update(range(0, cardinality))
+    second = HyperLogLog().update(range(cardinality // 2, cardinality + cardinality // 2))
+    union = cardinality + cardinality // 2
+
+    merged = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+    # Eroarea standard la precizia 10 este ~3.3%; toleranța acoperă 3 deviații
+    assert abs(merged.count() - union) / union < 0.1
+
+
+def test_hyperloglog_merge_is_idempotent_and_commutative():
+    a = HyperLogLog().update(f"a{i}" for i in range(3000))
+    b = HyperLogLog().update(f"b{i}" for i in range(2000))
+
+    ab = HyperLogLog().merge(a).merge(b)
+    ba = HyperLogLog().merge(b).merge(a)
+    assert np.array_equal(ab.registers, ba.registers)
+    assert ab.merge(a).count() == ba.count()
+
+    single = HyperLogLog().update([f"a{i}" for i in range(3000)] + [f"b{i}" for i in range(2000)])
+    assert np.array_equal(ab.registers, single.registers)
+
+
+def test_hyperloglog_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=10).merge(HyperLogLog(precision=12))
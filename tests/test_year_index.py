@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+import pytest
+
+from benchmarks.standin import StandInSession
+from repositories import TimeSeriesRepository
+
+
+def data_point(business_date: date) -> dict:
+    return {
+        'asset_id': "A", 'data_source_id': "S",
+        'business_date': business_date, 'business_date_year': business_date.year,
+        'system_time': datetime(2024, 6, 1), 'data_values': {'close': '1'}
+    }
+
+
+def insert_raw(session, business_date: date) -> None:
+    # Scriere directă, ca datele ingerate înainte de existența indexului
+    session.execute(
+        "INSERT INTO time_series_data (asset_id, data_source_id, business_date_year, "
+        "business_date, system_time, data_values) VALUES (%s, %s, %s, %s, %s, %s)",
+        ("A", "S", business_date.year, business_date, datetime(2024, 6, 1), {'close': '1'})
+    )
+
+
+@pytest.fixture
+def repository():
+    return TimeSeriesRepository(StandInSession())
+
+
+def test_find_years_never_scans(repository, monkeypatch):
+    insert_raw(repository.session, date(2020, 3, 2))
+
+    def fail(*args):
+        raise AssertionError("find_years must not scan time_series_data")
+    monkeypatch.setattr(repository, 'scan_years', fail)
+
+    assert repository.find_years("A", "S") == []
+    assert repository.find_years("UNKNOWN", "S") == []
+
+
+def test_first_write_backfills_older_years(repository):
+    insert_raw(repository.session, date(2019, 5, 1))
+    insert_raw(repository.session, date(2020, 3, 2))
+    repository.save(data_point(date(2024, 1, 2)))
+
+    assert repository.find_years("A", "S") == [2019, 2020, 2024]
+    repository.save(data_point(date(2024, 1, 3)))
+    counts = {r['business_date_year']: r['row_count']
+              for r in repository.year_index.find_all({'asset_id': "A", 'data_source_id': "S"})}
+    assert counts == {2019: 1, 2020: 1, 2024: 2}
@@ -0,0 +1,222 @@
+import contextvars
+import hmac
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import statement_label
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+MAX_STATEMENTS = 200
+MAX_HEADER_BYTES = 8192
+DEBUG_HEADER = "x-debug-trace"
+TOKEN_HEADER = "x-debug-token"
+
+# Antetele de depanare expun interogările și cheile de partiție: sunt oprite implicit.
+# "on" permite `X-Debug-Trace: 1`, "driver" și urma din Cassandra; cu un token setat,
+# cererea trebuie să trimită și `X-Debug-Token`
+DEBUG_TRACE = os.getenv("DEBUG_TRACE", "off").lower()
+DEBUG_TRACE_TOKEN = os.getenv("DEBUG_TRACE_TOKEN") or None
+
+slow_query_log = logging.getLogger("slow_queries")
+
+_WHERE = re.compile(r"\bWHERE\b(.*?)(?:\bORDER BY\b|\bLIMIT\b|\bALLOW FILTERING\b|$)", re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestTrace:
+    """Instrucțiunile Cassandra și etapele (ex. serializare) ale unei cereri HTTP"""
+
+    def __init__(self, method: str, path: str, driver_tracing: bool = False):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.driver_tracing = driver_tracing
+        self.started = time.perf_counter()
+        self.statements: List[Dict] = []
+        self.spans: Dict[str, float] = {}
+        self.dropped = 0
+
+    def add_statement(self, entry: Dict) -> None:
+        # Apelat din firele driver-ului; list.append este atomic
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append(entry)
+        else:
+            self.dropped += 1
+
+    def add_span(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def summary(self) -> Dict:
+        statements = list(self.statements)
+        return {
+            'trace_id': self.trace_id,
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'cql_ms': round(sum(s['duration_ms'] for s in statements), 3),
+            'cql_count': len(statements) + self.dropped,
+            'spans_ms': {k: round(v * 1000, 3) for k, v in self.spans.items()},
+            'statements': statements
+        }
+
+    def server_timing(self) -> str:
+        """Antetul standard Server-Timing, afișat de uneltele de dezvoltare ale browserului"""
+        summary = self.summary()
+        parts = [f'cql;dur={summary["cql_ms"]};desc="{summary["cql_count"]} queries"']
+        parts.extend(f"{name};dur={ms}" for name, ms in summary['spans_ms'].items())
+        parts.append(f"total;dur={summary['elapsed_ms']}")
+        return ", ".join(parts)
+
+
+current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Cronometrează o etapă a cererii curente (fără efect în afara unei cereri)"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, time.perf_counter() - started)
+
+
+def partition_key(response_future) -> Optional[str]:
+    """Valorile cheii de partiție: din instrucțiunea pregătită sau din clauza WHERE a textului"""
+    query = response_future.query
+    prepared = getattr(query, 'prepared_statement', None)
+    if prepared is not None and prepared.routing_key_indexes:
+        values = getattr(query, 'raw_values', None) or []
+        return ":".join(str(values[i]) for i in prepared.routing_key_indexes if i < len(values))
+
+    # Instrucțiune simplă: textul trimis conține deja valorile parametrilor
+    text = getattr(getattr(response_future, 'message', None), 'query', None)
+    if not isinstance(text, str):
+        return None
+    match = _WHERE.search(text)
+    return _WHITESPACE.sub(" ", match.group(1)).strip()[:200] if match else None
+
+
+def install_query_tracing(session) -> None:
+    """Atașează fiecare instrucțiune la cererea HTTP curentă și scrie interogările lente în jurnal"""
+
+    def on_request(response_future) -> None:
+        trace = current_trace.get()
+        label = statement_label(response_future.query)
+        clock = {'started': time.perf_counter(), 'page': 1}
+
+        if trace is not None and trace.driver_tracing:
+            # Cere coordonatorului urma interogării (system_traces)
+            response_future.message.tracing = True
+
+        # Driver-ul reapelează callback-urile pentru fiecare pagină următoare; fiecare
+        # pagină se măsoară de la propria cerere, nu de la prima
+        fetch_next_page = response_future.start_fetching_next_page
+
+        def start_fetching_next_page() -> None:
+            clock['started'] = time.perf_counter()
+            clock['page'] += 1
+            fetch_next_page()
+
+        response_future.start_fetching_next_page = start_fetching_next_page
+
+        def finish(rows, error: Optional[BaseException]) -> None:
+            duration_ms = (time.perf_counter() - clock['started']) * 1000
+            slow = duration_ms >= SLOW_QUERY_MS
+            if trace is None and not slow:
+                return
+
+            entry = {
+                'statement': label,
+                'page': clock['page'],
+                'duration_ms': round(duration_ms, 3),
+                'rows': len(rows) if isinstance(rows, list) else None,
+                'partition': partition_key(response_future)
+            }
+            if error is not None:
+                entry['error'] = f"{type(error).__name__}: {error}"
+            if trace is not None and trace.driver_tracing:
+                trace_ids = getattr(response_future, '_query_traces', None) or []
+                entry['driver_trace_ids'] = [str(t.trace_id) for t in trace_ids]
+
+            if trace is not None:
+                trace.add_statement(entry)
+            if slow:
+                slow_query_log.warning(
+                    "slow query %.1f ms page=%d request=%s %s trace=%s partition=%s rows=%s: %s",
+                    duration_ms, entry['page'],
+                    trace.method if trace else "-",
+                    trace.path if trace else "-",
+                    trace.trace_id if trace else "-",
+                    entry['partition'], entry['rows'], label
+                )
+
+        response_future.add_callbacks(
+            lambda rows, *args: finish(rows, None),
+            lambda exc, *args: finish(None, exc)
+        )
+
+    session.add_request_init_listener(on_request)
+
+
+class TracingMiddleware:
+    """
+    Deschide o urmă pentru fiecare cerere. Dacă `DEBUG_TRACE` o permite, cu
+    antetul `X-Debug-Trace: 1` răspunsul primește `Server-Timing` și
+    `X-Query-Trace` (JSON cu fiecare instrucțiune); `X-Debug-Trace: driver`
+    activează și urma din Cassandra, doar cu `DEBUG_TRACE=driver`.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = DEBUG_TRACE, token: Optional[str] = DEBUG_TRACE_TOKEN):
+        self.app = app
+        self.mode = mode
+        self.token = token
+
+    def debug_level(self, headers: Headers) -> str:
+        """Nivelul de depanare cerut și permis: gol, `1` sau `driver`"""
+        requested = headers.get(DEBUG_HEADER, "").lower()
+        if not requested or self.mode not in ("on", "driver"):
+            return ""
+        supplied = headers.get(TOKEN_HEADER, "").encode('utf-8')
+        if self.token is not None and not hmac.compare_digest(supplied, self.token.encode('utf-8')):
+            return ""
+        if requested == "driver" and self.mode != "driver":
+            return "1"
+        return requested
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debug = self.debug_level(Headers(scope=scope))
+        trace = RequestTrace(scope["method"], scope["path"], driver_tracing=(debug == "driver"))
+        token = current_trace.set(trace)
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Trace-Id"] = trace.trace_id
+                if debug:
+                    headers["Server-Timing"] = trace.server_timing()
+                    payload = json.dumps(trace.summary(), separators=(",", ":"))
+                    if len(payload) > MAX_HEADER_BYTES:
+                        payload = payload[:MAX_HEADER_BYTES - 3] + "..."
+                    headers["X-Query-Trace"] = payload
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            current_trace.reset(token)